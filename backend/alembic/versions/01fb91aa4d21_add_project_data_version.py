@@ -0,0 +1,26 @@
+"""add project data_version
+
+Revision ID: 01fb91aa4d21
+Revises: 05dc254f8281
+Create Date: 2026-10-18 16:02:37.418205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '01fb91aa4d21'
+down_revision: Union[str, None] = '05dc254f8281'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('projects', sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('projects', 'data_version')
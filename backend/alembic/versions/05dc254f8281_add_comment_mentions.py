@@ -0,0 +1,70 @@
+"""add comment mentions index
+
+Revision ID: 05dc254f8281
+Revises: d97600a28b20
+Create Date: 2026-10-18 13:52:27.604418
+
+"""
+import json
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '05dc254f8281'
+down_revision: Union[str, None] = 'd97600a28b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    mentions = op.create_table('comment_mentions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('entity_type', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('comment_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('mentioned_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('read_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('entity_type', 'comment_id', 'user_id', name='uq_comment_mentions_key')
+    )
+    op.create_index(op.f('ix_comment_mentions_id'), 'comment_mentions', ['id'], unique=False)
+    op.create_index('ix_comment_mentions_user_id_id', 'comment_mentions', ['user_id', 'id'], unique=False)
+    op.create_index('ix_comment_mentions_user_id_read_at', 'comment_mentions', ['user_id', 'read_at'], unique=False)
+
+    # Backfill from bug_comments.mentioned_user_ids; existing mentions start out read
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        'SELECT c.id, c.bug_id, c.user_id, c.mentioned_user_ids, c.created_at, b.project_id '
+        'FROM bug_comments c JOIN bugs b ON b.id = c.bug_id'
+    )).all()
+    user_ids = {row[0] for row in conn.execute(sa.text('SELECT id FROM users')).all()}
+    backfill = []
+    for comment_id, bug_id, author_id, mentioned, created_at, project_id in rows:
+        if isinstance(mentioned, str):
+            mentioned = json.loads(mentioned or '[]')
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        for user_id in set(mentioned or []):
+            if user_id != author_id and user_id in user_ids:
+                backfill.append({
+                    'user_id': user_id, 'entity_type': 'bug', 'entity_id': bug_id,
+                    'comment_id': comment_id, 'project_id': project_id, 'mentioned_by': author_id,
+                    'created_at': created_at, 'read_at': created_at,
+                })
+    if backfill:
+        op.bulk_insert(mentions, backfill)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comment_mentions_user_id_read_at', table_name='comment_mentions')
+    op.drop_index('ix_comment_mentions_user_id_id', table_name='comment_mentions')
+    op.drop_index(op.f('ix_comment_mentions_id'), table_name='comment_mentions')
+    op.drop_table('comment_mentions')
@@ -0,0 +1,29 @@
+"""rebuild project counters with category dimension
+
+Revision ID: 2425a4db5866
+Revises: 5654c43b4423
+Create Date: 2026-10-18 12:41:09.552731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2425a4db5866'
+down_revision: Union[str, None] = '5654c43b4423'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Counters built before the category dimension existed are rebuilt on next read
+    projects = sa.table('projects', sa.column('counters_since', sa.DateTime))
+    op.execute(projects.update().values(counters_since=None))
+
+
+def downgrade() -> None:
+    # Extra category counters are harmless to older code; nothing to undo
+    pass
@@ -0,0 +1,49 @@
+"""add sync indexes and deletion log
+
+Revision ID: 4ec9ea36943b
+Revises: 30008e7f37b1
+Create Date: 2026-10-18 09:12:03.418227
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4ec9ea36943b'
+down_revision: Union[str, None] = '30008e7f37b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('deletion_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('entity_type', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('entity_number', sa.String(length=50), nullable=True),
+    sa.Column('deleted_by', sa.Integer(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_deletion_log_id'), 'deletion_log', ['id'], unique=False)
+    op.create_index('ix_deletion_log_project_id_id', 'deletion_log', ['project_id', 'id'], unique=False)
+    op.create_index('ix_bugs_project_id_updated_at', 'bugs', ['project_id', 'updated_at'], unique=False)
+    op.create_index('ix_requirements_project_id_updated_at', 'requirements', ['project_id', 'updated_at'], unique=False)
+    op.create_index('ix_tasks_requirement_id_updated_at', 'tasks', ['requirement_id', 'updated_at'], unique=False)
+    op.create_index('ix_testcases_project_id_updated_at', 'testcases', ['project_id', 'updated_at'], unique=False)
+    op.create_index('ix_sprints_project_id_updated_at', 'sprints', ['project_id', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sprints_project_id_updated_at', table_name='sprints')
+    op.drop_index('ix_testcases_project_id_updated_at', table_name='testcases')
+    op.drop_index('ix_tasks_requirement_id_updated_at', table_name='tasks')
+    op.drop_index('ix_requirements_project_id_updated_at', table_name='requirements')
+    op.drop_index('ix_bugs_project_id_updated_at', table_name='bugs')
+    op.drop_index('ix_deletion_log_project_id_id', table_name='deletion_log')
+    op.drop_index(op.f('ix_deletion_log_id'), table_name='deletion_log')
+    op.drop_table('deletion_log')
@@ -0,0 +1,59 @@
+"""add category materialized paths
+
+Revision ID: 5654c43b4423
+Revises: 6b6614e5ebed
+Create Date: 2026-10-18 12:04:41.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5654c43b4423'
+down_revision: Union[str, None] = '6b6614e5ebed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATEGORY_TABLES = ('testcase_categories', 'requirement_categories')
+
+
+def _backfill_paths(table_name: str) -> None:
+    conn = op.get_bind()
+    table = sa.table(
+        table_name,
+        sa.column('id', sa.Integer),
+        sa.column('parent_id', sa.Integer),
+        sa.column('path', sa.String),
+        sa.column('depth', sa.Integer),
+    )
+    rows = conn.execute(sa.select(table.c.id, table.c.parent_id)).all()
+    ids = {row.id for row in rows}
+    children = {}
+    for row in rows:
+        children.setdefault(row.parent_id, []).append(row.id)
+
+    stack = [(row.id, '/', 0) for row in rows if row.parent_id is None or row.parent_id not in ids]
+    while stack:
+        node_id, parent_path, depth = stack.pop()
+        path = f'{parent_path}{node_id}/'
+        conn.execute(table.update().where(table.c.id == node_id).values(path=path, depth=depth))
+        for child_id in children.get(node_id, []):
+            stack.append((child_id, path, depth + 1))
+
+
+def upgrade() -> None:
+    for table_name in CATEGORY_TABLES:
+        op.add_column(table_name, sa.Column('path', sa.String(length=255), nullable=True))
+        op.add_column(table_name, sa.Column('depth', sa.Integer(), server_default='0', nullable=False))
+        op.create_index(f'ix_{table_name}_project_id_path', table_name, ['project_id', 'path'], unique=False)
+        _backfill_paths(table_name)
+
+
+def downgrade() -> None:
+    for table_name in CATEGORY_TABLES:
+        op.drop_index(f'ix_{table_name}_project_id_path', table_name=table_name)
+        op.drop_column(table_name, 'depth')
+        op.drop_column(table_name, 'path')
@@ -0,0 +1,41 @@
+"""add sprint daily stats
+
+Revision ID: 650ea1c11f1d
+Revises: 4ec9ea36943b
+Create Date: 2026-10-18 10:02:47.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '650ea1c11f1d'
+down_revision: Union[str, None] = '4ec9ea36943b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing sprints keep stats_since NULL and are rebuilt from history on first read
+    op.add_column('sprints', sa.Column('stats_since', sa.Date(), nullable=True))
+    op.create_table('sprint_daily_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sprint_id', sa.Integer(), nullable=False),
+    sa.Column('stat_date', sa.Date(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('delta', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['sprint_id'], ['sprints.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('sprint_id', 'stat_date', 'entity', 'status', name='uq_sprint_daily_stats_key')
+    )
+    op.create_index(op.f('ix_sprint_daily_stats_id'), 'sprint_daily_stats', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sprint_daily_stats_id'), table_name='sprint_daily_stats')
+    op.drop_table('sprint_daily_stats')
+    op.drop_column('sprints', 'stats_since')
@@ -0,0 +1,41 @@
+"""add project counters
+
+Revision ID: 6b6614e5ebed
+Revises: 650ea1c11f1d
+Create Date: 2026-10-18 11:26:15.204871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b6614e5ebed'
+down_revision: Union[str, None] = '650ea1c11f1d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing projects keep counters_since NULL and are rebuilt on first dashboard read
+    op.add_column('projects', sa.Column('counters_since', sa.DateTime(), nullable=True))
+    op.create_table('project_counters',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('dimension', sa.String(length=30), nullable=False),
+    sa.Column('value', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('project_id', 'entity', 'dimension', 'value', name='uq_project_counters_key')
+    )
+    op.create_index(op.f('ix_project_counters_id'), 'project_counters', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_project_counters_id'), table_name='project_counters')
+    op.drop_table('project_counters')
+    op.drop_column('projects', 'counters_since')
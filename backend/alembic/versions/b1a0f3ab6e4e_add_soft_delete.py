@@ -0,0 +1,44 @@
+"""add soft delete
+
+Revision ID: b1a0f3ab6e4e
+Revises: 78beb9684f04
+Create Date: 2026-10-18 18:02:37.184529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1a0f3ab6e4e'
+down_revision: Union[str, None] = '78beb9684f04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# MySQL has no partial indexes: live-row lists use (scope, deleted_at, ...)
+# composites instead, and the plain deleted_at indexes serve the trash purge.
+SOFT_DELETE_TABLES = ('bugs', 'requirements', 'tasks', 'testcases', 'bug_comments', 'requirement_comments', 'task_comments')
+
+
+def upgrade() -> None:
+    for table_name in SOFT_DELETE_TABLES:
+        op.add_column(table_name, sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        op.create_index(f'ix_{table_name}_deleted_at', table_name, ['deleted_at'], unique=False)
+    op.create_index('ix_bugs_project_id_deleted_at_created_at', 'bugs', ['project_id', 'deleted_at', 'created_at'], unique=False)
+    op.create_index('ix_requirements_project_id_deleted_at_created_at', 'requirements', ['project_id', 'deleted_at', 'created_at'], unique=False)
+    op.create_index('ix_tasks_requirement_id_deleted_at', 'tasks', ['requirement_id', 'deleted_at'], unique=False)
+    op.create_index('ix_testcases_project_id_deleted_at_created_at', 'testcases', ['project_id', 'deleted_at', 'created_at'], unique=False)
+    op.add_column('projects', sa.Column('tombstone_floor', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('projects', 'tombstone_floor')
+    op.drop_index('ix_testcases_project_id_deleted_at_created_at', table_name='testcases')
+    op.drop_index('ix_tasks_requirement_id_deleted_at', table_name='tasks')
+    op.drop_index('ix_requirements_project_id_deleted_at_created_at', table_name='requirements')
+    op.drop_index('ix_bugs_project_id_deleted_at_created_at', table_name='bugs')
+    for table_name in reversed(SOFT_DELETE_TABLES):
+        op.drop_index(f'ix_{table_name}_deleted_at', table_name=table_name)
+        op.drop_column(table_name, 'deleted_at')
@@ -0,0 +1,37 @@
+"""add activity timeline indexes
+
+Revision ID: d97600a28b20
+Revises: 2425a4db5866
+Create Date: 2026-10-18 13:15:52.870114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd97600a28b20'
+down_revision: Union[str, None] = '2425a4db5866'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVITY_INDEXES = (
+    ('bug_history', 'bug_id', 'changed_at'),
+    ('requirement_history', 'requirement_id', 'changed_at'),
+    ('task_history', 'task_id', 'changed_at'),
+    ('testcase_history', 'testcase_id', 'changed_at'),
+    ('bug_comments', 'bug_id', 'created_at'),
+    ('requirement_comments', 'requirement_id', 'created_at'),
+    ('task_comments', 'task_id', 'created_at'),
+)
+
+
+def upgrade() -> None:
+    for table_name, fk, time_column in ACTIVITY_INDEXES:
+        op.create_index(f'ix_{table_name}_{fk}_{time_column}', table_name, [fk, time_column], unique=False)
+
+
+def downgrade() -> None:
+    for table_name, fk, time_column in ACTIVITY_INDEXES:
+        op.drop_index(f'ix_{table_name}_{fk}_{time_column}', table_name=table_name)
@@ -0,0 +1,47 @@
+"""add history archive
+
+Revision ID: ee80ac3dcbde
+Revises: 01fb91aa4d21
+Create Date: 2026-10-18 16:48:12.093517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ee80ac3dcbde'
+down_revision: Union[str, None] = '01fb91aa4d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('history_fields',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('history_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity_type', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('first_at', sa.DateTime(), nullable=False),
+    sa.Column('last_at', sa.DateTime(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(length=16777216), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_history_archive_id'), 'history_archive', ['id'], unique=False)
+    op.create_index('ix_history_archive_entity_type_entity_id_last_at', 'history_archive', ['entity_type', 'entity_id', 'last_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_history_archive_entity_type_entity_id_last_at', table_name='history_archive')
+    op.drop_index(op.f('ix_history_archive_id'), table_name='history_archive')
+    op.drop_table('history_archive')
+    op.drop_table('history_fields')
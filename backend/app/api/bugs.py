@@ -1,28 +1,76 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_
 
 from app.database import get_db
 from app.models.user import User
-from app.models.bug import Bug, BugStatus, BugPriority, BugHistory
+from app.models.bug import Bug, BugStatus, BugPriority
 from app.models.project import ProjectMember
 from app.schemas.bug import (
     BugCreate, BugUpdate, BugResponse, BugListResponse, BugDetailResponse,
     BugStatusUpdate, BugAssignUpdate, 
-    BugBatchStatusUpdate, BugBatchAssignUpdate, BugBatchRequest
+    BugBatchStatusUpdate, BugBatchAssignUpdate, BugBatchRequest, BugBulkCreate
 )
-from app.schemas.comment import CommentCreate, CommentUpdate, CommentResponse
+from app.schemas.bulk import BulkCreateResponse
+from app.schemas.comment import CommentCreate, CommentUpdate, CommentResponse, CommentPage
 from app.models.comment import BugComment
+from app.services.activity_service import get_activity, load_users
+from app.services.comment_service import get_comment_page
+from app.services.export_service import BUG_FIELDS, bug_rows, export_response, iter_bug_records
+from app.services.mention_service import sync_mentions
 from app.services.bug_service import create_bug, update_bug, create_history
+from app.services.bulk_service import bulk_create
+from app.services.stats_service import capture_stats, apply_stats_change
+from app.services.trash_service import soft_delete
+from app.services.version_service import bump_data_version, get_data_versions
+from app.services.history_service import load_history
 from app.utils.dependencies import get_current_user
 from app.utils.comment_utils import extract_mentions
+from app.utils.permissions import check_project_access
+from app.utils.etag import conditional_response
+from app.utils.response_cache import response_cache
+from app.utils.render_cache import RENDER_PATTERN, render_cache, rendered
 
 router = APIRouter(prefix="/api/bugs", tags=["bugs"])
 
 
+def filter_bugs(
+    query, project_id=None, status=None, priority=None, severity=None, sprint_id=None,
+    requirement_id=None, testcase_id=None, assignee_id=None, creator_id=None, search=None
+):
+    """Apply the bug list filters (shared by the list and the export)"""
+    if project_id:
+        query = query.filter(Bug.project_id == project_id)
+    if status:
+        query = query.filter(Bug.status == status)
+    if priority:
+        query = query.filter(Bug.priority == priority)
+    if severity:
+        query = query.filter(Bug.severity == severity)
+    if sprint_id:
+        query = query.filter(Bug.sprint_id == sprint_id)
+    if requirement_id:
+        query = query.filter(Bug.requirement_id == requirement_id)
+    if testcase_id:
+        query = query.filter(Bug.testcase_id == testcase_id)
+    if assignee_id:
+        query = query.filter(Bug.assignee_id == assignee_id)
+    if creator_id:
+        query = query.filter(Bug.creator_id == creator_id)
+    if search:
+        query = query.filter(or_(
+            Bug.title.contains(search),
+            Bug.bug_number.contains(search),
+            Bug.description.contains(search)
+        ))
+    return query
+
+
 @router.get("/", response_model=BugListResponse)
 def get_bugs(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     project_id: Optional[int] = None,
@@ -51,30 +99,25 @@ def get_bugs(
         query = query.filter(Bug.project_id.in_(accessible_project_ids))
     
     # Apply filters
-    if project_id:
-        query = query.filter(Bug.project_id == project_id)
-    if status:
-        query = query.filter(Bug.status == status)
-    if priority:
-        query = query.filter(Bug.priority == priority)
-    if severity:
-        query = query.filter(Bug.severity == severity)
-    if sprint_id:
-        query = query.filter(Bug.sprint_id == sprint_id)
-    if requirement_id:
-        query = query.filter(Bug.requirement_id == requirement_id)
-    if testcase_id:
-        query = query.filter(Bug.testcase_id == testcase_id)
-    if assignee_id:
-        query = query.filter(Bug.assignee_id == assignee_id)
-    if creator_id:
-        query = query.filter(Bug.creator_id == creator_id)
-    if search:
-        query = query.filter(or_(
-            Bug.title.contains(search),
-            Bug.bug_number.contains(search),
-            Bug.description.contains(search)
-        ))
+    query = filter_bugs(
+        query, project_id, status, priority, severity, sprint_id,
+        requirement_id, testcase_id, assignee_id, creator_id, search
+    )
+    
+    # Conditional GET: 304 before counting/loading the page
+    stamp_project_ids = [project_id] if project_id else accessible_project_ids
+    versions = get_data_versions(db, stamp_project_ids)
+    not_modified = conditional_response(request, response, current_user.id, sorted(versions.items()))
+    if not_modified:
+        return not_modified
+    
+    # Shared response cache; the visible rows depend only on the accessible projects
+    cache_key = None
+    if accessible_project_ids:
+        cache_key = response_cache.make_key(request, sorted(accessible_project_ids), versions)
+        cached = response_cache.get(cache_key, response)
+        if cached:
+            return cached
     
     # Get total count
     total = query.count()
@@ -83,12 +126,43 @@ def get_bugs(
     skip = (page - 1) * page_size
     bugs = query.order_by(Bug.created_at.desc()).offset(skip).limit(page_size).all()
     
-    return {
+    result = {
         "items": bugs,
         "total": total,
         "page": page,
         "page_size": page_size
     }
+    if cache_key:
+        return response_cache.store(cache_key, BugListResponse, result, response)
+    return result
+
+
+@router.get("/export")
+def export_bugs(
+    format: str = Query("ndjson", pattern="^(ndjson|csv|xlsx)$"),
+    project_id: Optional[int] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    severity: Optional[str] = None,
+    sprint_id: Optional[int] = None,
+    requirement_id: Optional[int] = None,
+    testcase_id: Optional[int] = None,
+    assignee_id: Optional[int] = None,
+    creator_id: Optional[int] = None,
+    search: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every bug matching the list filters as NDJSON, CSV or XLSX (no paging)"""
+    if project_id:
+        check_project_access(db, project_id, current_user)
+    accessible_projects = db.query(ProjectMember.project_id).filter(ProjectMember.user_id == current_user.id)
+    query = db.query(Bug).filter(Bug.project_id.in_(accessible_projects.scalar_subquery()))
+    query = filter_bugs(
+        query, project_id, status, priority, severity, sprint_id,
+        requirement_id, testcase_id, assignee_id, creator_id, search
+    )
+    return export_response(format, "bugs", iter_bug_records(query), BUG_FIELDS, bug_rows)
 
 
 @router.post("/", response_model=BugResponse, status_code=status.HTTP_201_CREATED)
@@ -102,17 +176,36 @@ def create_new_bug(
     return bug
 
 
+@router.post("/batch/create", response_model=BulkCreateResponse)
+def batch_create(
+    data: BugBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Batch create bugs (e.g. from CI); invalid items are reported per item and skipped"""
+    return bulk_create(db, "bug", [item.model_dump() for item in data.items], current_user)
+
+
 @router.get("/{bug_id}", response_model=BugDetailResponse)
 def get_bug(
     bug_id: int,
+    request: Request,
+    response: Response,
+    render: Optional[str] = Query(None, pattern=RENDER_PATTERN),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get bug by ID with creator and assignee info"""
+    """Get bug by ID with creator and assignee info; render=html|text returns the description sanitized or as plain text"""
     bug = db.query(Bug).filter(Bug.id == bug_id).first()
     if not bug:
         raise HTTPException(status_code=404, detail="Bug not found")
-    return bug
+    # The payload also carries the sprint name, so a sprint rename (which bumps
+    # the project's data version) must change the ETag as well
+    versions = get_data_versions(db, [bug.project_id])
+    not_modified = conditional_response(request, response, bug.updated_at.isoformat(), versions.get(bug.project_id))
+    if not_modified:
+        return not_modified
+    return rendered(bug, BugDetailResponse, "bug", render)
 
 
 @router.put("/{bug_id}", response_model=BugResponse)
@@ -142,7 +235,8 @@ def delete_bug(
     if bug.creator_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only bug creator can delete")
     
-    db.delete(bug)
+    soft_delete(db, [bug], current_user.id)
+    bump_data_version(db, bug.project_id)
     db.commit()
     return None
 
@@ -160,12 +254,15 @@ def update_bug_status(
         raise HTTPException(status_code=404, detail="Bug not found")
     
     old_status = bug.status.value
+    before = capture_stats(bug)
     bug.status = status_data.status
-    db.commit()
-    db.refresh(bug)
+    apply_stats_change(db, before, capture_stats(bug))
     
     # Create history
     create_history(db, bug.id, "status", old_status, status_data.status.value, current_user.id)
+    bump_data_version(db, bug.project_id)
+    db.commit()
+    db.refresh(bug)
     
     return bug
 
@@ -183,12 +280,15 @@ def assign_bug(
         raise HTTPException(status_code=404, detail="Bug not found")
     
     old_assignee = str(bug.assignee_id) if bug.assignee_id else "未分配"
+    before = capture_stats(bug)
     bug.assignee_id = assign_data.assignee_id
-    db.commit()
-    db.refresh(bug)
+    apply_stats_change(db, before, capture_stats(bug))
     
     # Create history
     create_history(db, bug.id, "assignee", old_assignee, str(assign_data.assignee_id), current_user.id)
+    bump_data_version(db, bug.project_id)
+    db.commit()
+    db.refresh(bug)
     
     return bug
 
@@ -204,9 +304,12 @@ def batch_update_status(
     
     for bug in bugs:
         old_status = bug.status.value
+        before = capture_stats(bug)
         bug.status = data.status
+        apply_stats_change(db, before, capture_stats(bug))
         create_history(db, bug.id, "status", old_status, data.status.value, current_user.id)
     
+    bump_data_version(db, *{bug.project_id for bug in bugs})
     db.commit()
     return {"message": f"Updated {len(bugs)} bugs"}
 
@@ -222,9 +325,12 @@ def batch_assign(
     
     for bug in bugs:
         old_assignee = str(bug.assignee_id) if bug.assignee_id else "未分配"
+        before = capture_stats(bug)
         bug.assignee_id = data.assignee_id
+        apply_stats_change(db, before, capture_stats(bug))
         create_history(db, bug.id, "assignee", old_assignee, str(data.assignee_id), current_user.id)
     
+    bump_data_version(db, *{bug.project_id for bug in bugs})
     db.commit()
     return {"message": f"Assigned {len(bugs)} bugs"}
 
@@ -246,9 +352,8 @@ def batch_delete(
                 detail=f"Cannot delete bug {bug.bug_number}: Only creator can delete"
             )
     
-    for bug in bugs:
-        db.delete(bug)
-    
+    soft_delete(db, bugs, current_user.id)
+    bump_data_version(db, *{bug.project_id for bug in bugs})
     db.commit()
     return None
 
@@ -257,6 +362,7 @@ def batch_delete(
 @router.get("/{bug_id}/comments", response_model=list[CommentResponse])
 def get_comments(
     bug_id: int,
+    render: Optional[str] = Query(None, pattern=RENDER_PATTERN),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -265,8 +371,31 @@ def get_comments(
     if not bug:
         raise HTTPException(status_code=404, detail="Bug not found")
     
-    comments = db.query(BugComment).filter(BugComment.bug_id == bug_id).order_by(BugComment.created_at.desc()).all()
-    return comments
+    comments = db.query(BugComment).options(joinedload(BugComment.user)).filter(
+        BugComment.bug_id == bug_id
+    ).order_by(BugComment.created_at.desc()).all()
+    return [rendered(comment, CommentResponse, "comment", render) for comment in comments]
+
+
+@router.get("/{bug_id}/comments/page", response_model=CommentPage)
+def get_comment_page_for_bug(
+    bug_id: int,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    render: Optional[str] = Query(None, pattern=RENDER_PATTERN),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a page of comments (cursor for older ones, since for new ones only)"""
+    bug = db.query(Bug).filter(Bug.id == bug_id).first()
+    if not bug:
+        raise HTTPException(status_code=404, detail="Bug not found")
+    check_project_access(db, bug.project_id, current_user)
+
+    page = get_comment_page(db, "bug", bug_id, cursor=cursor, since=since, limit=limit)
+    page["items"] = [rendered(comment, CommentResponse, "comment", render) for comment in page["items"]]
+    return page
 
 
 @router.post("/{bug_id}/comments", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
@@ -291,8 +420,12 @@ def create_comment(
         mentioned_user_ids=mentioned_user_ids
     )
     db.add(comment)
+    db.flush()
+    sync_mentions(db, "bug", bug_id, bug.project_id, comment, mentioned_user_ids)
+    bump_data_version(db, bug.project_id)
     db.commit()
     db.refresh(comment)
+    render_cache.warm(comment.content)
     return comment
 
 
@@ -325,9 +458,12 @@ def update_comment(
         bug = db.query(Bug).filter(Bug.id == bug_id).first()
         mentioned_user_ids = extract_mentions(comment_data.content, db, bug.project_id)
         comment.mentioned_user_ids = mentioned_user_ids
+        sync_mentions(db, "bug", bug_id, bug.project_id, comment, mentioned_user_ids)
+        bump_data_version(db, bug.project_id)
     
     db.commit()
     db.refresh(comment)
+    render_cache.warm(comment.content)
     return comment
 
 
@@ -351,7 +487,8 @@ def delete_comment(
     if comment.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only comment author can delete")
     
-    db.delete(comment)
+    soft_delete(db, [comment])
+    bump_data_version(db, comment.bug.project_id)
     db.commit()
     return None
 
@@ -368,25 +505,36 @@ def get_bug_history(
     if not bug:
         raise HTTPException(status_code=404, detail="Bug not found")
     
-    history = db.query(BugHistory).filter(
-        BugHistory.bug_id == bug_id
-    ).order_by(BugHistory.changed_at.desc()).all()
+    history = load_history(db, "bug", bug_id)
     
     # Build response with user info
-    result = []
-    for h in history:
-        user = db.query(User).filter(User.id == h.changed_by).first()
-        result.append({
-            "id": h.id,
-            "field": h.field,
-            "old_value": h.old_value,
-            "new_value": h.new_value,
-            "changed_by": h.changed_by,
-            "changed_at": h.changed_at.isoformat(),
-            "user": {
-                "id": user.id,
-                "username": user.username
-            } if user else None
-        })
-    
-    return result
+    users = load_users(db, (h["changed_by"] for h in history))
+    return [
+        {
+            "id": h["id"],
+            "field": h["field"],
+            "old_value": h["old_value"],
+            "new_value": h["new_value"],
+            "changed_by": h["changed_by"],
+            "changed_at": h["changed_at"].isoformat(),
+            "user": users.get(h["changed_by"])
+        }
+        for h in history
+    ]
+
+
+@router.get("/{bug_id}/activity")
+def get_bug_activity(
+    bug_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get bug history and comments as one timeline (newest first, keyset paginated)"""
+    bug = db.query(Bug).filter(Bug.id == bug_id).first()
+    if not bug:
+        raise HTTPException(status_code=404, detail="Bug not found")
+    check_project_access(db, bug.project_id, current_user)
+
+    return get_activity(db, entity_type="bug", entity_id=bug_id, cursor=cursor, limit=limit)
@@ -0,0 +1,32 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.user import User
+from app.schemas.comment import CommentCountsResponse
+from app.services.comment_service import COMMENT_MODELS, get_comment_counts
+from app.utils.dependencies import get_current_user
+
+router = APIRouter(prefix="/api/comments", tags=["comments"])
+
+MAX_COUNT_IDS = 500
+
+
+@router.get("/counts", response_model=CommentCountsResponse)
+def get_counts(
+    entity_type: str = Query(..., description="bug / requirement / task"),
+    ids: List[int] = Query(..., description="实体 ID，可重复传入，如 ids=1&ids=2"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """批量获取评论数及最近评论时间（列表页使用，无权限的实体不返回）"""
+    if entity_type not in COMMENT_MODELS:
+        raise HTTPException(status_code=400, detail="Invalid entity type")
+    if len(ids) > MAX_COUNT_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COUNT_IDS} ids per request")
+
+    return {
+        "entity_type": entity_type,
+        "counts": get_comment_counts(db, entity_type, ids, current_user),
+    }
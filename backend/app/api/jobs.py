@@ -0,0 +1,98 @@
+from typing import List, Optional
+from urllib.parse import quote
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session, defer
+
+from app.database import get_db
+from app.models.job import Job, JobStatus
+from app.models.user import User
+from app.schemas.job import JobResponse
+from app.services.job_service import cancel_job, retry_job, FINISHED
+from app.utils.dependencies import get_current_user
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def get_own_job(db: Session, job_id: int, user: User) -> Job:
+    job = db.query(Job).options(defer(Job.input_data), defer(Job.output_data)).filter(Job.id == job_id).first()
+    if not job or job.created_by != user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/", response_model=List[JobResponse])
+def get_jobs(
+    project_id: Optional[int] = None,
+    status: Optional[JobStatus] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Current user's jobs, newest first"""
+    query = db.query(Job).options(defer(Job.input_data), defer(Job.output_data)).filter(
+        Job.created_by == current_user.id
+    )
+    if project_id:
+        query = query.filter(Job.project_id == project_id)
+    if status:
+        query = query.filter(Job.status == status)
+    return query.order_by(Job.id.desc()).limit(limit).all()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Job status and progress (poll this)"""
+    return get_own_job(db, job_id, current_user)
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+def cancel(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Cancel a queued job, or stop a running one after its current batch"""
+    job = get_own_job(db, job_id, current_user)
+    if job.status in FINISHED:
+        raise HTTPException(status_code=400, detail="任务已结束")
+    cancel_job(db, job)
+    return job
+
+
+@router.post("/{job_id}/retry", response_model=JobResponse)
+def retry(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue a failed or cancelled job again"""
+    job = get_own_job(db, job_id, current_user)
+    if job.status not in (JobStatus.FAILED, JobStatus.CANCELLED):
+        raise HTTPException(status_code=400, detail="只能重试失败或已取消的任务")
+    retry_job(db, job)
+    return job
+
+
+@router.get("/{job_id}/download")
+def download_job_output(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Download the file produced by a finished job (e.g. an export)"""
+    job = get_own_job(db, job_id, current_user)
+    if job.status != JobStatus.SUCCEEDED or not job.output_name:
+        raise HTTPException(status_code=404, detail="任务没有可下载的文件")
+    media_type = "application/octet-stream"
+    if job.output_name.endswith(".xlsx"):
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    return Response(
+        content=job.output_data,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(job.output_name)}"},
+    )
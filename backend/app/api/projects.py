@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
@@ -9,8 +10,21 @@ from app.models.project import Project, ProjectMember
 from app.models.requirement import Requirement
 from app.models.task import Task
 from app.models.bug import Bug
-from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectMemberCreate, ProjectMemberResponse
+from app.models.job import Job, JobStatus
+from app.schemas.project import (
+    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectMemberCreate, ProjectMemberResponse,
+    ProjectVersionResponse
+)
+from app.schemas.job import JobResponse
+from app.services.activity_service import get_activity, ENTITY_TYPES
+from app.services.job_service import JobContext, enqueue, job_handler
+from app.services.purge_service import project_image_names, purge_project
+from app.services.stats_service import get_project_dashboard, rebuild_project_counters
+from app.services.sync_service import SYNC_PAGE_ROWS, get_changes
+from app.services.version_service import bump_data_version
 from app.utils.dependencies import get_current_user
+from app.utils.permissions import check_project_access
+from app.utils.comment_utils import invalidate_project_members
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
@@ -54,7 +68,8 @@ def create_project(
         name=project_data.name,
         key=project_data.key.upper(),
         description=project_data.description,
-        creator_id=current_user.id
+        creator_id=current_user.id,
+        counters_since=datetime.utcnow()
     )
     db.add(project)
     db.flush()  # Get project.id
@@ -135,6 +150,7 @@ def update_project(
     if project_data.description is not None:
         project.description = project_data.description
     
+    bump_data_version(db, project_id)
     db.commit()
     db.refresh(project)
     return project
@@ -159,11 +175,63 @@ def delete_project(
     if project.creator_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only project creator can delete")
     
-    db.delete(project)
-    db.commit()
+    purge_project(db, project_id)
+    invalidate_project_members(project_id)
     return None
 
 
+@router.post("/{project_id}/delete-async", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def delete_project_async(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete project in the background; poll /api/jobs/{id} for progress"""
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if project.key == "DEMO":
+        raise HTTPException(status_code=403, detail="示例空间不能删除")
+    if project.creator_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Only project creator can delete")
+
+    # Deleting twice is pointless: hand back the job that is already pending
+    pending = db.query(Job).filter(
+        Job.kind == "project_delete",
+        Job.project_id == project_id,
+        Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]),
+    ).first()
+    if pending:
+        return pending
+
+    job = enqueue(db, "project_delete", current_user.id, project_id=project_id)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+@job_handler("project_delete")
+def run_project_delete(ctx: JobContext):
+    project_id = ctx.job.project_id
+    # A retry finds the project partly (or, if only the images were left,
+    # entirely) deleted: its name and image names come from the checkpoint
+    state = ctx.checkpoint
+    if state is None:
+        project = ctx.db.query(Project).filter(Project.id == project_id).first()
+        if not project:
+            return {"deleted": False}
+        state = {"name": project.name, "images": sorted(project_image_names(ctx.db, project_id))}
+        ctx.progress(0, message=f"正在删除空间 {project.name}", checkpoint=state)
+    name = state["name"]
+
+    def on_batch(table, done):
+        ctx.progress(done, message=f"正在删除空间 {name}：{table}")
+
+    report = purge_project(ctx.db, project_id, on_batch=on_batch, images=state["images"])
+    invalidate_project_members(project_id)
+    return {"deleted": True, "tables": report}
+
+
 @router.get("/{project_id}/members", response_model=List[ProjectMemberResponse])
 def get_project_members(
     project_id: int,
@@ -232,7 +300,9 @@ def add_project_member(
         role=member_data.role
     )
     db.add(member)
+    bump_data_version(db, project_id)
     db.commit()
+    invalidate_project_members(project_id)
     db.refresh(member)
     return member
 
@@ -262,6 +332,7 @@ def update_project_member(
         raise HTTPException(status_code=404, detail="Member not found")
     
     member.role = member_data.role
+    bump_data_version(db, project_id)
     db.commit()
     db.refresh(member)
     return member
@@ -295,7 +366,9 @@ def remove_project_member(
         raise HTTPException(status_code=400, detail="Cannot remove project owner")
     
     db.delete(member)
+    bump_data_version(db, project_id)
     db.commit()
+    invalidate_project_members(project_id)
     return None
 
 
@@ -377,3 +450,77 @@ def global_search(
             } for b in bugs
         ]
     }
+
+
+@router.get("/{project_id}/changes")
+def get_project_changes(
+    project_id: int,
+    since: Optional[str] = Query(None, description="上次同步返回的 watermark，为空时全量同步"),
+    cursor: Optional[str] = Query(None, description="全量同步上一页返回的 next_cursor"),
+    limit: int = Query(SYNC_PAGE_ROWS, ge=1, le=5000, description="全量同步每页行数"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """增量同步：返回 watermark 之后新增/修改的缺陷、需求、任务、用例、迭代及删除记录；全量同步分页返回"""
+    check_project_access(db, project_id, current_user)
+    return get_changes(db, project_id, since, cursor, limit)
+
+
+@router.get("/{project_id}/version", response_model=ProjectVersionResponse)
+def get_project_version(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """数据版本号：项目内任何缺陷/需求/任务/用例/迭代/分类/评论变更都会递增，可用于缓存失效判断"""
+    project = check_project_access(db, project_id, current_user)
+    return {"project_id": project.id, "data_version": project.data_version}
+
+
+@router.get("/{project_id}/dashboard")
+def get_dashboard(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """项目看板：缺陷/需求/任务/用例按状态、优先级、严重程度、处理人等维度的统计"""
+    project = check_project_access(db, project_id, current_user)
+    return get_project_dashboard(db, project)
+
+
+@router.post("/{project_id}/dashboard/rebuild")
+def rebuild_dashboard(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """从明细数据全量重建项目看板计数"""
+    project = check_project_access(db, project_id, current_user)
+    db.commit()  # 重建需在新事务中加锁执行
+    rebuild_project_counters(db, project)
+    db.commit()
+    return get_project_dashboard(db, project)
+
+
+@router.get("/{project_id}/activity")
+def get_project_activity(
+    project_id: int,
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(50, ge=1, le=200),
+    entity_type: Optional[str] = Query(None, description="bug / requirement / task / testcase"),
+    type: Optional[str] = Query(None, description="history / comment"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """项目最近动态：各类实体的操作历史与评论按时间倒序合并，游标分页"""
+    check_project_access(db, project_id, current_user)
+    if entity_type and entity_type not in ENTITY_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid entity type")
+    return get_activity(
+        db,
+        project_id=project_id,
+        entity_type=entity_type,
+        cursor=cursor,
+        limit=limit,
+        kinds=[type] if type else None,
+    )
@@ -1,5 +1,5 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import desc, or_
 
@@ -19,13 +19,39 @@ from app.schemas.requirement import (
     BulkDeleteRequest,
     BulkStatusUpdateRequest,
     BulkSprintUpdateRequest,
+    BulkCreateRequest,
+    BulkUpdateRequest,
     CategoryCreate,
     CategoryUpdate,
     CategoryResponse,
+    CategoryTreeResponse,
+    CategoryCountsResponse,
 )
 from app.schemas.bug import BugResponse
-from app.schemas.comment import CommentCreate, CommentUpdate, RequirementCommentResponse
+from app.schemas.job import JobResponse
+from app.schemas.bulk import BulkCreateResponse, BulkUpdateResponse
+from app.schemas.comment import CommentCreate, CommentUpdate, RequirementCommentResponse, RequirementCommentPage
 from app.models.comment import RequirementComment
+from app.services.activity_service import get_activity, load_users
+from app.services.bulk_service import bulk_create, bulk_update
+from app.services.export_service import (
+    REQUIREMENT_FIELDS, TASK_FIELDS, export_response, iter_requirement_records, requirement_rows
+)
+from app.services.comment_service import get_comment_page
+from app.services.job_service import JobContext, JobError, enqueue, job_handler
+from app.services.mention_service import sync_mentions
+from app.services.category_tree import assign_path, move_category, detach_category, build_tree, build_counts
+from app.services.stats_service import (
+    capture_stats, apply_stats_change, get_category_counts, move_category_counts
+)
+from app.services.sequence_service import next_number
+from app.services.trash_service import soft_delete
+from app.services.version_service import bump_data_version
+from app.services.history_service import history_value, load_history
+from app.utils.comment_utils import extract_mentions
+from app.utils.etag import conditional_response
+from app.utils.response_cache import response_cache
+from app.utils.render_cache import RENDER_PATTERN, render_cache, rendered
 from app.utils.dependencies import get_current_user
 
 router = APIRouter(tags=["requirements"])
@@ -48,6 +74,37 @@ def get_requirement_categories(
     return categories
 
 
+@router.get("/api/requirements/categories/tree", response_model=CategoryTreeResponse)
+def get_requirement_category_tree(
+    project_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get the nested requirement category tree with per-node requirement counts"""
+    project = check_project_access(db, project_id, current_user)
+    cache_key = response_cache.make_key(request, [project_id], {project_id: project.data_version})
+    cached = response_cache.get(cache_key, response)
+    if cached:
+        return cached
+    counts = get_category_counts(db, project, "requirement")
+    tree = build_tree(db, RequirementCategory, project_id, counts)
+    return response_cache.store(cache_key, CategoryTreeResponse, tree, response)
+
+
+@router.get("/api/requirements/categories/counts", response_model=CategoryCountsResponse)
+def get_requirement_category_counts(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get direct and subtree requirement counts for every category of a project"""
+    project = check_project_access(db, project_id, current_user)
+    counts = get_category_counts(db, project, "requirement")
+    return build_counts(db, RequirementCategory, project_id, counts)
+
+
 @router.post("/api/requirements/categories", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
 def create_requirement_category(
     category_data: CategoryCreate,
@@ -74,6 +131,8 @@ def create_requirement_category(
     )
     
     db.add(category)
+    assign_path(db, category)
+    bump_data_version(db, category.project_id)
     db.commit()
     db.refresh(category)
     
@@ -93,9 +152,14 @@ def update_requirement_category(
         raise HTTPException(status_code=404, detail="Category not found")
     
     update_data = category_data.model_dump(exclude_unset=True)
+    if "parent_id" in update_data:
+        parent_id = update_data.pop("parent_id")
+        if parent_id != category.parent_id:
+            move_category(db, category, parent_id)
     for field, value in update_data.items():
         setattr(category, field, value)
     
+    bump_data_version(db, category.project_id)
     db.commit()
     db.refresh(category)
     
@@ -113,17 +177,24 @@ def delete_requirement_category(
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
-    # Move requirements to uncategorized
+    # Move requirements to uncategorized. Bulk updates skip the soft-delete filter,
+    # so live rows are moved (and counted) first, then the trashed ones
+    moved = db.query(Requirement).filter(Requirement.category_id == category_id, Requirement.deleted_at.is_(None)).update(
+        {Requirement.category_id: None}
+    )
     db.query(Requirement).filter(Requirement.category_id == category_id).update(
         {Requirement.category_id: None}
     )
+    move_category_counts(db, category.project_id, "requirement", category_id, None, moved)
     
     # Move child categories to parent
+    detach_category(db, category)
     db.query(RequirementCategory).filter(RequirementCategory.parent_id == category_id).update(
         {RequirementCategory.parent_id: category.parent_id}
     )
     
     db.delete(category)
+    bump_data_version(db, category.project_id)
     db.commit()
     return None
 
@@ -164,35 +235,11 @@ def check_requirement_permission(
             )
 
 
-def generate_requirement_number(req_id: int) -> str:
-    """Generate unique requirement number using database ID (e.g., R1, R2, ...)"""
-    return f"R{req_id}"
-
-
-@router.get(
-    "/api/projects/{project_id}/requirements", response_model=RequirementListResponse
-)
-def get_project_requirements(
-    project_id: int,
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
-    status: Optional[RequirementStatus] = None,
-    priority: Optional[RequirementPriority] = None,
-    sprint_id: Optional[int] = None,
-    exclude_sprint_id: Optional[int] = Query(None, description="Exclude requirements from this sprint"),
-    category_id: Optional[int] = Query(None, description="Filter by category ID, use -1 for uncategorized"),
-    unlinked: bool = Query(False, description="Filter requirements without sprint"),
-    assignee_id: Optional[int] = None,
-    creator_id: Optional[int] = None,
-    search: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+def filter_requirements(
+    db: Session, query, project_id: int, status=None, priority=None, sprint_id=None, exclude_sprint_id=None,
+    category_id=None, unlinked=False, assignee_id=None, creator_id=None, search=None
 ):
-    """Get all requirements for a project with pagination and filtering"""
-    check_project_access(db, project_id, current_user)
-
-    query = db.query(Requirement).filter(Requirement.project_id == project_id)
-
+    """Apply the requirement list filters (shared by the list and the export)"""
     if status:
         query = query.filter(Requirement.status == status)
     if priority:
@@ -282,6 +329,52 @@ def get_project_requirements(
             # 需求页面：只搜索需求标题
             query = query.filter(Requirement.title.ilike(pattern))
 
+    return query
+
+
+@router.get(
+    "/api/projects/{project_id}/requirements", response_model=RequirementListResponse
+)
+def get_project_requirements(
+    project_id: int,
+    request: Request,
+    response: Response,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    status: Optional[RequirementStatus] = None,
+    priority: Optional[RequirementPriority] = None,
+    sprint_id: Optional[int] = None,
+    exclude_sprint_id: Optional[int] = Query(None, description="Exclude requirements from this sprint"),
+    category_id: Optional[int] = Query(None, description="Filter by category ID, use -1 for uncategorized"),
+    unlinked: bool = Query(False, description="Filter requirements without sprint"),
+    assignee_id: Optional[int] = None,
+    creator_id: Optional[int] = None,
+    search: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get all requirements for a project with pagination and filtering"""
+    project = check_project_access(db, project_id, current_user)
+
+    query = db.query(Requirement).filter(Requirement.project_id == project_id)
+
+    query = filter_requirements(
+        db, query, project_id, status, priority, sprint_id, exclude_sprint_id,
+        category_id, unlinked, assignee_id, creator_id, search
+    )
+
+    # Conditional GET: items embed sprints, tasks, bugs and test cases, all of
+    # which bump the project data version; answer 304 before the loading below
+    not_modified = conditional_response(request, response, current_user.id, project.data_version)
+    if not_modified:
+        return not_modified
+
+    # Every member of the project sees the same list for the same filters
+    cache_key = response_cache.make_key(request, [project_id], {project_id: project.data_version})
+    cached = response_cache.get(cache_key, response)
+    if cached:
+        return cached
+
     total = query.count()
     items = (
         query.options(joinedload(Requirement.sprint))
@@ -307,9 +400,38 @@ def get_project_requirements(
         )
         req.bugs = bugs
 
-    return RequirementListResponse(
+    result = RequirementListResponse(
         items=items, total=total, page=page, page_size=page_size
     )
+    return response_cache.store(cache_key, RequirementListResponse, result, response)
+
+
+@router.get("/api/projects/{project_id}/requirements/export")
+def export_project_requirements(
+    project_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|csv|xlsx)$"),
+    status: Optional[RequirementStatus] = None,
+    priority: Optional[RequirementPriority] = None,
+    sprint_id: Optional[int] = None,
+    exclude_sprint_id: Optional[int] = Query(None, description="Exclude requirements from this sprint"),
+    category_id: Optional[int] = Query(None, description="Filter by category ID, use -1 for uncategorized"),
+    unlinked: bool = Query(False, description="Filter requirements without sprint"),
+    assignee_id: Optional[int] = None,
+    creator_id: Optional[int] = None,
+    search: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """导出需求及其任务（NDJSON 中任务嵌套在需求下，CSV / XLSX 每个任务一行），筛选条件同列表"""
+    check_project_access(db, project_id, current_user)
+    query = filter_requirements(
+        db, db.query(Requirement).filter(Requirement.project_id == project_id), project_id, status, priority,
+        sprint_id, exclude_sprint_id, category_id, unlinked, assignee_id, creator_id, search
+    )
+    return export_response(
+        format, "requirements", iter_requirement_records(query),
+        REQUIREMENT_FIELDS + TASK_FIELDS, requirement_rows
+    )
 
 
 @router.post(
@@ -346,24 +468,38 @@ def create_requirement(
     requirement = Requirement(
         project_id=project_id,
         sprint_id=req_data.sprint_id,
-        requirement_number="TEMP",  # Will be updated after getting ID
+        category_id=req_data.category_id,
+        requirement_number=next_number(db, project_id, "requirement"),
         title=req_data.title,
         description=req_data.description,
+        status=RequirementStatus.DRAFT,  # Column defaults only apply at flush; stats need it now
         priority=req_data.priority,
         creator_id=current_user.id,
         assignee_id=req_data.assignee_id,
     )
     db.add(requirement)
-    db.flush()  # Get the ID
-    
-    # Update requirement number using the database ID
-    requirement.requirement_number = generate_requirement_number(requirement.id)
+    apply_stats_change(db, None, capture_stats(requirement))
     
+    bump_data_version(db, project_id)
     db.commit()
     db.refresh(requirement)
+    render_cache.warm(requirement.description)
     return requirement
 
 
+@router.post("/api/projects/{project_id}/requirements/bulk-create", response_model=BulkCreateResponse)
+def bulk_create_requirements(
+    project_id: int,
+    request: BulkCreateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Bulk create requirements in a project; invalid items are reported per item and skipped"""
+    check_project_access(db, project_id, current_user)
+    items = [dict(item.model_dump(), project_id=project_id) for item in request.items]
+    return bulk_create(db, "requirement", items, current_user)
+
+
 # ========== Bulk Operations ==========
 # NOTE: These routes MUST be defined before dynamic /{requirement_id} routes to avoid path conflicts
 
@@ -384,91 +520,119 @@ def bulk_delete_requirements(
     if not requirements:
         raise HTTPException(status_code=404, detail="No requirements found")
 
-    deleted_count = 0
-    for requirement in requirements:
-        project = check_project_access(db, requirement.project_id, current_user)
-        try:
-            check_requirement_permission(requirement, current_user, project, "delete")
-            db.query(Bug).filter(Bug.requirement_id == requirement.id).update(
-                {Bug.requirement_id: None}
-            )
-            db.delete(requirement)
-            deleted_count += 1
-        except HTTPException:
-            continue
-
+    deleted_count = delete_requirements(db, requirements, current_user)
     db.commit()
     return {"message": f"Successfully deleted {deleted_count} requirements"}
 
 
-@router.put("/api/requirements/bulk-status")
-def bulk_update_requirements_status(
-    request: BulkStatusUpdateRequest,
+@router.post("/api/requirements/bulk-delete-async", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def bulk_delete_requirements_async(
+    request: BulkDeleteRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Bulk update requirements status"""
+    """Bulk delete requirements in the background; poll /api/jobs/{id} for progress"""
     if not request.requirement_ids:
         raise HTTPException(status_code=400, detail="No requirement IDs provided")
 
-    requirements = (
-        db.query(Requirement).filter(Requirement.id.in_(request.requirement_ids)).all()
+    project_ids = {
+        project_id for (project_id,) in
+        db.query(Requirement.project_id).filter(Requirement.id.in_(request.requirement_ids)).distinct()
+    }
+    if not project_ids:
+        raise HTTPException(status_code=404, detail="No requirements found")
+
+    job = enqueue(
+        db, "requirement_bulk_delete", current_user.id,
+        project_id=next(iter(project_ids)) if len(project_ids) == 1 else None,
+        params={"requirement_ids": sorted(set(request.requirement_ids))},
     )
+    db.commit()
+    db.refresh(job)
+    return job
 
-    if not requirements:
-        raise HTTPException(status_code=404, detail="No requirements found")
 
-    updated_count = 0
+def delete_requirements(db: Session, requirements, user: User) -> int:
+    """Delete the requirements ``user`` may delete, skipping the rest; the caller commits"""
+    deleted_count = 0
     for requirement in requirements:
-        project = check_project_access(db, requirement.project_id, current_user)
+        project = check_project_access(db, requirement.project_id, user)
         try:
-            check_requirement_permission(requirement, current_user, project, "update")
-            if requirement.status != request.status:
-                requirement.status = request.status
-            updated_count += 1
+            check_requirement_permission(requirement, user, project, "delete")
+            soft_delete(db, [requirement], user.id)
+            deleted_count += 1
         except HTTPException:
             continue
 
-    db.commit()
-    return {"message": f"Successfully updated {updated_count} requirements"}
+    bump_data_version(db, *{requirement.project_id for requirement in requirements})
+    return deleted_count
 
 
-@router.put("/api/requirements/bulk-sprint")
-def bulk_update_requirements_sprint(
-    request: BulkSprintUpdateRequest,
+BULK_DELETE_BATCH = 100
+
+
+@job_handler("requirement_bulk_delete")
+def run_requirement_bulk_delete(ctx: JobContext):
+    ids = ctx.params["requirement_ids"]
+    user = ctx.db.query(User).filter(User.id == ctx.user_id).first()
+    if not user:
+        raise JobError("User not found")
+
+    # Resume after the last committed batch when retried
+    state = ctx.checkpoint or {"index": 0, "deleted": 0}
+    for start in range(state["index"], len(ids), BULK_DELETE_BATCH):
+        batch = ids[start:start + BULK_DELETE_BATCH]
+        requirements = ctx.db.query(Requirement).filter(Requirement.id.in_(batch)).all()
+        try:
+            state["deleted"] += delete_requirements(ctx.db, requirements, user)
+        except HTTPException as exc:
+            raise JobError(exc.detail)
+        state["index"] = start + len(batch)
+        ctx.progress(state["index"], len(ids), f"已删除 {state['deleted']} 个需求", checkpoint=dict(state))
+    return {"deleted": state["deleted"], "message": f"Successfully deleted {state['deleted']} requirements"}
+
+
+@router.patch("/api/requirements/bulk", response_model=BulkUpdateResponse)
+def bulk_patch_requirements(
+    request: BulkUpdateRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """批量更新需求所属迭代"""
-    if not request.requirement_ids:
-        raise HTTPException(status_code=400, detail="No requirement IDs provided")
-
-    # 验证迭代存在
-    if request.sprint_id:
-        sprint = db.query(Sprint).filter(Sprint.id == request.sprint_id).first()
-        if not sprint:
-            raise HTTPException(status_code=404, detail="Sprint not found")
-        # 允许关联需求到已完成的迭代（用于历史追溯）
+    """Apply one partial update to many requirements; returns a summary of what changed"""
+    changes = request.changes.model_dump(exclude_unset=True)
+    if changes.get("sprint_id") == 0:
+        changes["sprint_id"] = None
+    return bulk_update(db, "requirement", request.ids, changes, current_user)
 
-    requirements = (
-        db.query(Requirement).filter(Requirement.id.in_(request.requirement_ids)).all()
-    )
 
-    if not requirements:
+def bulk_update_message(db: Session, ids, changes: dict, user: User) -> dict:
+    """Run a bulk update for the older bulk-* endpoints, which only report a count"""
+    if not ids:
+        raise HTTPException(status_code=400, detail="No requirement IDs provided")
+    summary = bulk_update(db, "requirement", ids, changes, user)
+    if summary["skipped"].get("Not found") == summary["requested"]:
         raise HTTPException(status_code=404, detail="No requirements found")
+    return {"message": f"Successfully updated {summary['updated'] + summary['unchanged']} requirements"}
 
-    updated_count = 0
-    for requirement in requirements:
-        project = check_project_access(db, requirement.project_id, current_user)
-        # 验证迭代属于同一项目
-        if request.sprint_id:
-            if sprint.project_id != requirement.project_id:
-                continue
-        requirement.sprint_id = request.sprint_id
-        updated_count += 1
 
-    db.commit()
-    return {"message": f"Successfully updated {updated_count} requirements"}
+@router.put("/api/requirements/bulk-status")
+def bulk_update_requirements_status(
+    request: BulkStatusUpdateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Bulk update requirements status"""
+    return bulk_update_message(db, request.requirement_ids, {"status": request.status}, current_user)
+
+
+@router.put("/api/requirements/bulk-sprint")
+def bulk_update_requirements_sprint(
+    request: BulkSprintUpdateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """批量更新需求所属迭代（允许关联到已完成的迭代，用于历史追溯）"""
+    return bulk_update_message(db, request.requirement_ids, {"sprint_id": request.sprint_id}, current_user)
 
 
 # ========== Single Requirement Endpoints ==========
@@ -478,21 +642,28 @@ def bulk_update_requirements_sprint(
 )
 def get_requirement(
     requirement_id: int,
+    request: Request,
+    response: Response,
+    render: Optional[str] = Query(None, pattern=RENDER_PATTERN),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get requirement by ID with creator/assignee details"""
+    """Get requirement by ID with creator/assignee details; render=html|text renders the description"""
     requirement = db.query(Requirement).filter(Requirement.id == requirement_id).first()
     if not requirement:
         raise HTTPException(status_code=404, detail="Requirement not found")
 
-    check_project_access(db, requirement.project_id, current_user)
+    project = check_project_access(db, requirement.project_id, current_user)
+    
+    not_modified = conditional_response(request, response, project.data_version)
+    if not_modified:
+        return not_modified
     
     # 加载关联的任务
     tasks = db.query(Task).filter(Task.requirement_id == requirement.id).all()
     requirement.tasks = tasks
     
-    return requirement
+    return rendered(requirement, RequirementDetailResponse, "requirement", render)
 
 
 @router.put("/api/requirements/{requirement_id}", response_model=RequirementResponse)
@@ -526,14 +697,15 @@ def update_requirement(
             req_data.sprint_id = None
 
     # Apply updates and record history
+    before = capture_stats(requirement)
     update_data = req_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         old_value = getattr(requirement, field)
         # 记录历史（只记录有变更的字段）
         if old_value != value:
             # 处理枚举类型
-            old_str = old_value.value if hasattr(old_value, 'value') else str(old_value) if old_value is not None else None
-            new_str = value.value if hasattr(value, 'value') else str(value) if value is not None else None
+            old_str = history_value(old_value)
+            new_str = history_value(value)
             history_entry = RequirementHistory(
                 requirement_id=requirement_id,
                 field=field,
@@ -544,8 +716,11 @@ def update_requirement(
             db.add(history_entry)
         setattr(requirement, field, value)
 
+    apply_stats_change(db, before, capture_stats(requirement))
+    bump_data_version(db, requirement.project_id)
     db.commit()
     db.refresh(requirement)
+    render_cache.warm(requirement.description)
     return requirement
 
 
@@ -557,7 +732,7 @@ def delete_requirement(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Delete requirement - sets related bugs requirement_id to null"""
+    """Delete requirement (moves it to the project trash together with its tasks)"""
     requirement = db.query(Requirement).filter(Requirement.id == requirement_id).first()
     if not requirement:
         raise HTTPException(status_code=404, detail="Requirement not found")
@@ -565,12 +740,8 @@ def delete_requirement(
     project = check_project_access(db, requirement.project_id, current_user)
     check_requirement_permission(requirement, current_user, project, "delete")
 
-    # Clear requirement_id references in bugs
-    db.query(Bug).filter(Bug.requirement_id == requirement_id).update(
-        {Bug.requirement_id: None}
-    )
-
-    db.delete(requirement)
+    soft_delete(db, [requirement], current_user.id)
+    bump_data_version(db, requirement.project_id)
     db.commit()
     return None
 
@@ -579,6 +750,7 @@ def delete_requirement(
 @router.get("/api/requirements/{requirement_id}/comments", response_model=list[RequirementCommentResponse])
 def get_requirement_comments(
     requirement_id: int,
+    render: Optional[str] = Query(None, pattern=RENDER_PATTERN),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -589,10 +761,32 @@ def get_requirement_comments(
     
     check_project_access(db, requirement.project_id, current_user)
     
-    comments = db.query(RequirementComment).filter(
+    comments = db.query(RequirementComment).options(joinedload(RequirementComment.user)).filter(
         RequirementComment.requirement_id == requirement_id
     ).order_by(RequirementComment.created_at.desc()).all()
-    return comments
+    return [rendered(comment, RequirementCommentResponse, "comment", render) for comment in comments]
+
+
+@router.get("/api/requirements/{requirement_id}/comments/page", response_model=RequirementCommentPage)
+def get_requirement_comment_page(
+    requirement_id: int,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    render: Optional[str] = Query(None, pattern=RENDER_PATTERN),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """分页获取需求评论（cursor 加载更早的评论，since 仅获取新评论）"""
+    requirement = db.query(Requirement).filter(Requirement.id == requirement_id).first()
+    if not requirement:
+        raise HTTPException(status_code=404, detail="Requirement not found")
+
+    check_project_access(db, requirement.project_id, current_user)
+
+    page = get_comment_page(db, "requirement", requirement_id, cursor=cursor, since=since, limit=limit)
+    page["items"] = [rendered(comment, RequirementCommentResponse, "comment", render) for comment in page["items"]]
+    return page
 
 
 @router.post("/api/requirements/{requirement_id}/comments", response_model=RequirementCommentResponse, status_code=status.HTTP_201_CREATED)
@@ -609,14 +803,20 @@ def create_requirement_comment(
     
     check_project_access(db, requirement.project_id, current_user)
     
+    mentioned_user_ids = extract_mentions(comment_data.content, db, requirement.project_id)
+    
     comment = RequirementComment(
         requirement_id=requirement_id,
         user_id=current_user.id,
         content=comment_data.content,
     )
     db.add(comment)
+    db.flush()
+    sync_mentions(db, "requirement", requirement_id, requirement.project_id, comment, mentioned_user_ids)
+    bump_data_version(db, requirement.project_id)
     db.commit()
     db.refresh(comment)
+    render_cache.warm(comment.content)
     return comment
 
 
@@ -642,9 +842,15 @@ def update_requirement_comment(
     
     if comment_data.content is not None:
         comment.content = comment_data.content
+        
+        requirement = db.query(Requirement).filter(Requirement.id == requirement_id).first()
+        mentioned_user_ids = extract_mentions(comment_data.content, db, requirement.project_id)
+        sync_mentions(db, "requirement", requirement_id, requirement.project_id, comment, mentioned_user_ids)
     
+    bump_data_version(db, comment.requirement.project_id)
     db.commit()
     db.refresh(comment)
+    render_cache.warm(comment.content)
     return comment
 
 
@@ -667,7 +873,8 @@ def delete_requirement_comment(
     if comment.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only comment author can delete")
     
-    db.delete(comment)
+    soft_delete(db, [comment])
+    bump_data_version(db, comment.requirement.project_id)
     db.commit()
     return None
 
@@ -686,25 +893,39 @@ def get_requirement_history(
     
     check_project_access(db, requirement.project_id, current_user)
     
-    history = db.query(RequirementHistory).filter(
-        RequirementHistory.requirement_id == requirement_id
-    ).order_by(RequirementHistory.changed_at.desc()).all()
+    history = load_history(db, "requirement", requirement_id)
     
     # Build response with user info
-    result = []
-    for h in history:
-        user = db.query(User).filter(User.id == h.changed_by).first()
-        result.append({
-            "id": h.id,
-            "field": h.field,
-            "old_value": h.old_value,
-            "new_value": h.new_value,
-            "changed_by": h.changed_by,
-            "changed_at": h.changed_at.isoformat(),
-            "user": {
-                "id": user.id,
-                "username": user.username
-            } if user else None
-        })
-    
-    return result
+    users = load_users(db, (h["changed_by"] for h in history))
+    return [
+        {
+            "id": h["id"],
+            "field": h["field"],
+            "old_value": h["old_value"],
+            "new_value": h["new_value"],
+            "changed_by": h["changed_by"],
+            "changed_at": h["changed_at"].isoformat(),
+            "user": users.get(h["changed_by"])
+        }
+        for h in history
+    ]
+
+
+@router.get("/api/requirements/{requirement_id}/activity")
+def get_requirement_activity(
+    requirement_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """获取需求动态（操作历史与评论合并，按时间倒序游标分页）"""
+    requirement = db.query(Requirement).filter(Requirement.id == requirement_id).first()
+    if not requirement:
+        raise HTTPException(status_code=404, detail="Requirement not found")
+
+    check_project_access(db, requirement.project_id, current_user)
+
+    return get_activity(
+        db, entity_type="requirement", entity_id=requirement_id, cursor=cursor, limit=limit
+    )
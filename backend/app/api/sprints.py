@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
@@ -10,6 +11,10 @@ from app.models.sprint import Sprint, SprintStatus
 from app.models.bug import Bug
 from app.models.requirement import Requirement
 from app.schemas.sprint import SprintCreate, SprintUpdate, SprintResponse, SprintListResponse
+from app.services.sequence_service import next_number
+from app.services.stats_service import get_sprint_series
+from app.services.sync_service import record_deletions
+from app.services.version_service import bump_data_version
 from app.utils.dependencies import get_current_user
 
 router = APIRouter(tags=["sprints"])
@@ -44,11 +49,6 @@ def check_sprint_permission(db: Session, sprint: Sprint, user: User, project: Pr
             )
 
 
-def generate_sprint_number(sprint_id: int) -> str:
-    """Generate unique sprint number using database ID (e.g., S1, S2, ...)"""
-    return f"S{sprint_id}"
-
-
 @router.get("/api/projects/{project_id}/sprints", response_model=SprintListResponse)
 def get_project_sprints(
     project_id: int,
@@ -84,18 +84,15 @@ def create_sprint(
 
     sprint = Sprint(
         project_id=project_id,
-        sprint_number="TEMP",  # Will be updated after getting ID
+        sprint_number=next_number(db, project_id, "sprint"),
         name=sprint_data.name,
         goal=sprint_data.goal,
         start_date=sprint_data.start_date,
         end_date=sprint_data.end_date,
+        stats_since=datetime.utcnow().date(),
     )
     db.add(sprint)
-    db.flush()  # Get the ID
-    
-    # Update sprint number using the database ID
-    sprint.sprint_number = generate_sprint_number(sprint.id)
-    
+    bump_data_version(db, project_id)
     db.commit()
     db.refresh(sprint)
     return sprint
@@ -166,6 +163,7 @@ def update_sprint(
     for field, value in update_data.items():
         setattr(sprint, field, value)
 
+    bump_data_version(db, sprint.project_id)
     db.commit()
     db.refresh(sprint)
     return sprint
@@ -189,7 +187,9 @@ def delete_sprint(
     db.query(Bug).filter(Bug.sprint_id == sprint_id).update({Bug.sprint_id: None})
     db.query(Requirement).filter(Requirement.sprint_id == sprint_id).update({Requirement.sprint_id: None})
 
+    record_deletions(db, [sprint], current_user.id)
     db.delete(sprint)
+    bump_data_version(db, sprint.project_id)
     db.commit()
     return None
 
@@ -223,3 +223,19 @@ def get_sprint_stats(
         "total_requirements": total_requirements,
         "completed_requirements": completed_requirements,
     }
+
+
+@router.get("/api/sprints/{sprint_id}/analytics")
+def get_sprint_analytics(
+    sprint_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """获取迭代每日统计：各实体状态分布、燃尽图与燃起图时间序列"""
+    sprint = db.query(Sprint).filter(Sprint.id == sprint_id).first()
+    if not sprint:
+        raise HTTPException(status_code=404, detail="Sprint not found")
+
+    check_project_access(db, sprint.project_id, current_user)
+
+    return get_sprint_series(db, sprint)
@@ -1,6 +1,6 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import desc
 
 from app.database import get_db
@@ -10,14 +10,29 @@ from app.models.requirement import Requirement
 from app.models.task import Task, TaskStatus, TaskHistory
 from app.schemas.task import (
     TaskCreate,
+    TaskBulkCreate,
+    TaskBulkUpdate,
     TaskUpdate,
     TaskResponse,
     TaskDetailResponse,
     TaskListResponse,
 )
-from app.schemas.comment import CommentCreate, CommentUpdate, TaskCommentResponse
+from app.schemas.bulk import BulkCreateResponse, BulkUpdateResponse
+from app.schemas.comment import CommentCreate, CommentUpdate, TaskCommentResponse, TaskCommentPage
 from app.models.comment import TaskComment
+from app.services.comment_service import get_comment_page
+from app.services.mention_service import sync_mentions
+from app.services.activity_service import get_activity, load_users
+from app.services.bulk_service import bulk_create, bulk_update
+from app.services.sequence_service import next_number
+from app.services.stats_service import capture_stats, apply_stats_change
+from app.services.trash_service import soft_delete
+from app.services.version_service import bump_data_version
+from app.services.history_service import history_value, load_history
+from app.utils.comment_utils import extract_mentions
 from app.utils.dependencies import get_current_user
+from app.utils.etag import conditional_response
+from app.utils.render_cache import RENDER_PATTERN, render_cache, rendered
 
 router = APIRouter(tags=["tasks"])
 
@@ -43,11 +58,6 @@ def check_project_access(db: Session, project_id: int, user: User) -> Project:
     return project
 
 
-def generate_task_number(task_id: int) -> str:
-    """Generate unique task number using database ID (e.g., T1, T2, ...)"""
-    return f"T{task_id}"
-
-
 @router.get("/api/requirements/{requirement_id}/tasks", response_model=TaskListResponse)
 def get_requirement_tasks(
     requirement_id: int,
@@ -99,8 +109,8 @@ def create_task(
     project = check_project_access(db, requirement.project_id, current_user)
 
     task = Task(
-        requirement_id=requirement_id,
-        task_number="TEMP",  # Will be updated after getting ID
+        requirement=requirement,
+        task_number=next_number(db, requirement.project_id, "task"),
         title=task_data.title,
         description=task_data.description,
         status=task_data.status,
@@ -109,31 +119,58 @@ def create_task(
         assignee_id=task_data.assignee_id,
     )
     db.add(task)
-    db.flush()  # Get the ID
-    
-    # Update task number using the database ID
-    task.task_number = generate_task_number(task.id)
+    apply_stats_change(db, None, capture_stats(task))
     
+    bump_data_version(db, requirement.project_id)
     db.commit()
     db.refresh(task)
+    render_cache.warm(task.description)
     return task
 
 
+@router.post("/api/tasks/bulk-create", response_model=BulkCreateResponse)
+def bulk_create_tasks(
+    request: TaskBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Bulk create tasks under one or more requirements; invalid items are reported per item and skipped"""
+    return bulk_create(db, "task", [item.model_dump() for item in request.items], current_user)
+
+
+@router.patch("/api/tasks/bulk", response_model=BulkUpdateResponse)
+def bulk_patch_tasks(
+    request: TaskBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Apply one partial update to many tasks; returns a summary of what changed"""
+    return bulk_update(db, "task", request.ids, request.changes.model_dump(exclude_unset=True), current_user)
+
+
 @router.get("/api/tasks/{task_id}", response_model=TaskDetailResponse)
 def get_task(
     task_id: int,
+    request: Request,
+    response: Response,
+    render: Optional[str] = Query(None, pattern=RENDER_PATTERN),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get task by ID"""
+    """Get task by ID; render=html|text renders the description"""
     task = db.query(Task).filter(Task.id == task_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
     requirement = db.query(Requirement).filter(Requirement.id == task.requirement_id).first()
-    check_project_access(db, requirement.project_id, current_user)
+    project = check_project_access(db, requirement.project_id, current_user)
 
-    return task
+    # The payload also carries the parent requirement, whose changes bump the
+    # project's data version rather than the task's updated_at
+    not_modified = conditional_response(request, response, task.updated_at.isoformat(), project.data_version)
+    if not_modified:
+        return not_modified
+    return rendered(task, TaskDetailResponse, "task", render)
 
 
 @router.put("/api/tasks/{task_id}", response_model=TaskResponse)
@@ -152,12 +189,13 @@ def update_task(
     check_project_access(db, requirement.project_id, current_user)
 
     # Apply updates and record history
+    before = capture_stats(task)
     update_data = task_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         old_value = getattr(task, field)
         if old_value != value:
-            old_str = old_value.value if hasattr(old_value, 'value') else str(old_value) if old_value is not None else None
-            new_str = value.value if hasattr(value, 'value') else str(value) if value is not None else None
+            old_str = history_value(old_value)
+            new_str = history_value(value)
             history_entry = TaskHistory(
                 task_id=task_id,
                 field=field,
@@ -168,8 +206,11 @@ def update_task(
             db.add(history_entry)
         setattr(task, field, value)
 
+    apply_stats_change(db, before, capture_stats(task))
+    bump_data_version(db, requirement.project_id)
     db.commit()
     db.refresh(task)
+    render_cache.warm(task.description)
     return task
 
 
@@ -187,23 +228,41 @@ def get_task_history(
     requirement = db.query(Requirement).filter(Requirement.id == task.requirement_id).first()
     check_project_access(db, requirement.project_id, current_user)
 
-    history = db.query(TaskHistory).filter(
-        TaskHistory.task_id == task_id
-    ).order_by(desc(TaskHistory.changed_at)).all()
+    history = load_history(db, "task", task_id)
     
+    users = load_users(db, (h["changed_by"] for h in history))
     return [
         {
-            "id": h.id,
-            "field": h.field,
-            "old_value": h.old_value,
-            "new_value": h.new_value,
-            "changed_at": h.changed_at,
-            "user": {"id": h.user.id, "username": h.user.username} if h.user else None
+            "id": h["id"],
+            "field": h["field"],
+            "old_value": h["old_value"],
+            "new_value": h["new_value"],
+            "changed_at": h["changed_at"],
+            "user": users.get(h["changed_by"])
         }
         for h in history
     ]
 
 
+@router.get("/api/tasks/{task_id}/activity")
+def get_task_activity(
+    task_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get task history and comments as one timeline (newest first, keyset paginated)"""
+    task = db.query(Task).filter(Task.id == task_id).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    requirement = db.query(Requirement).filter(Requirement.id == task.requirement_id).first()
+    check_project_access(db, requirement.project_id, current_user)
+
+    return get_activity(db, entity_type="task", entity_id=task_id, cursor=cursor, limit=limit)
+
+
 @router.delete("/api/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_task(
     task_id: int,
@@ -218,7 +277,8 @@ def delete_task(
     requirement = db.query(Requirement).filter(Requirement.id == task.requirement_id).first()
     check_project_access(db, requirement.project_id, current_user)
 
-    db.delete(task)
+    soft_delete(db, [task], current_user.id)
+    bump_data_version(db, requirement.project_id)
     db.commit()
     return None
 
@@ -227,6 +287,7 @@ def delete_task(
 @router.get("/api/tasks/{task_id}/comments", response_model=list[TaskCommentResponse])
 def get_task_comments(
     task_id: int,
+    render: Optional[str] = Query(None, pattern=RENDER_PATTERN),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -238,10 +299,33 @@ def get_task_comments(
     requirement = db.query(Requirement).filter(Requirement.id == task.requirement_id).first()
     check_project_access(db, requirement.project_id, current_user)
     
-    comments = db.query(TaskComment).filter(
+    comments = db.query(TaskComment).options(joinedload(TaskComment.user)).filter(
         TaskComment.task_id == task_id
     ).order_by(TaskComment.created_at.desc()).all()
-    return comments
+    return [rendered(comment, TaskCommentResponse, "comment", render) for comment in comments]
+
+
+@router.get("/api/tasks/{task_id}/comments/page", response_model=TaskCommentPage)
+def get_task_comment_page(
+    task_id: int,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    render: Optional[str] = Query(None, pattern=RENDER_PATTERN),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get a page of task comments (cursor for older ones, since for new ones only)"""
+    task = db.query(Task).filter(Task.id == task_id).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    requirement = db.query(Requirement).filter(Requirement.id == task.requirement_id).first()
+    check_project_access(db, requirement.project_id, current_user)
+
+    page = get_comment_page(db, "task", task_id, cursor=cursor, since=since, limit=limit)
+    page["items"] = [rendered(comment, TaskCommentResponse, "comment", render) for comment in page["items"]]
+    return page
 
 
 @router.post("/api/tasks/{task_id}/comments", response_model=TaskCommentResponse, status_code=status.HTTP_201_CREATED)
@@ -259,14 +343,20 @@ def create_task_comment(
     requirement = db.query(Requirement).filter(Requirement.id == task.requirement_id).first()
     check_project_access(db, requirement.project_id, current_user)
     
+    mentioned_user_ids = extract_mentions(comment_data.content, db, requirement.project_id)
+    
     comment = TaskComment(
         task_id=task_id,
         user_id=current_user.id,
         content=comment_data.content,
     )
     db.add(comment)
+    db.flush()
+    sync_mentions(db, "task", task_id, requirement.project_id, comment, mentioned_user_ids)
+    bump_data_version(db, requirement.project_id)
     db.commit()
     db.refresh(comment)
+    render_cache.warm(comment.content)
     return comment
 
 
@@ -292,9 +382,15 @@ def update_task_comment(
     
     if comment_data.content is not None:
         comment.content = comment_data.content
+        
+        task = db.query(Task).filter(Task.id == task_id).first()
+        mentioned_user_ids = extract_mentions(comment_data.content, db, task.requirement.project_id)
+        sync_mentions(db, "task", task_id, task.requirement.project_id, comment, mentioned_user_ids)
     
+    bump_data_version(db, comment.task.requirement.project_id)
     db.commit()
     db.refresh(comment)
+    render_cache.warm(comment.content)
     return comment
 
 
@@ -317,6 +413,7 @@ def delete_task_comment(
     if comment.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only comment author can delete")
     
-    db.delete(comment)
+    soft_delete(db, [comment])
+    bump_data_version(db, comment.task.requirement.project_id)
     db.commit()
     return None
@@ -1,25 +1,44 @@
 from typing import List, Optional
 from io import BytesIO
-import re
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+import time
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Request, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from sqlalchemy import insert, or_
+from starlette.concurrency import run_in_threadpool
 
 from app.database import get_db
 from app.models.user import User
 from app.models.project import Project, ProjectMember
 from app.models.requirement import Requirement
 from app.models.testcase import TestCase, TestCaseCategory, TestCaseHistory, TestCaseType, TestCaseStatus, TestCasePriority
-from sqlalchemy import desc
 from app.schemas.testcase import (
     TestCaseCreate, TestCaseUpdate, TestCaseResponse, TestCaseListResponse,
-    CategoryCreate, CategoryUpdate, CategoryResponse,
-    TestCaseBatchDeleteRequest
+    CategoryCreate, CategoryUpdate, CategoryResponse, CategoryTreeResponse, CategoryCountsResponse,
+    TestCaseBatchDeleteRequest, TestCaseBulkCreate, TestCaseBulkUpdate
 )
+from app.schemas.bulk import BulkCreateResponse, BulkUpdateResponse
+from app.schemas.job import JobResponse
+from app.services.activity_service import get_activity, load_users
+from app.services.bulk_service import bulk_create, bulk_update
+from app.services.category_tree import (
+    assign_path, move_category, detach_category, subtree_ids_query, build_tree, build_counts
+)
+from app.services.stats_service import (
+    capture_stats, apply_stats_change, apply_stats_changes, build_snapshot, get_category_counts, move_category_counts
+)
+from app.services.import_service import read_sheets
+from app.services.sequence_service import next_number, reserve_numbers
+from app.services.trash_service import soft_delete
+from app.services.version_service import bump_data_version, get_data_versions
+from app.services.history_service import history_value, load_history
+from app.services.job_service import JobContext, JobError, enqueue, job_handler
 from app.utils.dependencies import get_current_user
+from app.utils.permissions import check_project_access
+from app.utils.etag import conditional_response
+from app.utils.response_cache import response_cache
+from app.utils.text_extract import html_to_text
+from app.utils.render_cache import RENDER_PATTERN, RICH_TEXT_FIELDS, render_cache, rendered
 
 # 字段映射常量
 EXPORT_COLUMNS = [
@@ -58,21 +77,9 @@ PRIORITY_MAP = {
 }
 PRIORITY_MAP_REVERSE = {v: k for k, v in PRIORITY_MAP.items()}
 
-
-def strip_html_tags(html: str) -> str:
-    """去除 HTML 标签，保留纯文本内容"""
-    if not html:
-        return ''
-    # 将 <br>, <br/>, </p>, </div>, </li> 等标签替换为换行
-    text = re.sub(r'<br\s*/?>', '\n', html, flags=re.IGNORECASE)
-    text = re.sub(r'</(?:p|div|li|h[1-6])>', '\n', text, flags=re.IGNORECASE)
-    # 移除所有其他 HTML 标签
-    text = re.sub(r'<[^>]+>', '', text)
-    # 解码 HTML 实体
-    text = text.replace('&nbsp;', ' ').replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&').replace('&quot;', '"')
-    # 清理多余的空行
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    return text.strip()
+JOB_BATCH_ROWS = 200  # rows per committed batch in background import/export jobs
+IMPORT_BATCH_ROWS = 1000  # rows per multi-row INSERT (and job checkpoint) when importing
+IMPORT_REQUIRED_HEADER = '用例名称'  # sheets without this column are not imported
 
 
 router = APIRouter(prefix="/api/testcases", tags=["testcases"])
@@ -82,6 +89,8 @@ router = APIRouter(prefix="/api/testcases", tags=["testcases"])
 
 @router.get("/", response_model=TestCaseListResponse)
 def get_testcases(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     project_id: Optional[int] = None,
@@ -112,19 +121,9 @@ def get_testcases(
     if project_id:
         query = query.filter(TestCase.project_id == project_id)
     if category_id:
-        # 获取该目录及其所有子目录的 ID
-        def get_category_ids_recursive(cat_id: int) -> List[int]:
-            """递归获取目录及其所有子目录的 ID"""
-            ids = [cat_id]
-            children = db.query(TestCaseCategory.id).filter(
-                TestCaseCategory.parent_id == cat_id
-            ).all()
-            for (child_id,) in children:
-                ids.extend(get_category_ids_recursive(child_id))
-            return ids
-        
-        all_category_ids = get_category_ids_recursive(category_id)
-        query = query.filter(TestCase.category_id.in_(all_category_ids))
+        # 该目录及其所有子目录（按物化路径前缀一次查询）
+        subtree_ids = subtree_ids_query(db, TestCaseCategory, category_id)
+        query = query.filter(TestCase.category_id.in_(subtree_ids))
     if requirement_id:
         query = query.filter(TestCase.requirement_id == requirement_id)
     if sprint_id:
@@ -143,6 +142,21 @@ def get_testcases(
             TestCase.case_number.contains(search)
         ))
     
+    # Conditional GET: 304 before counting/loading the page
+    stamp_project_ids = [project_id] if project_id else accessible_project_ids
+    versions = get_data_versions(db, stamp_project_ids)
+    not_modified = conditional_response(request, response, current_user.id, sorted(versions.items()))
+    if not_modified:
+        return not_modified
+    
+    # Shared response cache; the visible rows depend only on the accessible projects
+    cache_key = None
+    if accessible_project_ids:
+        cache_key = response_cache.make_key(request, sorted(accessible_project_ids), versions)
+        cached = response_cache.get(cache_key, response)
+        if cached:
+            return cached
+    
     # Get total count
     total = query.count()
     
@@ -150,12 +164,15 @@ def get_testcases(
     skip = (page - 1) * page_size
     testcases = query.order_by(TestCase.created_at.desc()).offset(skip).limit(page_size).all()
     
-    return {
+    result = {
         "items": testcases,
         "total": total,
         "page": page,
         "page_size": page_size
     }
+    if cache_key:
+        return response_cache.store(cache_key, TestCaseListResponse, result, response)
+    return result
 
 
 @router.post("/", response_model=TestCaseResponse, status_code=status.HTTP_201_CREATED)
@@ -178,13 +195,12 @@ def create_testcase(
     if not member and project.creator_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Create testcase with placeholder number
     testcase = TestCase(
         project_id=testcase_data.project_id,
         category_id=testcase_data.category_id,
         requirement_id=testcase_data.requirement_id,
         sprint_id=testcase_data.sprint_id,
-        case_number="TEMP",  # Will be updated after getting ID
+        case_number=next_number(db, testcase_data.project_id, "testcase"),
         name=testcase_data.name,
         module=testcase_data.module,
         feature=testcase_data.feature,
@@ -200,17 +216,36 @@ def create_testcase(
     )
     
     db.add(testcase)
-    db.flush()  # Get the ID
-    
-    # Update case number using the database ID
-    testcase.case_number = f"TC{testcase.id}"
+    apply_stats_change(db, None, capture_stats(testcase))
     
+    bump_data_version(db, testcase.project_id)
     db.commit()
     db.refresh(testcase)
+    render_cache.warm(*(getattr(testcase, field) for field in RICH_TEXT_FIELDS["testcase"]))
     
     return testcase
 
 
+@router.post("/batch-create", response_model=BulkCreateResponse)
+def batch_create_testcases(
+    data: TestCaseBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Batch create testcases; invalid items are reported per item and skipped"""
+    return bulk_create(db, "testcase", [item.model_dump() for item in data.items], current_user)
+
+
+@router.patch("/bulk", response_model=BulkUpdateResponse)
+def bulk_patch_testcases(
+    data: TestCaseBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Apply one partial update to many testcases; returns a summary of what changed"""
+    return bulk_update(db, "testcase", data.ids, data.changes.model_dump(exclude_unset=True), current_user)
+
+
 @router.post("/batch-delete", status_code=status.HTTP_204_NO_CONTENT)
 def batch_delete_testcases(
     data: TestCaseBatchDeleteRequest,
@@ -220,9 +255,8 @@ def batch_delete_testcases(
     """Batch delete testcases"""
     testcases = db.query(TestCase).filter(TestCase.id.in_(data.ids)).all()
     
-    for testcase in testcases:
-        db.delete(testcase)
-    
+    soft_delete(db, testcases, current_user.id)
+    bump_data_version(db, *{testcase.project_id for testcase in testcases})
     db.commit()
     return None
 
@@ -244,6 +278,37 @@ def get_categories(
     return categories
 
 
+@router.get("/categories/tree", response_model=CategoryTreeResponse)
+def get_category_tree(
+    project_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the nested testcase category tree with per-node testcase counts"""
+    project = check_project_access(db, project_id, current_user)
+    cache_key = response_cache.make_key(request, [project_id], {project_id: project.data_version})
+    cached = response_cache.get(cache_key, response)
+    if cached:
+        return cached
+    counts = get_category_counts(db, project, "testcase")
+    tree = build_tree(db, TestCaseCategory, project_id, counts)
+    return response_cache.store(cache_key, CategoryTreeResponse, tree, response)
+
+
+@router.get("/categories/counts", response_model=CategoryCountsResponse)
+def get_category_item_counts(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get direct and subtree testcase counts for every category of a project"""
+    project = check_project_access(db, project_id, current_user)
+    counts = get_category_counts(db, project, "testcase")
+    return build_counts(db, TestCaseCategory, project_id, counts)
+
+
 @router.post("/categories", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
 def create_category(
     category_data: CategoryCreate,
@@ -270,6 +335,8 @@ def create_category(
     )
     
     db.add(category)
+    assign_path(db, category)
+    bump_data_version(db, category.project_id)
     db.commit()
     db.refresh(category)
     
@@ -289,9 +356,14 @@ def update_category(
         raise HTTPException(status_code=404, detail="Category not found")
     
     update_data = category_data.model_dump(exclude_unset=True)
+    if "parent_id" in update_data:
+        parent_id = update_data.pop("parent_id")
+        if parent_id != category.parent_id:
+            move_category(db, category, parent_id)
     for field, value in update_data.items():
         setattr(category, field, value)
     
+    bump_data_version(db, category.project_id)
     db.commit()
     db.refresh(category)
     
@@ -309,27 +381,38 @@ def delete_category(
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     
-    # Move testcases to uncategorized
+    # Move testcases to uncategorized. Bulk updates skip the soft-delete filter,
+    # so live rows are moved (and counted) first, then the trashed ones
+    moved = db.query(TestCase).filter(TestCase.category_id == category_id, TestCase.deleted_at.is_(None)).update(
+        {TestCase.category_id: None}
+    )
     db.query(TestCase).filter(TestCase.category_id == category_id).update(
         {TestCase.category_id: None}
     )
+    move_category_counts(db, category.project_id, "testcase", category_id, None, moved)
     
     # Move child categories to parent
+    detach_category(db, category)
     db.query(TestCaseCategory).filter(TestCaseCategory.parent_id == category_id).update(
         {TestCaseCategory.parent_id: category.parent_id}
     )
     
     db.delete(category)
+    bump_data_version(db, category.project_id)
     db.commit()
     return None
 
 
 # ========== Import/Export Endpoints ==========
 # NOTE: These routes MUST be defined before /{testcase_id} routes to avoid path conflicts
+# openpyxl is imported inside these endpoints: it is slow to import and nothing else needs it
 
 @router.get("/template")
 def download_template():
     """下载测试用例导入模板"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+
     wb = Workbook()
     ws = wb.active
     ws.title = "测试用例导入模板"
@@ -397,6 +480,35 @@ def export_testcases(
     current_user: User = Depends(get_current_user)
 ):
     """导出测试用例到 Excel"""
+    output = BytesIO(build_export_workbook(db, project_id, category_id))
+    
+    return StreamingResponse(
+        output,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": "attachment; filename=testcases_export.xlsx"}
+    )
+
+
+@router.post("/export-async", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def export_testcases_async(
+    project_id: int,
+    category_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """后台导出测试用例；完成后从 /api/jobs/{id}/download 下载"""
+    check_project_access(db, project_id, current_user)
+    job = enqueue(
+        db, "testcase_export", current_user.id,
+        project_id=project_id, params={"category_id": category_id},
+    )
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def build_export_workbook(db: Session, project_id: int, category_id: Optional[int] = None, on_progress=None) -> bytes:
+    """生成导出的 Excel 文件内容；on_progress(done, total) 每写完一批行调用一次"""
     # 查询测试用例
     query = db.query(TestCase).filter(TestCase.project_id == project_id)
     if category_id:
@@ -410,6 +522,9 @@ def export_testcases(
     category_map = {c.id: c.name for c in categories}
     
     # 创建 Excel
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+
     wb = Workbook()
     ws = wb.active
     ws.title = "测试用例"
@@ -447,11 +562,11 @@ def export_testcases(
             tc.module or '',
             tc.feature or '',
             tc.name or '',
-            strip_html_tags(tc.precondition or ''),
-            strip_html_tags(tc.steps or ''),
-            strip_html_tags(tc.test_data or ''),
-            strip_html_tags(tc.expected_result or ''),
-            strip_html_tags(tc.actual_result or ''),
+            html_to_text(tc.precondition or ''),
+            html_to_text(tc.steps or ''),
+            html_to_text(tc.test_data or ''),
+            html_to_text(tc.expected_result or ''),
+            html_to_text(tc.actual_result or ''),
             TYPE_MAP_REVERSE.get(tc.type, str(tc.type.value) if tc.type else ''),
             STATUS_MAP_REVERSE.get(tc.status, str(tc.status.value) if tc.status else ''),
             PRIORITY_MAP_REVERSE.get(tc.priority, str(tc.priority.value) if tc.priority else ''),
@@ -461,32 +576,69 @@ def export_testcases(
             cell = ws.cell(row=row, column=col, value=value)
             cell.alignment = Alignment(vertical="top", wrap_text=True)
             cell.border = thin_border
+        if on_progress and (row - 1) % JOB_BATCH_ROWS == 0:
+            on_progress(row - 1, len(testcases))
     
     # 调整列宽
     column_widths = [15, 15, 15, 30, 30, 40, 25, 40, 25, 12, 10, 10, 10]
     for col, width in enumerate(column_widths, 1):
         ws.column_dimensions[ws.cell(row=1, column=col).column_letter].width = width
     
-    # 返回文件
     output = BytesIO()
     wb.save(output)
-    output.seek(0)
-    
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=testcases_export.xlsx"}
-    )
+    return output.getvalue()
+
+
+@job_handler("testcase_export")
+def run_testcase_export(ctx: JobContext):
+    def on_progress(done, total):
+        ctx.progress(done, total, f"已导出 {done}/{total} 条")
+
+    # Progress commits only touch the job row; keep the loaded test cases usable
+    ctx.db.expire_on_commit = False
+    data = build_export_workbook(ctx.db, ctx.job.project_id, ctx.params.get("category_id"), on_progress)
+    ctx.output("testcases_export.xlsx", data)
+    return {"size": len(data)}
 
 
 @router.post("/import")
 async def import_testcases(
     file: UploadFile = File(...),
     project_id: int = Form(...),
+    dry_run: bool = Form(False),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """从 Excel 导入测试用例（所有含“用例名称”列的工作表）；dry_run 时只校验不写入"""
+    contents = await check_import_request(db, file, project_id, current_user)
+    sheets = await run_in_threadpool(read_sheets, contents, parse_testcase_row, IMPORT_REQUIRED_HEADER)
+    stats = import_testcase_sheets(db, sheets, project_id, current_user.id, dry_run)
+    if not dry_run:
+        db.commit()
+    return import_summary(stats)
+
+
+@router.post("/import-async", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_testcases_async(
+    file: UploadFile = File(...),
+    project_id: int = Form(...),
+    dry_run: bool = Form(False),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """从 Excel 导入测试用例"""
+    """后台导入测试用例；通过 /api/jobs/{id} 查询进度和结果"""
+    contents = await check_import_request(db, file, project_id, current_user)
+    job = enqueue(
+        db, "testcase_import", current_user.id,
+        project_id=project_id, params={"dry_run": dry_run}, input_data=contents,
+    )
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+async def check_import_request(db: Session, file: UploadFile, project_id: int, user: User) -> bytes:
+    """校验文件类型与空间权限，返回文件内容"""
     # 验证文件类型
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(status_code=400, detail="只支持 .xlsx 或 .xls 格式的文件")
@@ -499,125 +651,194 @@ async def import_testcases(
     # 检查用户权限
     member = db.query(ProjectMember).filter(
         ProjectMember.project_id == project_id,
-        ProjectMember.user_id == current_user.id
+        ProjectMember.user_id == user.id
     ).first()
-    if not member and project.creator_id != current_user.id:
+    if not member and project.creator_id != user.id:
         raise HTTPException(status_code=403, detail="无权访问该空间")
     
-    # 读取 Excel
-    try:
-        contents = await file.read()
-        wb = load_workbook(BytesIO(contents))
-        ws = wb.active
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Excel 文件读取失败: {str(e)}")
-    
-    # 获取表头
-    headers = [cell.value for cell in ws[1]]
-    
-    # 获取现有目录映射
-    categories = db.query(TestCaseCategory).filter(
-        TestCaseCategory.project_id == project_id
-    ).all()
-    category_name_map = {c.name: c.id for c in categories}
-    
-    # 获取需求映射
-    requirements = db.query(Requirement).filter(
-        Requirement.project_id == project_id
-    ).all()
-    req_number_map = {r.requirement_number: r.id for r in requirements}
-    
-    # 导入统计
-    success_count = 0
-    error_count = 0
-    errors = []
-    
-    # 处理每一行数据
-    for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-        # 跳过空行
-        if not any(row):
-            continue
-        
-        # 构建数据字典
-        row_data = {}
-        for col_idx, value in enumerate(row):
-            if col_idx < len(headers) and headers[col_idx]:
-                row_data[headers[col_idx]] = value
-        
-        # 验证必填字段
-        name = row_data.get('用例名称')
-        if not name:
-            error_count += 1
-            errors.append(f"第 {row_idx} 行: 用例名称不能为空")
-            continue
-        
-        try:
-            # 处理目录
-            category_id = None
-            category_name = row_data.get('用例目录')
-            if category_name:
-                if category_name in category_name_map:
-                    category_id = category_name_map[category_name]
-                else:
-                    # 自动创建目录
-                    new_category = TestCaseCategory(
-                        project_id=project_id,
-                        name=category_name,
-                        order=len(category_name_map)
-                    )
-                    db.add(new_category)
-                    db.flush()
-                    category_id = new_category.id
-                    category_name_map[category_name] = category_id
-            
-            # 处理需求ID
-            requirement_id = None
-            req_number = row_data.get('需求ID')
-            if req_number:
-                requirement_id = req_number_map.get(str(req_number))
-            
-            # 处理类型、状态、优先级
-            tc_type = TYPE_MAP.get(row_data.get('用例类型', ''), TestCaseType.FUNCTIONAL)
-            tc_status = STATUS_MAP.get(row_data.get('用例状态', ''), TestCaseStatus.NOT_EXECUTED)
-            tc_priority = PRIORITY_MAP.get(row_data.get('用例等级', ''), TestCasePriority.MEDIUM)
-            
-            # 创建测试用例
-            testcase = TestCase(
-                project_id=project_id,
-                category_id=category_id,
-                requirement_id=requirement_id,
-                case_number="TEMP",
-                name=name,
-                module=row_data.get('模块'),
-                feature=row_data.get('功能'),
-                type=tc_type,
-                status=tc_status,
-                priority=tc_priority,
-                precondition=row_data.get('前置条件'),
-                steps=row_data.get('用例步骤'),
-                test_data=row_data.get('测试数据'),
-                expected_result=row_data.get('预期结果'),
-                actual_result=row_data.get('实际结果'),
-                creator_id=current_user.id
-            )
-            db.add(testcase)
-            db.flush()
-            testcase.case_number = f"TC{testcase.id}"
-            success_count += 1
-            
-        except Exception as e:
-            error_count += 1
-            errors.append(f"第 {row_idx} 行: {str(e)}")
-    
-    db.commit()
-    
+    return await file.read()
+
+
+def import_summary(stats: dict) -> dict:
+    success_count, error_count, errors = stats["success_count"], stats["error_count"], stats["errors"]
+    action = "校验" if stats["dry_run"] else "导入"
     return {
         "success": True,
-        "message": f"导入完成，成功 {success_count} 条，失败 {error_count} 条",
+        "message": f"{action}完成，成功 {success_count} 条，失败 {error_count} 条",
         "success_count": success_count,
         "error_count": error_count,
-        "errors": errors[:10] if errors else []  # 最多返回10条错误
+        "errors": errors[:10] if errors else [],  # 最多返回10条错误
+        "dry_run": stats["dry_run"],
+        "new_categories": stats["new_categories"],
+        "unmatched_requirements": stats["unmatched_requirements"],
+        "sheets": stats["sheets"],
+        "insert_seconds": stats["insert_seconds"],
+    }
+
+
+def parse_testcase_row(values: tuple, columns: dict) -> dict:
+    """解析并校验一行（在导入工作进程中运行，不访问数据库）"""
+    def cell(header):
+        index = columns.get(header)
+        value = values[index] if index is not None and index < len(values) else None
+        return None if value == '' else value
+
+    name = cell('用例名称')
+    if not name:
+        raise ValueError("用例名称不能为空")
+    name = str(name)
+    if len(name) > TestCase.name.type.length:
+        raise ValueError(f"用例名称超过 {TestCase.name.type.length} 个字符")
+    category = cell('用例目录')
+    if category is not None and len(str(category)) > TestCaseCategory.name.type.length:
+        raise ValueError(f"用例目录超过 {TestCaseCategory.name.type.length} 个字符")
+    for header, column in (('模块', TestCase.module), ('功能', TestCase.feature)):
+        value = cell(header)
+        if value is not None and len(str(value)) > column.type.length:
+            raise ValueError(f"{header}超过 {column.type.length} 个字符")
+
+    requirement_number = cell('需求ID')
+    return {
+        "category": str(category) if category is not None else None,
+        "requirement_number": str(requirement_number) if requirement_number is not None else None,
+        "name": name,
+        "module": cell('模块'),
+        "feature": cell('功能'),
+        "type": TYPE_MAP.get(cell('用例类型'), TestCaseType.FUNCTIONAL),
+        "status": STATUS_MAP.get(cell('用例状态'), TestCaseStatus.NOT_EXECUTED),
+        "priority": PRIORITY_MAP.get(cell('用例等级'), TestCasePriority.MEDIUM),
+        "precondition": cell('前置条件'),
+        "steps": cell('用例步骤'),
+        "test_data": cell('测试数据'),
+        "expected_result": cell('预期结果'),
+        "actual_result": cell('实际结果'),
+    }
+
+
+def _import_categories(db: Session, project_id: int, names: List[str], dry_run: bool):
+    """目录名 -> id，缺少的目录自动创建；返回 (映射, 新建数量)"""
+    category_name_map = {
+        name: category_id for name, category_id in db.query(TestCaseCategory.name, TestCaseCategory.id).filter(
+            TestCaseCategory.project_id == project_id, TestCaseCategory.name.in_(set(names))
+        ).all()
     }
+    missing = [name for name in dict.fromkeys(names) if name not in category_name_map]
+    if dry_run or not missing:
+        return category_name_map, len(missing)
+
+    order = db.query(TestCaseCategory).filter(TestCaseCategory.project_id == project_id).count()
+    for name in missing:
+        new_category = TestCaseCategory(project_id=project_id, name=name, order=order)
+        db.add(new_category)
+        assign_path(db, new_category)
+        category_name_map[name] = new_category.id
+        order += 1
+    return category_name_map, len(missing)
+
+
+def import_testcase_sheets(
+    db: Session, sheets: List[dict], project_id: int, user_id: int, dry_run: bool = False,
+    stats: Optional[dict] = None, on_batch=None,
+) -> dict:
+    """
+    按工作表顺序合并 read_sheets 的解析结果，分批多行插入，调用方负责提交。
+
+    stats 为上次中断时的统计（含已插入行数 done），从其后继续；
+    on_batch(stats) 每插入 IMPORT_BATCH_ROWS 行调用一次，可在其中提交。
+    """
+    sheets = [sheet for sheet in sheets if not sheet["skipped"]]
+    if not sheets:
+        raise HTTPException(status_code=400, detail=f"未找到包含“{IMPORT_REQUIRED_HEADER}”列的工作表")
+
+    rows = [values for sheet in sheets for _, values in sheet["rows"]]
+    if stats is None:
+        prefix = (lambda sheet: f"{sheet} ") if len(sheets) > 1 else (lambda sheet: "")
+        errors = [
+            f"{prefix(sheet['sheet'])}第 {row_number} 行: {message}"
+            for sheet in sheets for row_number, message in sheet["errors"]
+        ]
+        stats = {
+            "done": 0, "success_count": 0, "error_count": len(errors), "errors": errors,
+            "dry_run": dry_run, "insert_seconds": 0.0,
+            "sheets": [
+                {
+                    "sheet": sheet["sheet"],
+                    "rows": sheet["read"],
+                    "valid": len(sheet["rows"]),
+                    "errors": len(sheet["errors"]),
+                    "seconds": sheet["seconds"],
+                    "rows_per_second": round(sheet["read"] / sheet["seconds"]) if sheet["seconds"] else None,
+                }
+                for sheet in sheets
+            ],
+        }
+
+    # 目录与需求编号各一次查询
+    category_name_map, stats["new_categories"] = _import_categories(
+        db, project_id, [values["category"] for values in rows if values["category"]], dry_run
+    )
+    numbers = {values["requirement_number"] for values in rows if values["requirement_number"]}
+    req_number_map = dict(
+        db.query(Requirement.requirement_number, Requirement.id).filter(
+            Requirement.project_id == project_id, Requirement.requirement_number.in_(numbers)
+        ).all()
+    ) if numbers else {}
+    stats["unmatched_requirements"] = sum(
+        1 for values in rows if values["requirement_number"] and values["requirement_number"] not in req_number_map
+    )
+    if dry_run:
+        stats["success_count"] = len(rows)
+        return stats
+
+    for start in range(stats["done"], len(rows), IMPORT_BATCH_ROWS):
+        started = time.perf_counter()
+        batch = rows[start:start + IMPORT_BATCH_ROWS]
+        case_numbers = reserve_numbers(db, project_id, "testcase", len(batch))
+        inserts = [
+            {
+                "project_id": project_id,
+                "category_id": category_name_map.get(values["category"]),
+                "requirement_id": req_number_map.get(values["requirement_number"]),
+                "case_number": case_number,
+                "creator_id": user_id,
+                **{key: value for key, value in values.items() if key not in ("category", "requirement_number")},
+            }
+            for values, case_number in zip(batch, case_numbers)
+        ]
+        db.execute(insert(TestCase), inserts)
+        apply_stats_changes(db, [
+            (None, build_snapshot("testcase", None, project_id, None, values.get)) for values in inserts
+        ])
+        bump_data_version(db, project_id)
+        stats["done"] += len(batch)
+        stats["success_count"] += len(batch)
+        stats["insert_seconds"] = round(stats["insert_seconds"] + time.perf_counter() - started, 3)
+        if on_batch:
+            on_batch(stats)
+    return stats
+
+
+@job_handler("testcase_import")
+def run_testcase_import(ctx: JobContext):
+    try:
+        sheets = read_sheets(ctx.job.input_data, parse_testcase_row, IMPORT_REQUIRED_HEADER)
+    except HTTPException as exc:
+        raise JobError(exc.detail)
+    total = sum(len(sheet["rows"]) for sheet in sheets if not sheet["skipped"])
+
+    def on_batch(stats):
+        # Keep the checkpoint small: the summary only shows the first errors
+        ctx.progress(stats["done"], total, f"已导入 {stats['done']}/{total} 行",
+                     checkpoint={**stats, "errors": stats["errors"][:10]})
+
+    try:
+        stats = import_testcase_sheets(
+            ctx.db, sheets, ctx.job.project_id, ctx.user_id,
+            ctx.params.get("dry_run", False), ctx.checkpoint, on_batch,
+        )
+    except HTTPException as exc:
+        raise JobError(exc.detail)
+    return import_summary(stats)
 
 
 # ========== Dynamic TestCase Endpoints ==========
@@ -626,14 +847,25 @@ async def import_testcases(
 @router.get("/{testcase_id}", response_model=TestCaseResponse)
 def get_testcase(
     testcase_id: int,
+    request: Request,
+    response: Response,
+    render: Optional[str] = Query(None, pattern=RENDER_PATTERN),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get testcase by ID"""
+    """Get testcase by ID; render=html|text renders precondition, steps, data and results"""
     testcase = db.query(TestCase).filter(TestCase.id == testcase_id).first()
     if not testcase:
         raise HTTPException(status_code=404, detail="TestCase not found")
-    return testcase
+    # The payload also carries category, requirement and sprint briefs, so a
+    # rename (which bumps the project's data version) must change the ETag too
+    versions = get_data_versions(db, [testcase.project_id])
+    not_modified = conditional_response(
+        request, response, testcase.updated_at.isoformat(), versions.get(testcase.project_id)
+    )
+    if not_modified:
+        return not_modified
+    return rendered(testcase, TestCaseResponse, "testcase", render)
 
 
 @router.put("/{testcase_id}", response_model=TestCaseResponse)
@@ -649,12 +881,13 @@ def update_testcase(
         raise HTTPException(status_code=404, detail="TestCase not found")
     
     # Update fields and record history
+    before = capture_stats(testcase)
     update_data = testcase_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         old_value = getattr(testcase, field)
         if old_value != value:
-            old_str = old_value.value if hasattr(old_value, 'value') else str(old_value) if old_value is not None else None
-            new_str = value.value if hasattr(value, 'value') else str(value) if value is not None else None
+            old_str = history_value(old_value)
+            new_str = history_value(value)
             history_entry = TestCaseHistory(
                 testcase_id=testcase_id,
                 field=field,
@@ -665,8 +898,11 @@ def update_testcase(
             db.add(history_entry)
         setattr(testcase, field, value)
     
+    apply_stats_change(db, before, capture_stats(testcase))
+    bump_data_version(db, testcase.project_id)
     db.commit()
     db.refresh(testcase)
+    render_cache.warm(*(getattr(testcase, field) for field in RICH_TEXT_FIELDS["testcase"]))
     
     return testcase
 
@@ -682,23 +918,39 @@ def get_testcase_history(
     if not testcase:
         raise HTTPException(status_code=404, detail="TestCase not found")
 
-    history = db.query(TestCaseHistory).filter(
-        TestCaseHistory.testcase_id == testcase_id
-    ).order_by(desc(TestCaseHistory.changed_at)).all()
+    history = load_history(db, "testcase", testcase_id)
     
+    users = load_users(db, (h["changed_by"] for h in history))
     return [
         {
-            "id": h.id,
-            "field": h.field,
-            "old_value": h.old_value,
-            "new_value": h.new_value,
-            "changed_at": h.changed_at,
-            "user": {"id": h.user.id, "username": h.user.username} if h.user else None
+            "id": h["id"],
+            "field": h["field"],
+            "old_value": h["old_value"],
+            "new_value": h["new_value"],
+            "changed_at": h["changed_at"],
+            "user": users.get(h["changed_by"])
         }
         for h in history
     ]
 
 
+@router.get("/{testcase_id}/activity")
+def get_testcase_activity(
+    testcase_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get testcase history as a keyset-paginated timeline (newest first)"""
+    testcase = db.query(TestCase).filter(TestCase.id == testcase_id).first()
+    if not testcase:
+        raise HTTPException(status_code=404, detail="TestCase not found")
+    check_project_access(db, testcase.project_id, current_user)
+
+    return get_activity(db, entity_type="testcase", entity_id=testcase_id, cursor=cursor, limit=limit)
+
+
 @router.delete("/{testcase_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_testcase(
     testcase_id: int,
@@ -710,6 +962,7 @@ def delete_testcase(
     if not testcase:
         raise HTTPException(status_code=404, detail="TestCase not found")
     
-    db.delete(testcase)
+    soft_delete(db, [testcase], current_user.id)
+    bump_data_version(db, testcase.project_id)
     db.commit()
     return None
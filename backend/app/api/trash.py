@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_db
+from app.models.task import Task
+from app.models.testcase import TestCase
+from app.models.user import User
+from app.schemas.trash import TrashPage, TrashRestoreRequest
+from app.services.job_service import JobContext, job_handler
+from app.services.trash_service import (
+    TRASH_MODELS, COMMENT_PARENTS, trash_query, restore, purge_trash, prune_tombstones
+)
+from app.services.version_service import bump_data_version
+from app.utils.dependencies import get_current_user
+from app.utils.permissions import check_project_access
+
+router = APIRouter(prefix="/api/projects", tags=["trash"])
+
+
+def trash_model(trash_type: str):
+    model = TRASH_MODELS.get(trash_type)
+    if model is None:
+        raise HTTPException(status_code=400, detail=f"Invalid trash type: {trash_type}")
+    return model
+
+
+def trash_item(trash_type: str, obj) -> dict:
+    item = {"type": trash_type, "id": obj.id, "deleted_at": obj.deleted_at}
+    if type(obj) in COMMENT_PARENTS:
+        parent_type, parent = COMMENT_PARENTS[type(obj)]
+        item.update(title=obj.content[:100], parent_type=parent_type, parent_id=getattr(obj, f"{parent}_id"))
+    elif isinstance(obj, TestCase):
+        item.update(number=obj.case_number, title=obj.name)
+    else:
+        item.update(number=getattr(obj, f"{trash_type}_number"), title=obj.title)
+        if isinstance(obj, Task):
+            item.update(parent_type="requirement", parent_id=obj.requirement_id)
+    return item
+
+
+@router.get("/{project_id}/trash", response_model=TrashPage)
+def get_trash(
+    project_id: int,
+    type: Optional[str] = Query(None, description="bug / requirement / task / testcase / *_comment，为空时全部"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """回收站：最近删除的在前；随需求/任务一起删除的任务、缺陷不单独列出，恢复时一并恢复"""
+    check_project_access(db, project_id, current_user)
+    types = [type] if type else list(TRASH_MODELS)
+
+    items, counts = [], {}
+    for trash_type in types:
+        model = trash_model(trash_type)
+        query = trash_query(db, model, project_id, roots_only=True)
+        counts[trash_type] = query.count()
+        if counts[trash_type]:
+            rows = query.order_by(model.deleted_at.desc(), model.id.desc()).limit(skip + limit).all()
+            items.extend(trash_item(trash_type, row) for row in rows)
+
+    items.sort(key=lambda item: (item["deleted_at"], item["id"]), reverse=True)
+    return {"items": items[skip:skip + limit], "counts": counts}
+
+
+@router.post("/{project_id}/trash/restore")
+def restore_trash(
+    project_id: int,
+    request: TrashRestoreRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """从回收站恢复（需求连同其任务、任务连同其缺陷一起恢复）"""
+    check_project_access(db, project_id, current_user)
+    model = trash_model(request.type)
+    objects = trash_query(db, model, project_id).filter(model.id.in_(request.ids)).all()
+    if not objects:
+        raise HTTPException(status_code=404, detail="Items not found in trash")
+
+    restored = restore(db, objects)
+    bump_data_version(db, project_id)
+    db.commit()
+    return {"restored": len(restored), "message": f"Successfully restored {len(restored)} items"}
+
+
+@router.delete("/{project_id}/trash")
+def empty_trash(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """清空回收站（仅空间创建者），彻底删除后不可恢复"""
+    project = check_project_access(db, project_id, current_user)
+    if project.creator_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Only project creator can empty the trash")
+
+    report = purge_trash(db, datetime.utcnow(), project_id)
+    # Live items may have lost links to purged ones
+    bump_data_version(db, project_id)
+    db.commit()
+    return report
+
+
+@job_handler("trash_purge", max_attempts=1, every=24 * 3600)
+def run_trash_purge(ctx: JobContext):
+    """Purge trash and sync tombstones older than TRASH_RETENTION_DAYS"""
+    before = datetime.utcnow() - timedelta(days=settings.TRASH_RETENTION_DAYS)
+
+    def on_batch(table, done):
+        ctx.progress(done, message=f"正在清理回收站：{table}")
+
+    report = purge_trash(ctx.db, before, on_batch=on_batch)
+    report["deletion_log"] = {"rows": prune_tombstones(ctx.db, before)}
+    return report
@@ -12,9 +12,6 @@ router = APIRouter(prefix="/api/upload", tags=["upload"])
 # 图片存储目录
 UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads", "images")
 
-# 确保目录存在
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 # 允许的图片类型
 ALLOWED_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp"}
 MAX_SIZE = 10 * 1024 * 1024  # 10MB
@@ -43,7 +40,8 @@ async def upload_image(
     filename = f"{date_prefix}_{uuid.uuid4().hex[:8]}.{ext}"
     filepath = os.path.join(UPLOAD_DIR, filename)
     
-    # 保存文件
+    # 保存文件（目录在首次上传时创建，避免导入模块时触碰文件系统）
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
     with open(filepath, "wb") as f:
         f.write(content)
     
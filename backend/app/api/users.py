@@ -1,10 +1,13 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserResponse, UserCreate
+from app.schemas.comment import MentionInboxResponse, MentionReadRequest
+from app.services.mention_service import get_inbox, get_unread_count, mark_read
+from app.utils.comment_utils import invalidate_project_members
 from app.utils.dependencies import get_current_user
 from app.utils.security import get_password_hash
 
@@ -23,6 +26,30 @@ def get_users(
     return users
 
 
+@router.get("/me/mentions", response_model=MentionInboxResponse)
+def get_my_mentions(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    unread_only: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """@我的评论（按时间倒序，游标分页）"""
+    return get_inbox(db, current_user, cursor=cursor, limit=limit, unread_only=unread_only)
+
+
+@router.post("/me/mentions/read")
+def read_my_mentions(
+    data: MentionReadRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """将指定（或全部）提及标记为已读"""
+    marked = mark_read(db, current_user, data.ids)
+    db.commit()
+    return {"marked": marked, "unread_count": get_unread_count(db, current_user)}
+
+
 @router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def create_user(
     user_data: UserCreate,
@@ -70,4 +97,5 @@ def delete_user(
     
     db.delete(user)
     db.commit()
+    invalidate_project_members()
     return None
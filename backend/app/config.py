@@ -6,6 +6,31 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
+    # Read replicas: comma-separated URLs; GET requests read from them
+    DATABASE_REPLICA_URLS: str = ""
+    DATABASE_ROUTE_OVERRIDES: str = ""  # "/api/route/{id}=primary,..." (route templates)
+    REPLICA_STICKY_SECONDS: int = 5  # read-your-writes window after a mutation
+    REPLICA_RETRY_SECONDS: int = 30  # skip a failed replica for this long
+    # SQLite production mode: WAL + pragmas + in-process single-writer lock
+    SQLITE_TUNED: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # in-process list response cache
+    RESPONSE_CACHE_URL: str = ""  # e.g. redis://localhost:6379/0 to share the cache between workers
+    RESPONSE_CACHE_TTL: int = 600  # seconds; only used by the shared backend
+    RENDER_CACHE_MAX_CHARS: int = 32 * 1024 * 1024  # rendered rich-text (render=html|text) LRU
+    RENDER_CACHE_WARM_ON_WRITE: bool = False  # render edited text right after commit instead of on first read
+    # Background jobs: in-process worker threads (0 = run `python3 run_jobs.py` separately)
+    JOB_WORKERS: int = 2
+    JOB_POLL_SECONDS: float = 1.0
+    JOB_RETRY_BASE_SECONDS: int = 10  # backoff doubles per failed attempt
+    JOB_RETRY_MAX_SECONDS: int = 600
+    JOB_STALE_SECONDS: int = 600  # a running job without heartbeat this long is requeued
+    JOB_RETENTION_DAYS: int = 7  # finished jobs (and their files) are removed after this
+    IMPORT_WORKERS: int = 0  # processes parsing Excel sheets in parallel (0 = CPU count, 1 = in-process)
+    # Trash: deleted items can be restored for this long, then a daily job purges them
+    TRASH_RETENTION_DAYS: int = 30
 
     class Config:
         env_file = ".env"
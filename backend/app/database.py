@@ -1,30 +1,55 @@
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.config import settings
+from app.utils.db_routing import ReplicaRouter, RoutingSession
+from app.utils.soft_delete import install_soft_delete_filter
 
-# Create engine based on database type
-if settings.DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        settings.DATABASE_URL, connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(
-        settings.DATABASE_URL,
+IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+
+
+def make_engine(url: str):
+    """Create engine based on database type"""
+    if url.startswith("sqlite"):
+        sqlite_engine = create_engine(url, connect_args={"check_same_thread": False})
+        if settings.SQLITE_TUNED:
+            from app.utils.sqlite import configure_sqlite
+            configure_sqlite(sqlite_engine)
+        return sqlite_engine
+    return create_engine(
+        url,
         pool_pre_ping=True,
         pool_recycle=3600,
     )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+engine = make_engine(settings.DATABASE_URL)
+
+# Optional read replicas (comma-separated URLs); GET requests are routed to them
+replica_engines = [make_engine(url.strip()) for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+replica_router = ReplicaRouter(replica_engines) if replica_engines else None
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+install_soft_delete_filter(SessionLocal)
+
+if IS_SQLITE and settings.SQLITE_TUNED:
+    from app.utils.sqlite import install_write_lock
+    install_write_lock(SessionLocal)
 
 Base = declarative_base()
 
 
-def get_db():
+def get_db(request: Request):
     """Database dependency"""
     db = SessionLocal()
+    if replica_router is not None:
+        replica_router.route(db, request)
     try:
         yield db
     finally:
         db.close()
+        if replica_router is not None:
+            replica_router.finish(request)
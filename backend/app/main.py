@@ -1,37 +1,79 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import auth, projects, bugs, sprints, requirements, tasks, users, upload, testcases
+# Routers are imported inside create_app() so that importing this module (e.g.
+# from alembic, seed scripts or `uvicorn --factory`) stays cheap; the module
+# level ``app`` is built on first access for `uvicorn app.main:app`.
+ROUTERS = ("auth", "projects", "bugs", "sprints", "requirements", "tasks", "users", "upload", "testcases", "comments", "jobs", "trash")
+
+
+def create_app() -> FastAPI:
+    """Build the FastAPI application"""
+    app = FastAPI(title="TAPB - Bug Management System", lifespan=lifespan)
+
+    # CORS configuration
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173", "http://localhost:5174", "http://localhost:5175", "http://localhost:5176"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["ETag"],
+    )
+
+    @app.get("/")
+    def read_root():
+        return {"message": "Welcome to TAPB API"}
+
+    @app.get("/health")
+    def health_check():
+        return {"status": "healthy"}
+
+    @app.get("/health/cache")
+    def cache_stats():
+        """Response cache hit/miss counters and memory usage"""
+        from app.utils.response_cache import response_cache
+        return response_cache.stats()
+
+    @app.get("/health/render-cache")
+    def render_cache_stats():
+        """Rich-text render cache hit/miss counters and size"""
+        from app.utils.render_cache import render_cache
+        return render_cache.stats()
+
+    include_routers(app)
+    return app
 
-app = FastAPI(title="TAPB - Bug Management System")
 
-# CORS configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://localhost:5174", "http://localhost:5175", "http://localhost:5176"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background job workers inside the API process unless JOB_WORKERS=0"""
+    from app.config import settings
 
+    pool = None
+    if settings.JOB_WORKERS > 0:
+        from app.services.job_service import JobWorkerPool
+        pool = JobWorkerPool(settings.JOB_WORKERS)
+        pool.start()
+    yield
+    if pool is not None:
+        pool.stop()
 
-@app.get("/")
-def read_root():
-    return {"message": "Welcome to TAPB API"}
 
+def include_routers(app: FastAPI) -> None:
+    """Register routers"""
+    import importlib
 
-@app.get("/health")
-def health_check():
-    return {"status": "healthy"}
+    for name in ROUTERS:
+        module = importlib.import_module(f"app.api.{name}")
+        app.include_router(module.router)
 
 
-# Register routers
-app.include_router(auth.router)
-app.include_router(projects.router)
-app.include_router(bugs.router)
-app.include_router(sprints.router)
-app.include_router(requirements.router)
-app.include_router(tasks.router)
-app.include_router(users.router)
-app.include_router(upload.router)
-app.include_router(testcases.router)
+def __getattr__(name: str):
+    # Lazily build the default application on first access (PEP 562)
+    if name == "app":
+        application = globals()["app"] = create_app()
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
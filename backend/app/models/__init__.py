@@ -1,6 +1,6 @@
 from app.models.user import User, UserRole
-from app.models.project import Project, ProjectMember
-from app.models.sprint import Sprint, SprintStatus
+from app.models.project import Project, ProjectMember, ProjectCounter
+from app.models.sprint import Sprint, SprintStatus, SprintDailyStat
 from app.models.requirement import (
     Requirement,
     RequirementCategory,
@@ -10,7 +10,7 @@ from app.models.requirement import (
 )
 from app.models.task import Task, TaskStatus, TaskPriority
 from app.models.bug import Bug, BugStatus, BugPriority, BugSeverity, BugHistory
-from app.models.comment import BugComment, RequirementComment, TaskComment
+from app.models.comment import BugComment, RequirementComment, TaskComment, CommentMention
 from app.models.testcase import (
     TestCase,
     TestCaseCategory,
@@ -18,14 +18,19 @@ from app.models.testcase import (
     TestCaseStatus,
     TestCasePriority,
 )
+from app.models.sync import DeletionLog
+from app.models.history import HistoryField, HistoryArchive
+from app.models.job import Job, JobStatus
 
 __all__ = [
     "User",
     "UserRole",
     "Project",
     "ProjectMember",
+    "ProjectCounter",
     "Sprint",
     "SprintStatus",
+    "SprintDailyStat",
     "Requirement",
     "RequirementCategory",
     "RequirementStatus",
@@ -42,9 +47,15 @@ __all__ = [
     "BugComment",
     "RequirementComment",
     "TaskComment",
+    "CommentMention",
     "TestCase",
     "TestCaseCategory",
     "TestCaseType",
     "TestCaseStatus",
     "TestCasePriority",
+    "DeletionLog",
+    "HistoryField",
+    "HistoryArchive",
+    "Job",
+    "JobStatus",
 ]
@@ -1,10 +1,11 @@
 from datetime import datetime
 import enum
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.utils.soft_delete import SoftDeleteMixin
 
 
 class BugStatus(str, enum.Enum):
@@ -50,7 +51,7 @@ class BugCause(str, enum.Enum):
     OTHER = "other"                     # 其他
 
 
-class Bug(Base):
+class Bug(SoftDeleteMixin, Base):
     __tablename__ = "bugs"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -83,6 +84,12 @@ class Bug(Base):
     comments = relationship("BugComment", back_populates="bug", cascade="all, delete-orphan")
     history = relationship("BugHistory", back_populates="bug", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_bugs_project_id_updated_at", "project_id", "updated_at"),
+        Index("ix_bugs_project_id_deleted_at_created_at", "project_id", "deleted_at", "created_at"),
+        Index("ix_bugs_deleted_at", "deleted_at"),
+    )
+
 
 class BugHistory(Base):
     __tablename__ = "bug_history"
@@ -95,6 +102,10 @@ class BugHistory(Base):
     changed_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("ix_bug_history_bug_id_changed_at", "bug_id", "changed_at"),
+    )
+
     # Relationships
     bug = relationship("Bug", back_populates="history")
     user = relationship("User")
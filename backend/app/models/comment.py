@@ -1,12 +1,13 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.utils.soft_delete import SoftDeleteMixin
 
 
-class BugComment(Base):
+class BugComment(SoftDeleteMixin, Base):
     __tablename__ = "bug_comments"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -17,12 +18,17 @@ class BugComment(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("ix_bug_comments_bug_id_created_at", "bug_id", "created_at"),
+        Index("ix_bug_comments_deleted_at", "deleted_at"),
+    )
+
     # Relationships
     bug = relationship("Bug", back_populates="comments")
     user = relationship("User", back_populates="comments")
 
 
-class RequirementComment(Base):
+class RequirementComment(SoftDeleteMixin, Base):
     __tablename__ = "requirement_comments"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -32,12 +38,17 @@ class RequirementComment(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("ix_requirement_comments_requirement_id_created_at", "requirement_id", "created_at"),
+        Index("ix_requirement_comments_deleted_at", "deleted_at"),
+    )
+
     # Relationships
     requirement = relationship("Requirement", back_populates="comments")
     user = relationship("User", back_populates="requirement_comments")
 
 
-class TaskComment(Base):
+class TaskComment(SoftDeleteMixin, Base):
     __tablename__ = "task_comments"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -47,6 +58,33 @@ class TaskComment(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("ix_task_comments_task_id_created_at", "task_id", "created_at"),
+        Index("ix_task_comments_deleted_at", "deleted_at"),
+    )
+
     # Relationships
     task = relationship("Task", back_populates="comments")
     user = relationship("User", back_populates="task_comments")
+
+
+class CommentMention(Base):
+    """评论 @ 提及索引（缺陷/需求/任务评论共用）"""
+    __tablename__ = "comment_mentions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)  # 被提及的用户
+    entity_type = Column(String(20), nullable=False)  # bug / requirement / task
+    entity_id = Column(Integer, nullable=False)
+    comment_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, nullable=False)
+    mentioned_by = Column(Integer, nullable=False)  # 评论作者
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    read_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("entity_type", "comment_id", "user_id", name="uq_comment_mentions_key"),
+        Index("ix_comment_mentions_user_id_id", "user_id", "id"),
+        Index("ix_comment_mentions_user_id_read_at", "user_id", "read_at"),
+    )
+
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, Index
+
+from app.database import Base
+
+
+class HistoryField(Base):
+    """历史字段名字典（归档数据中以整数编码代替重复的字段名）"""
+    __tablename__ = "history_fields"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), nullable=False, unique=True)
+
+
+class HistoryArchive(Base):
+    """归档的操作历史：每行是一个实体一段时间内的历史记录，压缩存储"""
+    __tablename__ = "history_archive"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String(20), nullable=False)  # bug / requirement / task / testcase
+    entity_id = Column(Integer, nullable=False)  # No FK: rows are cleaned up by the archive job
+    first_at = Column(DateTime, nullable=False)
+    last_at = Column(DateTime, nullable=False)
+    row_count = Column(Integer, nullable=False)
+    # zlib-compressed JSON: [[id, field_code, old_value, new_value, changed_by, changed_at_micros], ...]
+    payload = Column(LargeBinary(length=2 ** 24), nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_history_archive_entity_type_entity_id_last_at", "entity_type", "entity_id", "last_at"),
+    )
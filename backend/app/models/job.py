@@ -0,0 +1,54 @@
+from datetime import datetime
+import enum
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Enum, JSON, LargeBinary, Index
+
+from app.database import Base
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Job(Base):
+    """后台任务（导入、导出、删除空间等耗时操作）"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)  # Handler name, see job_service.job_handler
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    project_id = Column(Integer, nullable=True)  # No FK: a project delete job outlives its project
+    created_by = Column(Integer, nullable=True)
+    params = Column(JSON, default=dict, nullable=False)
+    input_data = Column(LargeBinary(length=2 ** 32 - 1), nullable=True)  # e.g. an uploaded Excel file
+
+    # Progress: done / total plus the handler's resume point, committed with each batch
+    progress_done = Column(Integer, default=0, nullable=False)
+    progress_total = Column(Integer, nullable=True)
+    message = Column(String(255), nullable=True)
+    checkpoint = Column(JSON, nullable=True)
+
+    result = Column(JSON, nullable=True)
+    output_data = Column(LargeBinary(length=2 ** 32 - 1), nullable=True)  # e.g. an exported Excel file
+    output_name = Column(String(255), nullable=True)
+    error = Column(Text, nullable=True)
+
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)  # Retry backoff
+    cancel_requested = Column(Boolean, default=False, nullable=False)
+    worker_id = Column(String(64), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        Index("ix_jobs_created_by_id", "created_by", "id"),
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -19,6 +19,9 @@ class Project(Base):
     task_seq = Column(Integer, default=0, nullable=False)  # Task sequence counter
     testcase_seq = Column(Integer, default=0, nullable=False)  # TestCase sequence counter
     sprint_seq = Column(Integer, default=0, nullable=False)  # Sprint sequence counter
+    counters_since = Column(DateTime, nullable=True)  # When dashboard counters were built; NULL = needs rebuild
+    data_version = Column(Integer, default=0, nullable=False)  # Bumped by every mutation of project data
+    tombstone_floor = Column(Integer, default=0, nullable=False)  # Highest purged deletion_log id; older sync tokens need a full sync
     creator_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -32,6 +35,7 @@ class Project(Base):
     testcases = relationship("TestCase", back_populates="project", cascade="all, delete-orphan")
     testcase_categories = relationship("TestCaseCategory", back_populates="project", cascade="all, delete-orphan")
     requirement_categories = relationship("RequirementCategory", back_populates="project", cascade="all, delete-orphan")
+    counters = relationship("ProjectCounter", back_populates="project", cascade="all, delete-orphan")
 
 
 class ProjectMember(Base):
@@ -45,3 +49,21 @@ class ProjectMember(Base):
     # Relationships
     project = relationship("Project", back_populates="members")
     user = relationship("User")
+
+
+class ProjectCounter(Base):
+    """项目看板计数：按 (实体类型, 维度, 取值) 增量维护的数量"""
+    __tablename__ = "project_counters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    entity = Column(String(20), nullable=False)     # bug / requirement / task / testcase
+    dimension = Column(String(30), nullable=False)  # status / priority / severity / assignee / type
+    value = Column(String(50), nullable=False)
+    count = Column(Integer, default=0, nullable=False)
+
+    project = relationship("Project", back_populates="counters")
+
+    __table_args__ = (
+        UniqueConstraint("project_id", "entity", "dimension", "value", name="uq_project_counters_key"),
+    )
@@ -10,10 +10,12 @@ from sqlalchemy import (
     Date,
     Enum,
     ForeignKey,
+    Index,
 )
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.utils.soft_delete import SoftDeleteMixin
 
 
 class RequirementStatus(str, enum.Enum):
@@ -39,16 +41,22 @@ class RequirementCategory(Base):
     parent_id = Column(Integer, ForeignKey("requirement_categories.id"), nullable=True)
     name = Column(String(100), nullable=False)
     order = Column(Integer, default=0, nullable=False)
+    path = Column(String(255), nullable=True)  # 物化路径, e.g. "/3/17/42/"
+    depth = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("ix_requirement_categories_project_id_path", "project_id", "path"),
+    )
+
     # Relationships
     project = relationship("Project", back_populates="requirement_categories")
     parent = relationship("RequirementCategory", remote_side=[id], backref="children")
     requirements = relationship("Requirement", back_populates="category")
 
 
-class Requirement(Base):
+class Requirement(SoftDeleteMixin, Base):
     __tablename__ = "requirements"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -82,6 +90,12 @@ class Requirement(Base):
     comments = relationship("RequirementComment", back_populates="requirement", cascade="all, delete-orphan")
     history = relationship("RequirementHistory", back_populates="requirement", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_requirements_project_id_updated_at", "project_id", "updated_at"),
+        Index("ix_requirements_project_id_deleted_at_created_at", "project_id", "deleted_at", "created_at"),
+        Index("ix_requirements_deleted_at", "deleted_at"),
+    )
+
 
 class RequirementHistory(Base):
     """需求操作历史"""
@@ -95,6 +109,10 @@ class RequirementHistory(Base):
     changed_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("ix_requirement_history_requirement_id_changed_at", "requirement_id", "changed_at"),
+    )
+
     # Relationships
     requirement = relationship("Requirement", back_populates="history")
     user = relationship("User")
@@ -1,7 +1,7 @@
 from datetime import datetime
 import enum
 
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Enum, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -24,9 +24,33 @@ class Sprint(Base):
     status = Column(Enum(SprintStatus), default=SprintStatus.PLANNING, nullable=False)
     start_date = Column(Date)
     end_date = Column(Date)
+    stats_since = Column(Date, nullable=True)  # Date analytics started tracking; NULL = needs rebuild
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     project = relationship("Project", back_populates="sprints")
     requirements = relationship("Requirement", back_populates="sprint")
     bugs = relationship("Bug", back_populates="sprint", cascade="all, delete-orphan")
+    daily_stats = relationship("SprintDailyStat", back_populates="sprint", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_sprints_project_id_updated_at", "project_id", "updated_at"),
+    )
+
+
+class SprintDailyStat(Base):
+    """迭代每日统计：某天内 (实体类型, 状态) 数量的净变化，累加即得当天的数量"""
+    __tablename__ = "sprint_daily_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sprint_id = Column(Integer, ForeignKey("sprints.id", ondelete="CASCADE"), nullable=False)
+    stat_date = Column(Date, nullable=False)
+    entity = Column(String(20), nullable=False)  # requirement / task / bug / testcase
+    status = Column(String(20), nullable=False)
+    delta = Column(Integer, default=0, nullable=False)
+
+    sprint = relationship("Sprint", back_populates="daily_stats")
+
+    __table_args__ = (
+        UniqueConstraint("sprint_id", "stat_date", "entity", "status", name="uq_sprint_daily_stats_key"),
+    )
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, Index
+
+from app.database import Base
+
+
+class DeletionLog(Base):
+    """删除记录（供增量同步下发墓碑）"""
+    __tablename__ = "deletion_log"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, nullable=False)  # No FK: entries outlive the deleted rows
+    entity_type = Column(String(20), nullable=False)  # bug / requirement / task / testcase / sprint
+    entity_id = Column(Integer, nullable=False)
+    entity_number = Column(String(50), nullable=True)
+    deleted_by = Column(Integer, nullable=True)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_deletion_log_project_id_id", "project_id", "id"),
+    )
@@ -10,10 +10,12 @@ from sqlalchemy import (
     Date,
     Enum,
     ForeignKey,
+    Index,
 )
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.utils.soft_delete import SoftDeleteMixin
 
 
 class TaskStatus(str, enum.Enum):
@@ -28,7 +30,7 @@ class TaskPriority(str, enum.Enum):
     LOW = "low"
 
 
-class Task(Base):
+class Task(SoftDeleteMixin, Base):
     __tablename__ = "tasks"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -56,6 +58,12 @@ class Task(Base):
     comments = relationship("TaskComment", back_populates="task", cascade="all, delete-orphan")
     history = relationship("TaskHistory", back_populates="task", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_tasks_requirement_id_updated_at", "requirement_id", "updated_at"),
+        Index("ix_tasks_requirement_id_deleted_at", "requirement_id", "deleted_at"),
+        Index("ix_tasks_deleted_at", "deleted_at"),
+    )
+
 
 class TaskHistory(Base):
     """任务操作历史"""
@@ -69,5 +77,9 @@ class TaskHistory(Base):
     changed_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("ix_task_history_task_id_changed_at", "task_id", "changed_at"),
+    )
+
     task = relationship("Task", back_populates="history")
     user = relationship("User")
@@ -1,10 +1,11 @@
 from datetime import datetime
 import enum
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.utils.soft_delete import SoftDeleteMixin
 
 
 class TestCaseType(str, enum.Enum):
@@ -37,16 +38,22 @@ class TestCaseCategory(Base):
     parent_id = Column(Integer, ForeignKey("testcase_categories.id"), nullable=True)
     name = Column(String(100), nullable=False)
     order = Column(Integer, default=0, nullable=False)
+    path = Column(String(255), nullable=True)  # 物化路径, e.g. "/3/17/42/"
+    depth = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("ix_testcase_categories_project_id_path", "project_id", "path"),
+    )
+
     # Relationships
     project = relationship("Project", back_populates="testcase_categories")
     parent = relationship("TestCaseCategory", remote_side=[id], backref="children")
     testcases = relationship("TestCase", back_populates="category")
 
 
-class TestCase(Base):
+class TestCase(SoftDeleteMixin, Base):
     """测试用例"""
     __tablename__ = "testcases"
 
@@ -80,6 +87,12 @@ class TestCase(Base):
     history = relationship("TestCaseHistory", back_populates="testcase", cascade="all, delete-orphan")
     bugs = relationship("Bug", back_populates="testcase")
 
+    __table_args__ = (
+        Index("ix_testcases_project_id_updated_at", "project_id", "updated_at"),
+        Index("ix_testcases_project_id_deleted_at_created_at", "project_id", "deleted_at", "created_at"),
+        Index("ix_testcases_deleted_at", "deleted_at"),
+    )
+
 
 class TestCaseHistory(Base):
     """测试用例操作历史"""
@@ -93,5 +106,9 @@ class TestCaseHistory(Base):
     changed_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index("ix_testcase_history_testcase_id_changed_at", "testcase_id", "changed_at"),
+    )
+
     testcase = relationship("TestCase", back_populates="history")
     user = relationship("User")
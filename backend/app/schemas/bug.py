@@ -102,6 +102,10 @@ class BugBatchAssignUpdate(BugBatchRequest):
     assignee_id: int
 
 
+class BugBulkCreate(BaseModel):
+    items: List[BugCreate]
+
+
 class RequirementBrief(BaseModel):
     id: int
     requirement_number: str
@@ -0,0 +1,29 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class BulkCreateResult(BaseModel):
+    index: int  # Position in the request's items
+    id: Optional[int] = None
+    number: Optional[str] = None
+    error: Optional[str] = None  # Set when the item was not created
+
+
+class BulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkCreateResult]
+
+
+class BulkFieldChange(BaseModel):
+    new: Optional[str] = None
+    old: Dict[str, int]  # Previous value -> number of items changed from it
+
+
+class BulkUpdateResponse(BaseModel):
+    requested: int
+    updated: int
+    unchanged: int  # Already had the requested values
+    skipped: Dict[str, int]  # Reason -> number of items
+    changes: Dict[str, BulkFieldChange]
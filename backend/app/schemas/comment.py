@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -65,3 +65,63 @@ class TaskCommentResponse(CommentBase):
 class CommentListResponse(BaseModel):
     items: List[CommentResponse]
     total: int
+
+
+class CommentPage(BaseModel):
+    items: List[CommentResponse]
+    next_cursor: Optional[str] = None  # 传入 cursor 加载更早的评论
+    latest_cursor: Optional[str] = None  # 传入 since 轮询新评论
+    has_more: bool
+
+
+class RequirementCommentPage(BaseModel):
+    items: List[RequirementCommentResponse]
+    next_cursor: Optional[str] = None
+    latest_cursor: Optional[str] = None
+    has_more: bool
+
+
+class TaskCommentPage(BaseModel):
+    items: List[TaskCommentResponse]
+    next_cursor: Optional[str] = None
+    latest_cursor: Optional[str] = None
+    has_more: bool
+
+
+class CommentCount(BaseModel):
+    count: int
+    last_comment_at: Optional[datetime] = None
+
+
+class CommentCountsResponse(BaseModel):
+    entity_type: str
+    counts: Dict[int, CommentCount]
+
+
+class MentionAuthor(BaseModel):
+    id: int
+    username: str
+
+
+class MentionItem(BaseModel):
+    id: int
+    entity_type: str
+    entity_id: int
+    entity_number: Optional[str] = None
+    project_id: int
+    comment_id: int
+    content: str
+    mentioned_by: Optional[MentionAuthor] = None
+    created_at: datetime
+    read: bool
+
+
+class MentionInboxResponse(BaseModel):
+    items: List[MentionItem]
+    next_cursor: Optional[str] = None
+    has_more: bool
+    unread_count: int
+
+
+class MentionReadRequest(BaseModel):
+    ids: Optional[List[int]] = None  # 为空时全部标记为已读
@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Optional, Any
+
+from pydantic import BaseModel
+
+from app.models.job import JobStatus
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    project_id: Optional[int] = None
+    progress_done: int
+    progress_total: Optional[int] = None
+    message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    output_name: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    run_after: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -25,6 +25,7 @@ class ProjectResponse(ProjectBase):
     bug_seq: int
     requirement_seq: int
     creator_id: int
+    data_version: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -32,6 +33,11 @@ class ProjectResponse(ProjectBase):
         from_attributes = True
 
 
+class ProjectVersionResponse(BaseModel):
+    project_id: int
+    data_version: int
+
+
 class ProjectMemberBase(BaseModel):
     user_id: int
     role: str
@@ -133,6 +133,15 @@ class BulkSprintUpdateRequest(BaseModel):
     sprint_id: Optional[int] = None  # None 表示取消关联
 
 
+class BulkCreateRequest(BaseModel):
+    items: List[RequirementCreate]
+
+
+class BulkUpdateRequest(BaseModel):
+    ids: List[int]
+    changes: RequirementUpdate  # sprint_id 0 表示取消关联
+
+
 # ========== Category Schemas ==========
 
 class CategoryCreate(BaseModel):
@@ -158,3 +167,32 @@ class CategoryResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CategoryTreeNode(BaseModel):
+    id: int
+    name: str
+    parent_id: Optional[int] = None
+    order: int
+    depth: int
+    direct_count: int
+    subtree_count: int
+    children: List["CategoryTreeNode"] = []
+
+
+class CategoryTreeResponse(BaseModel):
+    items: List[CategoryTreeNode]
+    uncategorized_count: int
+    total: int
+
+
+class CategoryCount(BaseModel):
+    id: int
+    direct_count: int
+    subtree_count: int
+
+
+class CategoryCountsResponse(BaseModel):
+    items: List[CategoryCount]
+    uncategorized_count: int
+    total: int
@@ -24,6 +24,14 @@ class TaskCreate(TaskBase):
     end_date: Optional[date] = None
 
 
+class TaskBulkCreateItem(TaskCreate):
+    requirement_id: int
+
+
+class TaskBulkCreate(BaseModel):
+    items: List[TaskBulkCreateItem]
+
+
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -36,6 +44,11 @@ class TaskUpdate(BaseModel):
     end_date: Optional[date] = None
 
 
+class TaskBulkUpdate(BaseModel):
+    ids: List[int]
+    changes: TaskUpdate
+
+
 class UserBrief(BaseModel):
     id: int
     username: str
@@ -35,6 +35,35 @@ class CategoryResponse(CategoryBase):
         from_attributes = True
 
 
+class CategoryTreeNode(BaseModel):
+    id: int
+    name: str
+    parent_id: Optional[int] = None
+    order: int
+    depth: int
+    direct_count: int
+    subtree_count: int
+    children: List["CategoryTreeNode"] = []
+
+
+class CategoryTreeResponse(BaseModel):
+    items: List[CategoryTreeNode]
+    uncategorized_count: int
+    total: int
+
+
+class CategoryCount(BaseModel):
+    id: int
+    direct_count: int
+    subtree_count: int
+
+
+class CategoryCountsResponse(BaseModel):
+    items: List[CategoryCount]
+    uncategorized_count: int
+    total: int
+
+
 # ========== TestCase Schemas ==========
 
 class TestCaseBase(BaseModel):
@@ -144,3 +173,12 @@ class TestCaseListResponse(BaseModel):
 
 class TestCaseBatchDeleteRequest(BaseModel):
     ids: List[int]
+
+
+class TestCaseBulkCreate(BaseModel):
+    items: List[TestCaseCreate]
+
+
+class TestCaseBulkUpdate(BaseModel):
+    ids: List[int]
+    changes: TestCaseUpdate
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class TrashItem(BaseModel):
+    type: str  # bug / requirement / task / testcase / bug_comment / requirement_comment / task_comment
+    id: int
+    number: Optional[str] = None
+    title: str
+    deleted_at: datetime
+    parent_type: Optional[str] = None  # Comments and tasks: the item they belong to
+    parent_id: Optional[int] = None
+
+
+class TrashPage(BaseModel):
+    items: List[TrashItem]
+    counts: Dict[str, int]
+
+
+class TrashRestoreRequest(BaseModel):
+    type: str
+    ids: List[int]
@@ -0,0 +1,188 @@
+import heapq
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, literal, or_
+from sqlalchemy.orm import Session
+
+from app.models.bug import Bug, BugHistory
+from app.models.requirement import Requirement, RequirementHistory
+from app.models.task import Task, TaskHistory
+from app.models.testcase import TestCase, TestCaseHistory
+from app.models.comment import BugComment, RequirementComment, TaskComment
+from app.models.user import User
+from app.services.history_service import load_archived_history
+
+EPOCH = datetime(1970, 1, 1)
+
+# (kind, entity_type, row model, entity fk, time column, entity model, entity number column)
+# The position in this tuple is the tie-breaker rank between rows with the same timestamp.
+SOURCES = (
+    ("history", "bug", BugHistory, BugHistory.bug_id, BugHistory.changed_at, Bug, Bug.bug_number),
+    ("comment", "bug", BugComment, BugComment.bug_id, BugComment.created_at, Bug, Bug.bug_number),
+    ("history", "requirement", RequirementHistory, RequirementHistory.requirement_id,
+     RequirementHistory.changed_at, Requirement, Requirement.requirement_number),
+    ("comment", "requirement", RequirementComment, RequirementComment.requirement_id,
+     RequirementComment.created_at, Requirement, Requirement.requirement_number),
+    ("history", "task", TaskHistory, TaskHistory.task_id, TaskHistory.changed_at, Task, Task.task_number),
+    ("comment", "task", TaskComment, TaskComment.task_id, TaskComment.created_at, Task, Task.task_number),
+    ("history", "testcase", TestCaseHistory, TestCaseHistory.testcase_id,
+     TestCaseHistory.changed_at, TestCase, TestCase.case_number),
+)
+
+ENTITY_TYPES = ("bug", "requirement", "task", "testcase")
+
+# An archived history row, shaped like the rows of _source_query
+ArchivedRow = namedtuple(
+    "ArchivedRow", "id entity_id entity_number at user_id field old_value new_value content"
+)
+
+
+# ========== Users ==========
+
+def load_users(db: Session, user_ids: Iterable[int]) -> Dict[int, dict]:
+    """Resolve user ids to {id, username} with a single query"""
+    ids = {user_id for user_id in user_ids if user_id}
+    if not ids:
+        return {}
+    rows = db.query(User.id, User.username).filter(User.id.in_(ids)).all()
+    return {user_id: {"id": user_id, "username": username} for user_id, username in rows}
+
+
+# ========== Cursor ==========
+
+def encode_cursor(at: datetime, rank: int, row_id: int) -> str:
+    micros = (at - EPOCH) // timedelta(microseconds=1)
+    return f"{micros}.{rank}.{row_id}"
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Tuple[datetime, int, int]]:
+    if not token:
+        return None
+    try:
+        micros, rank, row_id = token.split(".")
+        return EPOCH + timedelta(microseconds=int(micros)), int(rank), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _before_cursor(rank: int, model, time_col, cursor: Tuple[datetime, int, int]):
+    """Rows ordered after the cursor in (time desc, rank desc, id desc) order"""
+    at, cursor_rank, row_id = cursor
+    if rank < cursor_rank:
+        return time_col <= at
+    if rank > cursor_rank:
+        return time_col < at
+    return or_(time_col < at, and_(time_col == at, model.id < row_id))
+
+
+# ========== Timeline ==========
+
+def _source_query(db: Session, source, rank: int, project_id: Optional[int],
+                  entity_id: Optional[int], cursor, limit: int):
+    kind, entity_type, model, fk, time_col, entity_model, number_col = source
+    if kind == "history":
+        user_col, detail = model.changed_by, (model.field, model.old_value, model.new_value,
+                                              literal(None).label("content"))
+    else:
+        user_col, detail = model.user_id, (literal(None).label("field"), literal(None).label("old_value"),
+                                           literal(None).label("new_value"), model.content)
+
+    query = db.query(
+        model.id.label("id"), fk.label("entity_id"), number_col.label("entity_number"),
+        time_col.label("at"), user_col.label("user_id"), *detail
+    ).join(entity_model, fk == entity_model.id)
+
+    if entity_id is not None:
+        query = query.filter(fk == entity_id)
+    if project_id is not None:
+        if entity_model is Task:
+            query = query.join(Requirement, Task.requirement_id == Requirement.id).filter(
+                Requirement.project_id == project_id
+            )
+        else:
+            query = query.filter(entity_model.project_id == project_id)
+    if cursor is not None:
+        query = query.filter(_before_cursor(rank, model, time_col, cursor))
+
+    return query.order_by(time_col.desc(), model.id.desc()).limit(limit)
+
+
+def _archived_rows(db: Session, source, rank: int, entity_id: int, cursor, limit: int) -> List[ArchivedRow]:
+    """One entity's archived history past the cursor, newest first, like _source_query"""
+    _, entity_type, _, _, _, entity_model, number_col = source
+    rows = load_archived_history(db, entity_type, entity_id, cursor[0] if cursor else None)
+    if cursor is not None:
+        # (at, rank, id) sorts before the cursor exactly when _before_cursor holds
+        rows = [row for row in rows if (row["changed_at"], rank, row["id"]) < cursor]
+    if not rows:
+        return []
+    rows.sort(key=lambda row: (row["changed_at"], row["id"]), reverse=True)
+    number = db.query(number_col).filter(entity_model.id == entity_id).scalar()
+    return [
+        ArchivedRow(row["id"], entity_id, number, row["changed_at"], row["changed_by"],
+                    row["field"], row["old_value"], row["new_value"], None)
+        for row in rows[:limit]
+    ]
+
+
+def get_activity(
+    db: Session,
+    project_id: Optional[int] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    kinds: Optional[List[str]] = None,
+) -> dict:
+    """
+    Merge history and comments into one stream, newest first.
+
+    Each source returns at most ``limit + 1`` rows past the cursor from its
+    (entity_id, time) index; the streams are merged in memory and users are
+    resolved with one batched query. A single entity's timeline also merges
+    its archived history (see history_service.archive_history); project
+    feeds only show what is still in the history tables.
+    """
+    position = decode_cursor(cursor)
+
+    streams = []
+    for rank, source in enumerate(SOURCES):
+        kind, source_entity = source[0], source[1]
+        if entity_type and source_entity != entity_type:
+            continue
+        if kinds and kind not in kinds:
+            continue
+        rows = _source_query(db, source, rank, project_id, entity_id, position, limit + 1).all()
+        streams.append([((row.at, rank, row.id), kind, source_entity, row) for row in rows])
+        if kind == "history" and entity_id is not None:
+            archived = _archived_rows(db, source, rank, entity_id, position, limit + 1)
+            streams.append([((row.at, rank, row.id), kind, source_entity, row) for row in archived])
+
+    merged = heapq.merge(*streams, key=lambda item: item[0], reverse=True)
+    page = [item for _, item in zip(range(limit + 1), merged)]
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    users = load_users(db, (row.user_id for _, _, _, row in page))
+    items = []
+    for _, kind, source_entity, row in page:
+        item = {
+            "type": kind,
+            "entity_type": source_entity,
+            "entity_id": row.entity_id,
+            "entity_number": row.entity_number,
+            "id": row.id,
+            "at": row.at.isoformat(),
+            "user": users.get(row.user_id),
+        }
+        if kind == "history":
+            item.update(field=row.field, old_value=row.old_value, new_value=row.new_value)
+        else:
+            item["content"] = row.content
+        items.append(item)
+
+    next_cursor = encode_cursor(*page[-1][0]) if has_more else None
+    return {"items": items, "next_cursor": next_cursor, "has_more": has_more}
@@ -5,6 +5,7 @@ from app.models.user import User
 from app.models.project import Project, ProjectMember
 from app.models.bug import Bug, BugStatus, BugPriority, BugSeverity
 from app.schemas.user import UserCreate
+from app.services.sequence_service import reserve_numbers
 from app.utils.security import get_password_hash, verify_password, create_access_token
 
 
@@ -88,10 +89,8 @@ def _create_default_project_and_bugs(db: Session, user: User) -> None:
     ]
     
     # Create sample bugs
-    for i, bug_data in enumerate(sample_bugs, 1):
-        project.bug_seq = i
-        bug_number = f"{project.key}-{str(i).zfill(3)}"
-        
+    bug_numbers = reserve_numbers(db, project.id, "bug", len(sample_bugs))
+    for bug_number, bug_data in zip(bug_numbers, sample_bugs):
         bug = Bug(
             project_id=project.id,
             bug_number=bug_number,
@@ -5,19 +5,18 @@ from app.models.bug import Bug, BugStatus, BugHistory, BugEnvironment, BugCause
 from app.models.project import Project
 from app.models.user import User
 from app.schemas.bug import BugCreate, BugUpdate
-
-
-def generate_bug_number(bug_id: int) -> str:
-    """Generate bug number using database ID (e.g., B1, B2, ...)"""
-    return f"B{bug_id}"
+from app.services.stats_service import capture_stats, apply_stats_change
+from app.services.version_service import bump_data_version
+from app.services.history_service import history_value
+from app.services.sequence_service import next_number
+from app.utils.render_cache import render_cache
 
 
 def create_bug(db: Session, bug_data: BugCreate, creator: User) -> Bug:
     """Create a new bug"""
-    # Create bug with placeholder number first
     bug = Bug(
         project_id=bug_data.project_id,
-        bug_number="TEMP",  # Will be updated after getting ID
+        bug_number=next_number(db, bug_data.project_id, "bug"),
         title=bug_data.title,
         description=bug_data.description,
         priority=bug_data.priority,
@@ -32,16 +31,15 @@ def create_bug(db: Session, bug_data: BugCreate, creator: User) -> Bug:
         status=BugStatus.NEW
     )
     db.add(bug)
-    db.flush()  # Get the ID
+    apply_stats_change(db, None, capture_stats(bug))
     
-    # Update bug number using the database ID
-    bug.bug_number = generate_bug_number(bug.id)
+    # Create history record (inserted with the bug, no flush needed for its id)
+    bug.history.append(BugHistory(field="status", new_value=BugStatus.NEW.value, changed_by=creator.id))
+    bump_data_version(db, bug.project_id)
     
     db.commit()
     db.refresh(bug)
-    
-    # Create history record
-    create_history(db, bug.id, "status", None, BugStatus.NEW.value, creator.id)
+    render_cache.warm(bug.description)
     
     return bug
 
@@ -52,6 +50,8 @@ def update_bug(db: Session, bug_id: int, bug_data: BugUpdate, user: User) -> Bug
     if not bug:
         raise HTTPException(status_code=404, detail="Bug not found")
     
+    before = capture_stats(bug)
+    
     # Get actually provided fields
     provided_fields = bug_data.model_dump(exclude_unset=True)
     
@@ -113,24 +113,28 @@ def update_bug(db: Session, bug_id: int, bug_data: BugUpdate, user: User) -> Bug
         changes.append(("defect_cause", old_cause, bug_data.defect_cause.value))
         bug.defect_cause = bug_data.defect_cause
     
-    db.commit()
-    db.refresh(bug)
+    apply_stats_change(db, before, capture_stats(bug))
     
     # Create history records
     for field, old_val, new_val in changes:
         create_history(db, bug.id, field, old_val, new_val, user.id)
+    if changes:
+        bump_data_version(db, bug.project_id)
+    
+    db.commit()
+    db.refresh(bug)
+    render_cache.warm(bug.description)
     
     return bug
 
 
 def create_history(db: Session, bug_id: int, field: str, old_value: str, new_value: str, user_id: int):
-    """Create bug history record"""
+    """Add a bug history record to the current transaction (caller commits)"""
     history = BugHistory(
         bug_id=bug_id,
         field=field,
-        old_value=old_value,
-        new_value=new_value,
+        old_value=history_value(old_value),
+        new_value=history_value(new_value),
         changed_by=user_id
     )
     db.add(history)
-    db.commit()
@@ -0,0 +1,308 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.bug import Bug, BugStatus, BugHistory
+from app.models.project import Project
+from app.models.requirement import Requirement, RequirementCategory, RequirementStatus
+from app.models.sprint import Sprint
+from app.models.task import Task
+from app.models.testcase import TestCase, TestCaseCategory
+from app.models.user import User
+from app.services.history_service import HISTORY_MODELS, history_value
+from app.services.sequence_service import reserve_numbers
+from app.services.stats_service import build_snapshot, apply_stats_changes, snapshot_columns
+from app.services.version_service import bump_data_version
+from app.utils.permissions import accessible_project_ids
+
+# Bulk create: items are validated a chunk at a time with one lookup per
+# reference type (not one query per item), inserted with multi-row INSERTs
+# and committed per chunk, so a failing item never rolls back the others.
+# Results are reported per item in input order.
+#
+# Bulk update (patch): the same partial update is applied to many ids. Each
+# chunk loads only the columns involved, checks access once per distinct
+# project, runs one UPDATE ... WHERE id IN (...) for the rows that really
+# change and writes their history with one multi-row INSERT.
+
+BULK_CHUNK_ROWS = 500
+BULK_MAX_ITEMS = 5000
+BULK_UPDATE_CHUNK_IDS = 1000
+BULK_UPDATE_MAX_IDS = 20000
+
+# User columns a partial update may set, with the label used in errors
+USER_COLUMNS = {"assignee_id": "Assignee", "developer_id": "Developer", "tester_id": "Tester"}
+
+# entity -> (model, number column, columns taken from the item, column defaults,
+#            references as (column, model, label) that must be in the item's project)
+BULK_ENTITIES = {
+    "bug": (
+        Bug, "bug_number",
+        ("project_id", "title", "description", "priority", "severity", "assignee_id", "sprint_id",
+         "requirement_id", "testcase_id", "environment", "defect_cause"),
+        {"status": BugStatus.NEW},
+        (("sprint_id", Sprint, "Sprint"), ("requirement_id", Requirement, "Requirement"),
+         ("testcase_id", TestCase, "Test case")),
+    ),
+    "requirement": (
+        Requirement, "requirement_number",
+        ("project_id", "sprint_id", "category_id", "title", "description", "priority", "assignee_id"),
+        {"status": RequirementStatus.DRAFT},
+        (("sprint_id", Sprint, "Sprint"), ("category_id", RequirementCategory, "Category")),
+    ),
+    "task": (
+        Task, "task_number",
+        ("requirement_id", "title", "description", "status", "priority", "assignee_id"),
+        {},
+        (),  # The requirement itself decides the project, see _scopes
+    ),
+    "testcase": (
+        TestCase, "case_number",
+        ("project_id", "category_id", "requirement_id", "sprint_id", "name", "module", "feature", "type",
+         "status", "priority", "precondition", "steps", "test_data", "expected_result", "actual_result"),
+        {},
+        (("sprint_id", Sprint, "Sprint"), ("requirement_id", Requirement, "Requirement"),
+         ("category_id", TestCaseCategory, "Category")),
+    ),
+}
+
+
+def _scopes(db: Session, entity: str, rows: List[dict], errors: Dict[int, str]) -> List[Optional[Tuple[int, Optional[int]]]]:
+    """(project_id, sprint_id) of each row; tasks inherit both from their requirement"""
+    if entity != "task":
+        return [(row["project_id"], row.get("sprint_id")) for row in rows]
+
+    parents = {
+        requirement_id: (project_id, sprint_id)
+        for requirement_id, project_id, sprint_id in db.query(
+            Requirement.id, Requirement.project_id, Requirement.sprint_id
+        ).filter(Requirement.id.in_({row["requirement_id"] for row in rows})).all()
+    }
+    scopes = []
+    for index, row in enumerate(rows):
+        scope = parents.get(row["requirement_id"])
+        if scope is None:
+            errors[index] = "Requirement not found"
+        scopes.append(scope)
+    return scopes
+
+
+def _validate(db: Session, entity: str, rows: List[dict], scopes: list, user: User, errors: Dict[int, str]) -> None:
+    allowed = accessible_project_ids(db, {scope[0] for scope in scopes if scope}, user)
+    for index, scope in enumerate(scopes):
+        if index not in errors and scope[0] not in allowed:
+            errors[index] = "Project not found or access denied"
+
+    for column, model, label in BULK_ENTITIES[entity][4]:
+        ids = {row[column] for row in rows if row.get(column)}
+        if not ids:
+            continue
+        owners = dict(db.query(model.id, model.project_id).filter(model.id.in_(ids)).all())
+        for index, row in enumerate(rows):
+            if index in errors or not row.get(column):
+                continue
+            if row[column] not in owners:
+                errors[index] = f"{label} not found"
+            elif owners[row[column]] != scopes[index][0]:
+                errors[index] = f"{label} must belong to the same project"
+
+    assignee_ids = {row["assignee_id"] for row in rows if row.get("assignee_id")}
+    if assignee_ids:
+        existing = {user_id for (user_id,) in db.query(User.id).filter(User.id.in_(assignee_ids)).all()}
+        for index, row in enumerate(rows):
+            if index not in errors and row.get("assignee_id") and row["assignee_id"] not in existing:
+                errors[index] = "Assignee not found"
+
+
+def _create_chunk(db: Session, entity: str, items: List[dict], offset: int, user: User) -> List[dict]:
+    model, number_key, columns, defaults, _ = BULK_ENTITIES[entity]
+    rows = [{**defaults, **{column: item.get(column) for column in columns}, "creator_id": user.id} for item in items]
+
+    errors: Dict[int, str] = {}
+    scopes = _scopes(db, entity, rows, errors)
+    _validate(db, entity, rows, scopes, user, errors)
+
+    valid = [index for index in range(len(rows)) if index not in errors]
+    by_project = defaultdict(list)
+    for index in valid:
+        by_project[scopes[index][0]].append(index)
+    for project_id, indexes in by_project.items():
+        for index, number in zip(indexes, reserve_numbers(db, project_id, entity, len(indexes))):
+            rows[index][number_key] = number
+
+    ids = {}
+    if valid:
+        db.execute(insert(model), [rows[index] for index in valid])
+        # MySQL has no INSERT ... RETURNING; the numbers are unique, so look the ids up by them
+        number_column = getattr(model, number_key)
+        ids = dict(
+            db.query(number_column, model.id).filter(number_column.in_([rows[index][number_key] for index in valid])).all()
+        )
+        if entity == "bug":
+            db.execute(insert(BugHistory), [
+                {"bug_id": ids[rows[index][number_key]], "field": "status",
+                 "new_value": BugStatus.NEW.value, "changed_by": user.id}
+                for index in valid
+            ])
+        apply_stats_changes(db, [
+            (None, build_snapshot(entity, ids[rows[index][number_key]], *scopes[index], rows[index].get))
+            for index in valid
+        ])
+        bump_data_version(db, *by_project)
+        db.commit()
+
+    results = []
+    for index, row in enumerate(rows):
+        if index in errors:
+            results.append({"index": offset + index, "error": errors[index]})
+        else:
+            results.append({"index": offset + index, "id": ids[row[number_key]], "number": row[number_key]})
+    return results
+
+
+def bulk_create(db: Session, entity: str, items: List[dict], user: User) -> dict:
+    """
+    Create many bugs / requirements / tasks / test cases in chunks of BULK_CHUNK_ROWS.
+
+    ``items`` hold the create fields plus project_id (tasks: requirement_id).
+    Returns ``{"created", "failed", "results"}``; each result has the item's
+    index and either its id and number or an error message.
+    """
+    if not items:
+        raise HTTPException(status_code=400, detail="No items provided")
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} items per request")
+
+    results = []
+    for start in range(0, len(items), BULK_CHUNK_ROWS):
+        results.extend(_create_chunk(db, entity, items[start:start + BULK_CHUNK_ROWS], start, user))
+
+    created = sum(1 for result in results if "id" in result)
+    return {"created": created, "failed": len(results) - created, "results": results}
+
+
+# ========== Bulk Update ==========
+
+def _reference_projects(db: Session, entity: str, values: dict) -> Dict[str, Tuple[int, str]]:
+    """{column: (project_id, label)} of the rows the update points to; raises 404 for missing ones"""
+    owners = {}
+    for column, model, label in BULK_ENTITIES[entity][4]:
+        if values.get(column):
+            project_id = db.query(model.project_id).filter(model.id == values[column]).scalar()
+            if project_id is None:
+                raise HTTPException(status_code=404, detail=f"{label} not found")
+            owners[column] = (project_id, label)
+
+    for column, label in USER_COLUMNS.items():
+        if values.get(column) and not db.query(User.id).filter(User.id == values[column]).first():
+            raise HTTPException(status_code=404, detail=f"{label} not found")
+    return owners
+
+
+def _chunk_query(db: Session, entity: str, values: dict):
+    """id, creator_id, _project_id, _sprint_id and the stats / updated columns of each row"""
+    model = BULK_ENTITIES[entity][0]
+    keys = (set(snapshot_columns(entity)) | set(values)) - {"id", "creator_id"}
+    columns = [getattr(model, key) for key in sorted(keys)]
+    if entity == "task":
+        return db.query(
+            model.id, model.creator_id,
+            Requirement.project_id.label("_project_id"), Requirement.sprint_id.label("_sprint_id"), *columns
+        ).join(Requirement, Task.requirement_id == Requirement.id)
+    return db.query(
+        model.id, model.creator_id, model.project_id.label("_project_id"), model.sprint_id.label("_sprint_id"), *columns
+    )
+
+
+def bulk_update(db: Session, entity: str, ids: List[int], values: dict, user: User) -> dict:
+    """
+    Apply the same partial update to many requirements / tasks / test cases.
+
+    Rows the user may not change, or whose project differs from a referenced
+    sprint / category / requirement, are skipped and counted by reason. Chunks
+    of BULK_UPDATE_CHUNK_IDS are committed one at a time. Returns
+    ``{"requested", "updated", "unchanged", "skipped", "changes"}`` where
+    changes maps each field to its new value and the count per old value.
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="No IDs provided")
+    if len(ids) > BULK_UPDATE_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_UPDATE_MAX_IDS} IDs per request")
+    if not values:
+        raise HTTPException(status_code=400, detail="No changes provided")
+
+    model = BULK_ENTITIES[entity][0]
+    history_model, history_fk, _ = HISTORY_MODELS[entity]
+    references = _reference_projects(db, entity, values)
+    allowed: Dict[int, Optional[int]] = {}  # accessible project -> its creator
+    checked = set()
+
+    summary = {
+        "requested": len(ids), "updated": 0, "unchanged": 0, "skipped": defaultdict(int),
+        "changes": {field: {"new": history_value(value), "old": defaultdict(int)} for field, value in values.items()},
+    }
+    for start in range(0, len(ids), BULK_UPDATE_CHUNK_IDS):
+        chunk = ids[start:start + BULK_UPDATE_CHUNK_IDS]
+        rows = [dict(row._mapping) for row in _chunk_query(db, entity, values).filter(model.id.in_(chunk)).all()]
+        if len(rows) < len(chunk):
+            summary["skipped"]["Not found"] += len(chunk) - len(rows)
+
+        unchecked = {row["_project_id"] for row in rows} - checked
+        if unchecked:
+            accessible = accessible_project_ids(db, unchecked, user)
+            allowed.update(db.query(Project.id, Project.creator_id).filter(Project.id.in_(accessible)).all())
+            checked |= unchecked
+
+        changed = []
+        for row in rows:
+            project_id = row["_project_id"]
+            mismatch = next(
+                (label for project, label in references.values() if project != project_id), None
+            )
+            if project_id not in allowed:
+                summary["skipped"]["Access denied"] += 1
+            elif entity == "requirement" and user.id not in (row["creator_id"], allowed[project_id]):
+                summary["skipped"]["Only requirement creator or project creator can modify"] += 1
+            elif mismatch:
+                summary["skipped"][f"{mismatch} must belong to the same project"] += 1
+            else:
+                diff = {field: value for field, value in values.items() if row[field] != value}
+                if diff:
+                    changed.append((row, diff))
+                else:
+                    summary["unchanged"] += 1
+        if not changed:
+            continue
+
+        db.query(model).filter(model.id.in_([row["id"] for row, _ in changed])).update(
+            values, synchronize_session=False
+        )
+        history = []
+        stats_changes = []
+        for row, diff in changed:
+            for field, value in diff.items():
+                old_value = history_value(row[field])
+                summary["changes"][field]["old"][old_value or "none"] += 1
+                history.append({
+                    history_fk.key: row["id"], "field": field, "old_value": old_value,
+                    "new_value": history_value(value), "changed_by": user.id,
+                })
+            after = {**row, **diff}
+            if "sprint_id" in diff:
+                after["_sprint_id"] = diff["sprint_id"]
+            stats_changes.append((
+                build_snapshot(entity, row["id"], row["_project_id"], row["_sprint_id"], row.get),
+                build_snapshot(entity, row["id"], after["_project_id"], after["_sprint_id"], after.get),
+            ))
+        db.execute(insert(history_model), history)
+        apply_stats_changes(db, stats_changes)
+        bump_data_version(db, *{row["_project_id"] for row, _ in changed})
+        db.commit()
+        summary["updated"] += len(changed)
+
+    summary["changes"] = {field: change for field, change in summary["changes"].items() if change["old"]}
+    return summary
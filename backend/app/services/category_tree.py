@@ -0,0 +1,175 @@
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import false, func, literal
+from sqlalchemy.orm import Session
+
+from app.utils.db_routing import use_primary
+
+# Categories carry a materialized path of ancestor ids, e.g. "/3/17/42/" for
+# node 42 under 17 under root 3. A subtree is every row whose path starts with
+# the node's path, which is a single range scan on (project_id, path).
+
+
+def _prefix_filter(model, project_id: int, prefix: str):
+    return (model.project_id == project_id, model.path.like(f"{prefix}%"))
+
+
+def assign_path(db: Session, category) -> None:
+    """Set path/depth for a newly added category (flushes to obtain the id)"""
+    if category.id is None:
+        db.flush()
+    parent_path = "/"
+    depth = 0
+    if category.parent_id:
+        parent = db.query(type(category)).filter(type(category).id == category.parent_id).first()
+        if parent is None or parent.project_id != category.project_id:
+            raise HTTPException(status_code=400, detail="Invalid parent category")
+        parent_path = _ensure_path(db, parent)
+        depth = parent.depth + 1
+    category.path = f"{parent_path}{category.id}/"
+    category.depth = depth
+
+
+def _ensure_path(db: Session, category) -> str:
+    """Return the category's path, rebuilding the project's paths if it was never set"""
+    if not category.path:
+        rebuild_paths(db, type(category), category.project_id)
+    return category.path
+
+
+def _rewrite_prefix(db: Session, model, project_id: int, old_prefix: str, new_prefix: str,
+                    depth_delta: int, exclude_id: Optional[int] = None) -> None:
+    """Replace old_prefix with new_prefix on every path under old_prefix in one UPDATE"""
+    conditions = list(_prefix_filter(model, project_id, old_prefix))
+    if exclude_id is not None:
+        conditions.append(model.id != exclude_id)
+    db.query(model).filter(*conditions).update(
+        {
+            model.path: literal(new_prefix) + func.substr(model.path, len(old_prefix) + 1),
+            model.depth: model.depth + depth_delta,
+        },
+        synchronize_session=False,
+    )
+
+
+def move_category(db: Session, category, new_parent_id: Optional[int]) -> None:
+    """Re-parent a category and rewrite the paths of its whole subtree"""
+    model = type(category)
+    old_path = _ensure_path(db, category)
+
+    new_parent_path = "/"
+    new_depth = 0
+    if new_parent_id:
+        parent = db.query(model).filter(model.id == new_parent_id).first()
+        if parent is None or parent.project_id != category.project_id:
+            raise HTTPException(status_code=400, detail="Invalid parent category")
+        if _ensure_path(db, parent).startswith(old_path):
+            raise HTTPException(status_code=400, detail="Cannot move a category into its own subtree")
+        new_parent_path = parent.path
+        new_depth = parent.depth + 1
+
+    new_path = f"{new_parent_path}{category.id}/"
+    category.parent_id = new_parent_id
+    if new_path != old_path:
+        _rewrite_prefix(db, model, category.project_id, old_path, new_path, new_depth - category.depth)
+        db.expire(category, ["path", "depth"])
+
+
+def detach_category(db: Session, category) -> None:
+    """Lift a category's descendants one level up before the category is deleted"""
+    path = _ensure_path(db, category)
+    parent_path = path[: -len(f"{category.id}/")]
+    _rewrite_prefix(db, type(category), category.project_id, path, parent_path, -1, exclude_id=category.id)
+
+
+def rebuild_paths(db: Session, model, project_id: int) -> None:
+    """Recompute path/depth for every category of a project from parent_id"""
+    use_primary(db)
+    rows = db.query(model).filter(model.project_id == project_id).all()
+    by_parent: Dict[Optional[int], List] = {}
+    for row in rows:
+        by_parent.setdefault(row.parent_id, []).append(row)
+
+    ids = {row.id for row in rows}
+    # Rows pointing at a missing parent are treated as roots
+    stack = [(row, "/", 0) for row in rows if row.parent_id is None or row.parent_id not in ids]
+    while stack:
+        row, parent_path, depth = stack.pop()
+        row.path = f"{parent_path}{row.id}/"
+        row.depth = depth
+        for child in by_parent.get(row.id, []):
+            stack.append((child, row.path, depth + 1))
+    db.flush()
+
+
+def subtree_ids_query(db: Session, model, category_id: int):
+    """Return a subquery of ids for a category and all its descendants"""
+    category = db.query(model).filter(model.id == category_id).first()
+    if category is None:
+        return db.query(model.id).filter(false())
+    path = _ensure_path(db, category)
+    return db.query(model.id).filter(*_prefix_filter(model, category.project_id, path))
+
+
+def _load_categories(db: Session, model, project_id: int) -> list:
+    categories = db.query(model).filter(model.project_id == project_id).all()
+    if any(c.path is None for c in categories):
+        rebuild_paths(db, model, project_id)
+        db.commit()
+    return categories
+
+
+def _count_nodes(categories, counts: Dict[Optional[int], int]) -> Dict[int, dict]:
+    """Attach direct counts and roll subtree totals up deepest-first"""
+    nodes = {
+        c.id: {
+            "id": c.id,
+            "name": c.name,
+            "parent_id": c.parent_id,
+            "order": c.order,
+            "depth": c.depth,
+            "direct_count": counts.get(c.id, 0),
+            "subtree_count": counts.get(c.id, 0),
+            "children": [],
+        }
+        for c in categories
+    }
+    for c in sorted(categories, key=lambda c: c.depth, reverse=True):
+        parent = nodes.get(c.parent_id)
+        if parent:
+            parent["subtree_count"] += nodes[c.id]["subtree_count"]
+    return nodes
+
+
+def _summary(counts: Dict[Optional[int], int]) -> dict:
+    return {
+        "uncategorized_count": counts.get(None, 0),
+        "total": sum(counts.values()),
+    }
+
+
+def build_tree(db: Session, model, project_id: int, counts: Dict[Optional[int], int]) -> dict:
+    """Load a project's category tree as nested nodes with direct/subtree item counts"""
+    categories = _load_categories(db, model, project_id)
+    nodes = _count_nodes(categories, counts)
+
+    roots = []
+    for c in sorted(categories, key=lambda c: (c.order, c.id)):
+        node = nodes[c.id]
+        parent = nodes.get(c.parent_id)
+        (parent["children"] if parent else roots).append(node)
+
+    return {"items": roots, **_summary(counts)}
+
+
+def build_counts(db: Session, model, project_id: int, counts: Dict[Optional[int], int]) -> dict:
+    """Flat per-node direct/subtree item counts for a project's category tree"""
+    nodes = _count_nodes(_load_categories(db, model, project_id), counts)
+    return {
+        "items": [
+            {"id": node["id"], "direct_count": node["direct_count"], "subtree_count": node["subtree_count"]}
+            for node in nodes.values()
+        ],
+        **_summary(counts),
+    }
@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.bug import Bug
+from app.models.requirement import Requirement
+from app.models.task import Task
+from app.models.project import Project, ProjectMember
+from app.models.comment import BugComment, RequirementComment, TaskComment
+from app.models.user import User
+
+EPOCH = datetime(1970, 1, 1)
+
+# entity type -> (comment model, entity fk, entity model)
+COMMENT_MODELS = {
+    "bug": (BugComment, BugComment.bug_id, Bug),
+    "requirement": (RequirementComment, RequirementComment.requirement_id, Requirement),
+    "task": (TaskComment, TaskComment.task_id, Task),
+}
+
+
+# ========== Cursor ==========
+
+def encode_cursor(created_at: datetime, comment_id: int) -> str:
+    micros = (created_at - EPOCH) // timedelta(microseconds=1)
+    return f"{micros}.{comment_id}"
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Decode a comment cursor; ``since`` may also be given as an ISO datetime"""
+    if not token:
+        return None
+    try:
+        micros, comment_id = token.split(".")
+        return EPOCH + timedelta(microseconds=int(micros)), int(comment_id)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(token), 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# ========== Threads ==========
+
+def get_comment_page(
+    db: Session,
+    entity_type: str,
+    entity_id: int,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: int = 20,
+) -> dict:
+    """
+    Load one page of an entity's comments with their authors.
+
+    Without ``since`` comments are returned newest first, older than ``cursor``.
+    With ``since`` only comments newer than it are returned, oldest first, so a
+    client can poll with the ``latest_cursor`` of its previous response.
+    """
+    model, fk, _ = COMMENT_MODELS[entity_type]
+    query = db.query(model).options(joinedload(model.user)).filter(fk == entity_id)
+
+    after = decode_cursor(since)
+    if after is not None:
+        at, comment_id = after
+        query = query.filter(or_(
+            model.created_at > at,
+            and_(model.created_at == at, model.id > comment_id)
+        )).order_by(model.created_at, model.id)
+    else:
+        before = decode_cursor(cursor)
+        if before is not None:
+            at, comment_id = before
+            query = query.filter(or_(
+                model.created_at < at,
+                and_(model.created_at == at, model.id < comment_id)
+            ))
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+
+    comments = query.limit(limit + 1).all()
+    has_more = len(comments) > limit
+    comments = comments[:limit]
+
+    if comments:
+        newest = comments[-1] if after is not None else comments[0]
+        latest_cursor = encode_cursor(newest.created_at, newest.id)
+    else:
+        latest_cursor = since
+    next_cursor = None
+    if has_more and after is None:
+        next_cursor = encode_cursor(comments[-1].created_at, comments[-1].id)
+
+    return {
+        "items": comments,
+        "next_cursor": next_cursor,
+        "latest_cursor": latest_cursor,
+        "has_more": has_more,
+    }
+
+
+# ========== Counts ==========
+
+def get_comment_counts(db: Session, entity_type: str, ids: List[int], user: User) -> Dict[int, dict]:
+    """Comment count and last comment time for each accessible entity, in one GROUP BY"""
+    model, fk, entity_model = COMMENT_MODELS[entity_type]
+    if not ids:
+        return {}
+
+    accessible_projects = db.query(Project.id).filter(or_(
+        Project.creator_id == user.id,
+        Project.id.in_(db.query(ProjectMember.project_id).filter(ProjectMember.user_id == user.id))
+    ))
+    query = db.query(entity_model.id, func.count(model.id), func.max(model.created_at)).filter(
+        entity_model.id.in_(ids)
+    )
+    if entity_model is Task:
+        query = query.join(Requirement, Task.requirement_id == Requirement.id).filter(
+            Requirement.project_id.in_(accessible_projects)
+        )
+    else:
+        query = query.filter(entity_model.project_id.in_(accessible_projects))
+    rows = query.outerjoin(model, fk == entity_model.id).group_by(entity_model.id).all()
+
+    return {
+        entity_id: {"count": count, "last_comment_at": last_at}
+        for entity_id, count, last_at in rows
+    }
@@ -0,0 +1,273 @@
+import csv
+import io
+import json
+import tempfile
+from datetime import date, datetime
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Query, aliased
+
+from app.database import SessionLocal
+from app.models.bug import Bug
+from app.models.requirement import Requirement, RequirementCategory
+from app.models.sprint import Sprint
+from app.models.task import Task
+from app.models.user import User
+from app.utils.text_extract import html_to_text
+
+# Streaming exports: rows are read as plain columns (names resolved with joins,
+# no ORM objects) with yield_per, so on MySQL they come from a server-side
+# cursor, and written out batch by batch as the response body is sent.
+#
+# FastAPI closes the request session before a streamed body runs, so every
+# export opens its own session. A requirement export reads requirements and
+# their tasks as two streams in the same order and merges them, which takes
+# two queries and constant memory no matter how many rows there are.
+#
+# Rich-text fields stay HTML in NDJSON and become plain text in CSV / XLSX,
+# like the test case export.
+
+EXPORT_BATCH_ROWS = 500
+XLSX_FILE_CHUNK = 64 * 1024
+XLSX_MAX_CELL = 32767  # Excel's limit for a cell's text
+
+# format -> media type
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+Creator = aliased(User, name="creator")
+Assignee = aliased(User, name="assignee")
+Developer = aliased(User, name="developer")
+Tester = aliased(User, name="tester")
+
+# (key, header, column); the key names the field in NDJSON
+BUG_FIELDS = [
+    ("bug_number", "缺陷编号", Bug.bug_number),
+    ("title", "标题", Bug.title),
+    ("status", "状态", Bug.status),
+    ("priority", "优先级", Bug.priority),
+    ("severity", "严重程度", Bug.severity),
+    ("environment", "发现环境", Bug.environment),
+    ("defect_cause", "缺陷原因", Bug.defect_cause),
+    ("sprint", "迭代", Sprint.name),
+    ("requirement_number", "关联需求", Requirement.requirement_number),
+    ("creator", "创建人", Creator.username),
+    ("assignee", "处理人", Assignee.username),
+    ("created_at", "创建时间", Bug.created_at),
+    ("updated_at", "更新时间", Bug.updated_at),
+    ("description", "描述", Bug.description),
+]
+
+REQUIREMENT_FIELDS = [
+    ("requirement_number", "需求编号", Requirement.requirement_number),
+    ("title", "需求标题", Requirement.title),
+    ("status", "需求状态", Requirement.status),
+    ("priority", "需求优先级", Requirement.priority),
+    ("sprint", "迭代", Sprint.name),
+    ("category", "需求目录", RequirementCategory.name),
+    ("creator", "创建人", Creator.username),
+    ("assignee", "负责人", Assignee.username),
+    ("developer", "开发人员", Developer.username),
+    ("tester", "测试人员", Tester.username),
+    ("start_date", "开始日期", Requirement.start_date),
+    ("end_date", "结束日期", Requirement.end_date),
+    ("created_at", "创建时间", Requirement.created_at),
+    ("updated_at", "更新时间", Requirement.updated_at),
+    ("description", "需求描述", Requirement.description),
+]
+
+TASK_FIELDS = [
+    ("task_number", "任务编号", Task.task_number),
+    ("title", "任务标题", Task.title),
+    ("status", "任务状态", Task.status),
+    ("priority", "任务优先级", Task.priority),
+    ("assignee", "任务负责人", Assignee.username),
+    ("developer", "任务开发人员", Developer.username),
+    ("tester", "任务测试人员", Tester.username),
+    ("start_date", "任务开始日期", Task.start_date),
+    ("end_date", "任务结束日期", Task.end_date),
+    ("created_at", "任务创建时间", Task.created_at),
+    ("description", "任务描述", Task.description),
+]
+
+# Keys holding editor HTML
+RICH_TEXT_KEYS = frozenset({"description"})
+
+
+def _plain(value):
+    return value.value if hasattr(value, "value") else value
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _stream(query: Query, fields: list) -> Iterator[dict]:
+    """Yield the query's rows as {key: value} in its own session"""
+    db = SessionLocal()
+    try:
+        query = query.with_session(db).with_entities(*(column.label(key) for key, _, column in fields))
+        for row in query.yield_per(EXPORT_BATCH_ROWS):
+            yield {key: _plain(value) for key, value in row._mapping.items()}
+    finally:
+        db.close()
+
+
+# ========== Records ==========
+
+def iter_bug_records(query: Query) -> Iterator[dict]:
+    """``query`` is a filtered db.query(Bug)"""
+    query = (
+        query.outerjoin(Sprint, Bug.sprint_id == Sprint.id)
+        .outerjoin(Requirement, Bug.requirement_id == Requirement.id)
+        .outerjoin(Creator, Bug.creator_id == Creator.id)
+        .outerjoin(Assignee, Bug.assignee_id == Assignee.id)
+        .order_by(Bug.id.desc())
+    )
+    return _stream(query, BUG_FIELDS)
+
+
+def iter_requirement_records(query: Query) -> Iterator[dict]:
+    """``query`` is a filtered db.query(Requirement); each record carries a "tasks" list"""
+    requirements = (
+        query.outerjoin(Sprint, Requirement.sprint_id == Sprint.id)
+        .outerjoin(RequirementCategory, Requirement.category_id == RequirementCategory.id)
+        .outerjoin(Creator, Requirement.creator_id == Creator.id)
+        .outerjoin(Assignee, Requirement.assignee_id == Assignee.id)
+        .outerjoin(Developer, Requirement.developer_id == Developer.id)
+        .outerjoin(Tester, Requirement.tester_id == Tester.id)
+        .order_by(Requirement.id.desc())
+    )
+    tasks = (
+        query.session.query(Task)
+        .filter(Task.requirement_id.in_(query.with_entities(Requirement.id).scalar_subquery()))
+        .outerjoin(Assignee, Task.assignee_id == Assignee.id)
+        .outerjoin(Developer, Task.developer_id == Developer.id)
+        .outerjoin(Tester, Task.tester_id == Tester.id)
+        .order_by(Task.requirement_id.desc(), Task.id)
+    )
+    task_fields = TASK_FIELDS + [("_requirement_id", None, Task.requirement_id)]
+
+    task_stream = _stream(tasks, task_fields)
+    try:
+        task = next(task_stream, None)
+        for record in _stream(requirements, REQUIREMENT_FIELDS + [("_id", None, Requirement.id)]):
+            requirement_id = record.pop("_id")
+            record["tasks"] = []
+            # Both streams run by requirement id descending
+            while task is not None and task["_requirement_id"] >= requirement_id:
+                if task.pop("_requirement_id") == requirement_id:
+                    record["tasks"].append(task)
+                task = next(task_stream, None)
+            yield record
+    finally:
+        task_stream.close()
+
+
+def _cells(record: dict, fields: list) -> list:
+    """Values of ``fields`` in ``record`` with rich text as plain text"""
+    cells = []
+    for key, _, _ in fields:
+        value = record.get(key)
+        cells.append(html_to_text(value) if value and key in RICH_TEXT_KEYS else value)
+    return cells
+
+
+def requirement_rows(record: dict) -> Iterator[list]:
+    """Flatten a requirement record for CSV / XLSX: one row per task (or one without tasks)"""
+    head = _cells(record, REQUIREMENT_FIELDS)
+    for task in record["tasks"] or [{}]:
+        yield head + _cells(task, TASK_FIELDS)
+
+
+def bug_rows(record: dict) -> Iterator[list]:
+    yield _cells(record, BUG_FIELDS)
+
+
+# ========== Writers ==========
+
+def _write_ndjson(records: Iterable[dict]) -> Iterator[bytes]:
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record, ensure_ascii=False, default=_json_default))
+        if len(lines) >= EXPORT_BATCH_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _write_csv(headers: List[str], rows: Iterable[list]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")  # BOM，Excel 打开时按 UTF-8 识别中文
+    writer.writerow(headers)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(["" if value is None else value for value in row])
+        if count % EXPORT_BATCH_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _write_xlsx(title: str, headers: List[str], rows: Iterable[list]) -> Iterator[bytes]:
+    """
+    Write-only workbook: openpyxl spools rows to a temporary file instead of
+    keeping cells in memory. The zip can only be sent once it is complete.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = Font(bold=True)
+        header_cells.append(cell)
+    ws.append(header_cells)
+    for row in rows:
+        ws.append([
+            value[:XLSX_MAX_CELL] if isinstance(value, str) else value
+            for value in row
+        ])
+
+    with tempfile.TemporaryFile() as output:
+        wb.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(XLSX_FILE_CHUNK)
+            if not chunk:
+                break
+            yield chunk
+
+
+def export_response(
+    fmt: str,
+    name: str,
+    records: Iterator[dict],
+    fields: List[Tuple[str, str, object]],
+    to_rows: Callable[[dict], Iterator[list]],
+) -> StreamingResponse:
+    """Stream ``records`` as NDJSON, or flattened by ``to_rows`` under ``fields`` headers as CSV / XLSX"""
+    if fmt == "ndjson":
+        body = _write_ndjson(records)
+    else:
+        headers = [header for _, header, _ in fields if header]
+        rows = (row for record in records for row in to_rows(record))
+        body = _write_csv(headers, rows) if fmt == "csv" else _write_xlsx(name, headers, rows)
+
+    filename = f"{name}_export.{fmt}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
@@ -0,0 +1,197 @@
+import json
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.bug import Bug, BugHistory
+from app.models.requirement import Requirement, RequirementHistory
+from app.models.task import Task, TaskHistory
+from app.models.testcase import TestCase, TestCaseHistory
+from app.models.history import HistoryField, HistoryArchive
+
+EPOCH = datetime(1970, 1, 1)
+
+MAX_VALUE_LENGTH = 255  # old_value / new_value column size
+ARCHIVE_CHUNK_ROWS = 1000  # history rows per archive row
+
+# entity type -> (history model, entity fk, entity model)
+HISTORY_MODELS = {
+    "bug": (BugHistory, BugHistory.bug_id, Bug),
+    "requirement": (RequirementHistory, RequirementHistory.requirement_id, Requirement),
+    "task": (TaskHistory, TaskHistory.task_id, Task),
+    "testcase": (TestCaseHistory, TestCaseHistory.testcase_id, TestCase),
+}
+
+# Field codes never change once assigned, so both directions are cached per process
+_field_codes: Dict[str, int] = {}
+_field_names: Dict[int, str] = {}
+
+
+# ========== Values ==========
+
+def history_value(value) -> Optional[str]:
+    """Render a field value for a history row: enums by value, clipped to the column size"""
+    if value is None:
+        return None
+    text = value.value if hasattr(value, "value") else str(value)
+    if len(text) > MAX_VALUE_LENGTH:
+        text = text[: MAX_VALUE_LENGTH - 1] + "…"
+    return text
+
+
+# ========== Field Codes ==========
+
+def _load_fields(db: Session) -> None:
+    for code, name in db.query(HistoryField.id, HistoryField.name).all():
+        _field_codes[name] = code
+        _field_names[code] = name
+
+
+def intern_fields(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """Return {name: code}, registering names seen for the first time"""
+    names = set(names)
+    if not names.issubset(_field_codes):
+        _load_fields(db)
+        for name in sorted(names - set(_field_codes)):
+            field = HistoryField(name=name)
+            db.add(field)
+            db.flush()
+            _field_codes[name] = field.id
+            _field_names[field.id] = name
+    return {name: _field_codes[name] for name in names}
+
+
+def field_name(db: Session, code: int) -> str:
+    if code not in _field_names:
+        _load_fields(db)
+    return _field_names.get(code, str(code))
+
+
+# ========== Read ==========
+
+def _micros(at: datetime) -> int:
+    return (at - EPOCH) // timedelta(microseconds=1)
+
+
+def load_history(db: Session, entity_type: str, entity_id: int) -> List[dict]:
+    """
+    An entity's full history, newest first, from the hot table and the archive.
+
+    Rows are dicts with id, field, old_value, new_value, changed_by, changed_at.
+    """
+    model, fk, _ = HISTORY_MODELS[entity_type]
+    rows = [
+        {
+            "id": h.id,
+            "field": h.field,
+            "old_value": h.old_value,
+            "new_value": h.new_value,
+            "changed_by": h.changed_by,
+            "changed_at": h.changed_at,
+        }
+        for h in db.query(model).filter(fk == entity_id).all()
+    ]
+
+    rows.extend(load_archived_history(db, entity_type, entity_id))
+    rows.sort(key=lambda row: (row["changed_at"], row["id"]), reverse=True)
+    return rows
+
+
+def load_archived_history(db: Session, entity_type: str, entity_id: int,
+                          until: Optional[datetime] = None) -> List[dict]:
+    """
+    An entity's archived history rows (unordered, same dicts as load_history),
+    only from chunks starting at or before ``until`` when given.
+    """
+    query = db.query(HistoryArchive.payload).filter(
+        HistoryArchive.entity_type == entity_type,
+        HistoryArchive.entity_id == entity_id,
+    )
+    if until is not None:
+        query = query.filter(HistoryArchive.first_at <= until)
+    rows = []
+    for (payload,) in query.all():
+        for row_id, code, old_value, new_value, changed_by, micros in json.loads(zlib.decompress(payload)):
+            rows.append({
+                "id": row_id,
+                "field": field_name(db, code),
+                "old_value": old_value,
+                "new_value": new_value,
+                "changed_by": changed_by,
+                "changed_at": EPOCH + timedelta(microseconds=micros),
+            })
+    return rows
+
+
+# ========== Archive ==========
+
+def _archive_entity(db: Session, entity_type: str, entity_id: int, rows, codes: Dict[str, int]) -> int:
+    archives = 0
+    for start in range(0, len(rows), ARCHIVE_CHUNK_ROWS):
+        chunk = rows[start:start + ARCHIVE_CHUNK_ROWS]
+        data = [
+            [h.id, codes[h.field], h.old_value, h.new_value, h.changed_by, _micros(h.changed_at)]
+            for h in chunk
+        ]
+        db.add(HistoryArchive(
+            entity_type=entity_type,
+            entity_id=entity_id,
+            first_at=chunk[0].changed_at,
+            last_at=chunk[-1].changed_at,
+            row_count=len(chunk),
+            payload=zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode(), 9),
+        ))
+        archives += 1
+    return archives
+
+
+def archive_history(db: Session, before: datetime, batch_size: int = 500) -> Dict[str, dict]:
+    """
+    Move history rows older than ``before`` into compressed archive rows.
+
+    Works in batches of ``batch_size`` entities per table, committing after
+    each batch, so it can run on a live database and resume if interrupted.
+    Archive rows of entities that no longer exist are removed.
+    """
+    result = {}
+    for entity_type, (model, fk, entity_model) in HISTORY_MODELS.items():
+        stats = {"rows": 0, "entities": 0, "archives": 0, "orphans_removed": 0}
+        while True:
+            entity_ids = [
+                entity_id for (entity_id,) in
+                db.query(fk).filter(model.changed_at < before).group_by(fk).order_by(fk).limit(batch_size).all()
+            ]
+            if not entity_ids:
+                break
+
+            history = db.query(model).filter(
+                fk.in_(entity_ids), model.changed_at < before
+            ).order_by(fk, model.changed_at, model.id).all()
+            codes = intern_fields(db, {h.field for h in history})
+
+            by_entity = defaultdict(list)
+            for h in history:
+                by_entity[getattr(h, fk.key)].append(h)
+            for entity_id, rows in by_entity.items():
+                stats["archives"] += _archive_entity(db, entity_type, entity_id, rows, codes)
+
+            ids = [h.id for h in history]
+            for start in range(0, len(ids), 500):
+                db.query(model).filter(model.id.in_(ids[start:start + 500])).delete(synchronize_session=False)
+            db.commit()
+            db.expunge_all()
+
+            stats["rows"] += len(ids)
+            stats["entities"] += len(by_entity)
+
+        live = db.query(entity_model.id).filter(entity_model.id == HistoryArchive.entity_id)
+        stats["orphans_removed"] = db.query(HistoryArchive).filter(
+            HistoryArchive.entity_type == entity_type,
+            ~live.exists(),
+        ).delete(synchronize_session=False)
+        db.commit()
+        result[entity_type] = stats
+    return result
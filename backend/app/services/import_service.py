@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from app.config import settings
+
+# Excel imports: parsing and validating rows is CPU-bound inside openpyxl, so
+# workbooks with several sheets are parsed by a pool of worker processes, one
+# sheet per task. Each worker loads the workbook once (read-only) and returns
+# plain validated dicts; the caller resolves references and inserts the rows
+# of all sheets in workbook order. Small files are parsed in-process, where
+# starting the pool would cost more than it saves.
+
+IMPORT_PARALLEL_MIN_BYTES = 256 * 1024
+
+# Workbook of the current worker process, set once by the pool initializer
+_worker_contents: Optional[bytes] = None
+
+
+def _open_workbook(contents: bytes):
+    from openpyxl import load_workbook
+
+    return load_workbook(BytesIO(contents), read_only=True, data_only=True)
+
+
+def _init_worker(contents: bytes) -> None:
+    global _worker_contents
+    _worker_contents = contents
+
+
+def _parse_sheet(contents: bytes, sheet: str, parse_row: Callable, required_header: str) -> dict:
+    started = time.perf_counter()
+    wb = _open_workbook(contents)
+    result = {"sheet": sheet, "rows": [], "errors": [], "read": 0, "skipped": False}
+    try:
+        rows = wb[sheet].iter_rows(values_only=True)
+        headers = next(rows, ())
+        # 表头只解析一次：列名 -> 列号
+        columns = {header: index for index, header in enumerate(headers) if header is not None}
+        if required_header not in columns:
+            result["skipped"] = True
+            return result
+
+        for row_number, values in enumerate(rows, start=2):
+            if not any(value is not None and value != "" for value in values):
+                continue
+            result["read"] += 1
+            try:
+                result["rows"].append((row_number, parse_row(values, columns)))
+            except ValueError as exc:
+                result["errors"].append((row_number, str(exc)))
+    finally:
+        wb.close()
+        result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def _parse_sheet_in_worker(sheet: str, parse_row: Callable, required_header: str) -> dict:
+    return _parse_sheet(_worker_contents, sheet, parse_row, required_header)
+
+
+def _worker_count(sheet_count: int) -> int:
+    workers = settings.IMPORT_WORKERS or os.cpu_count() or 1
+    return max(1, min(workers, sheet_count))
+
+
+def read_sheets(contents: bytes, parse_row: Callable, required_header: str) -> List[Dict]:
+    """
+    Parse every sheet whose header row contains ``required_header``.
+
+    ``parse_row(values, columns)`` gets a row's values and ``{header: index}``
+    and returns a dict, or raises ValueError with the reason the row is
+    invalid. It must be a module-level function so worker processes can load
+    it. Returns one result per sheet in workbook order:
+    ``{"sheet", "rows": [(row number, dict)], "errors": [(row number, message)],
+    "read", "skipped", "seconds"}``.
+    """
+    try:
+        wb = _open_workbook(contents)
+        sheets = list(wb.sheetnames)
+        wb.close()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Excel 文件读取失败: {str(e)}")
+
+    workers = _worker_count(len(sheets))
+    if workers == 1 or len(contents) < IMPORT_PARALLEL_MIN_BYTES:
+        return [_parse_sheet(contents, sheet, parse_row, required_header) for sheet in sheets]
+
+    # forkserver/spawn: forking the threaded API process could copy held locks
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker, initargs=(contents,)) as pool:
+        futures = [pool.submit(_parse_sheet_in_worker, sheet, parse_row, required_header) for sheet in sheets]
+        return [future.result() for future in futures]
@@ -0,0 +1,338 @@
+import importlib
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Jobs live in the database only: workers claim queued rows with a conditional
+# UPDATE (no SELECT ... FOR UPDATE SKIP LOCKED, so SQLite works too). A handler
+# commits its work batch by batch through JobContext.progress(), which stores
+# the batch's resume point in the same transaction, so a retried job picks up
+# after the last committed batch instead of starting over.
+
+# Modules whose @job_handler functions must be registered before running jobs
+JOB_HANDLER_MODULES = ("app.api.projects", "app.api.requirements", "app.api.testcases", "app.api.trash")
+
+FINISHED = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+_handlers: Dict[str, Tuple[Callable, int]] = {}
+_periodic: Dict[str, int] = {}  # kind -> interval in seconds
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler once cancellation was requested"""
+
+
+class JobError(Exception):
+    """A permanent failure: the job is failed without further retries"""
+
+
+def job_handler(kind: str, max_attempts: int = 3, every: Optional[int] = None):
+    """
+    Register ``func(ctx: JobContext) -> Optional[dict]`` as the handler for ``kind``.
+
+    With ``every`` (seconds) the worker pool also enqueues the job itself at
+    that interval (see schedule_periodic_jobs).
+    """
+    def decorator(func):
+        _handlers[kind] = (func, max_attempts)
+        if every:
+            _periodic[kind] = every
+        return func
+    return decorator
+
+
+def load_handlers() -> None:
+    for module in JOB_HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+class JobContext:
+    """What a handler sees: its session, parameters and progress reporting"""
+
+    def __init__(self, db: Session, job: Job):
+        self.db = db
+        self.job = job
+        self.job_id = job.id
+        self.params = dict(job.params or {})
+        self.checkpoint = job.checkpoint
+        self.user_id = job.created_by
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None, checkpoint=None) -> None:
+        """
+        Commit the handler's pending work together with its progress.
+
+        ``checkpoint`` (JSON) is handed back as ``ctx.checkpoint`` if the job is
+        retried. Raises JobCancelled when cancellation has been requested.
+        """
+        job = self.job
+        job.progress_done = done
+        if total is not None:
+            job.progress_total = total
+        if message is not None:
+            job.message = message[:255]
+        if checkpoint is not None:
+            job.checkpoint = self.checkpoint = checkpoint
+        job.heartbeat_at = datetime.utcnow()
+        self.db.commit()
+        # Read the flag from the database: handlers may turn off expire_on_commit
+        # (e.g. the test case export), which would leave the attribute stale
+        cancel_requested = self.db.query(Job.cancel_requested).filter(Job.id == self.job_id).scalar()
+        if cancel_requested:
+            raise JobCancelled()
+
+    def output(self, name: str, data: bytes) -> None:
+        """Attach a file (e.g. an export) to download once the job succeeds"""
+        self.job.output_name = name
+        self.job.output_data = data
+
+
+# ========== Queue ==========
+
+def enqueue(
+    db: Session,
+    kind: str,
+    user_id: Optional[int],
+    project_id: Optional[int] = None,
+    params: Optional[dict] = None,
+    input_data: Optional[bytes] = None,
+) -> Job:
+    """Add a job to the queue; the caller commits"""
+    _, max_attempts = _handlers[kind]
+    job = Job(
+        kind=kind,
+        created_by=user_id,
+        project_id=project_id,
+        params=params or {},
+        input_data=input_data,
+        max_attempts=max_attempts,
+        run_after=datetime.utcnow(),
+    )
+    db.add(job)
+    return job
+
+
+def cancel_job(db: Session, job: Job) -> None:
+    """Cancel a queued job now, or ask a running one to stop at its next checkpoint"""
+    cancelled = db.query(Job).filter(Job.id == job.id, Job.status == JobStatus.QUEUED).update(
+        {Job.status: JobStatus.CANCELLED, Job.finished_at: datetime.utcnow()},
+        synchronize_session=False,
+    )
+    if not cancelled:
+        db.query(Job).filter(Job.id == job.id, Job.status == JobStatus.RUNNING).update(
+            {Job.cancel_requested: True}, synchronize_session=False
+        )
+    db.commit()
+    db.refresh(job)
+
+
+def retry_job(db: Session, job: Job) -> None:
+    """Queue a failed or cancelled job again, resuming from its last checkpoint"""
+    job.status = JobStatus.QUEUED
+    job.run_after = datetime.utcnow()
+    job.attempts = 0
+    job.cancel_requested = False
+    job.error = None
+    job.finished_at = None
+    db.commit()
+    db.refresh(job)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff after the ``attempts``-th failed attempt"""
+    seconds = settings.JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, settings.JOB_RETRY_MAX_SECONDS))
+
+
+def claim_next(db: Session, worker_id: str) -> Optional[int]:
+    """Atomically take the oldest runnable job, returning its id"""
+    now = datetime.utcnow()
+    candidates = db.query(Job.id).filter(
+        Job.status == JobStatus.QUEUED,
+        Job.run_after <= now,
+        Job.kind.in_(list(_handlers)),
+    ).order_by(Job.id).limit(10).all()
+    for (job_id,) in candidates:
+        claimed = db.query(Job).filter(Job.id == job_id, Job.status == JobStatus.QUEUED).update(
+            {
+                Job.status: JobStatus.RUNNING,
+                Job.worker_id: worker_id,
+                Job.attempts: Job.attempts + 1,
+                Job.started_at: now,
+                Job.heartbeat_at: now,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        if claimed:
+            return job_id
+    return None
+
+
+def run_job(job_id: int) -> JobStatus:
+    """Run a claimed job to completion, failure, retry or cancellation"""
+    db = SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        func, _ = _handlers[job.kind]
+        try:
+            result = func(JobContext(db, job))
+        except JobCancelled:
+            db.rollback()
+            job.status = JobStatus.CANCELLED
+            job.message = "已取消"
+        except Exception as exc:
+            db.rollback()
+            if isinstance(exc, JobError):
+                logger.warning("Job %s (%s) failed: %s", job.id, job.kind, exc)
+                job.error = str(exc)
+            else:
+                logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+                job.error = "".join(traceback.format_exception_only(type(exc), exc)).strip()[-4000:]
+            if isinstance(exc, JobError) or job.attempts >= job.max_attempts:
+                job.status = JobStatus.FAILED
+            else:
+                job.status = JobStatus.QUEUED
+                job.run_after = datetime.utcnow() + retry_delay(job.attempts)
+                job.worker_id = None
+        else:
+            job.status = JobStatus.SUCCEEDED
+            job.result = result
+            job.error = None
+            if job.progress_total is not None:
+                job.progress_done = job.progress_total
+        if job.status in FINISHED:
+            job.finished_at = datetime.utcnow()
+        if job.status == JobStatus.SUCCEEDED:
+            job.input_data = None  # Only kept while the job may still be retried
+        db.commit()
+        return job.status
+    finally:
+        db.close()
+
+
+def run_next(worker_id: str) -> bool:
+    """Claim and run one job; False when nothing was runnable"""
+    db = SessionLocal()
+    try:
+        job_id = claim_next(db, worker_id)
+    finally:
+        db.close()
+    if job_id is None:
+        return False
+    run_job(job_id)
+    return True
+
+
+def run_pending(worker_id: str = "inline") -> int:
+    """Run runnable jobs until the queue is empty; returns how many ran"""
+    load_handlers()
+    count = 0
+    while run_next(worker_id):
+        count += 1
+    return count
+
+
+def recover_jobs(db: Session) -> Dict[str, int]:
+    """
+    Requeue running jobs whose worker stopped sending heartbeats, and drop
+    finished jobs older than JOB_RETENTION_DAYS.
+    """
+    now = datetime.utcnow()
+    stale = db.query(Job).filter(
+        Job.status == JobStatus.RUNNING,
+        Job.heartbeat_at < now - timedelta(seconds=settings.JOB_STALE_SECONDS),
+    ).all()
+    for job in stale:
+        job.error = f"Worker {job.worker_id} stopped responding"
+        job.worker_id = None
+        if job.attempts >= job.max_attempts:
+            job.status = JobStatus.FAILED
+            job.finished_at = now
+        else:
+            job.status = JobStatus.QUEUED
+            job.run_after = now + retry_delay(job.attempts)
+
+    purged = db.query(Job).filter(
+        Job.status.in_(FINISHED),
+        Job.finished_at < now - timedelta(days=settings.JOB_RETENTION_DAYS),
+    ).delete(synchronize_session=False)
+    db.commit()
+    return {"requeued": len(stale), "purged": purged}
+
+
+def schedule_periodic_jobs(db: Session) -> int:
+    """
+    Enqueue each periodic job whose last run was created more than its interval
+    ago. Two processes may both enqueue one occasionally; periodic handlers
+    must tolerate running twice.
+    """
+    now = datetime.utcnow()
+    scheduled = 0
+    for kind, every in _periodic.items():
+        last = db.query(func.max(Job.created_at)).filter(Job.kind == kind).scalar()
+        if last is None or last < now - timedelta(seconds=every):
+            enqueue(db, kind, None)
+            scheduled += 1
+    db.commit()
+    return scheduled
+
+
+# ========== Worker Pool ==========
+
+class JobWorkerPool:
+    """Threads that poll the jobs table; run in the API process or via run_jobs.py"""
+
+    def __init__(self, workers: int, poll_seconds: float = None):
+        self.workers = workers
+        self.poll_seconds = poll_seconds if poll_seconds is not None else settings.JOB_POLL_SECONDS
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self) -> None:
+        load_handlers()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._loop, args=(index,), name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 30) -> None:
+        """Stop polling; running jobs finish their current handler call"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _loop(self, index: int) -> None:
+        worker_id = f"{self.worker_id}:{index}"
+        last_recovery = 0.0
+        while not self._stop.is_set():
+            try:
+                if index == 0 and time.monotonic() - last_recovery > 60:
+                    last_recovery = time.monotonic()
+                    db = SessionLocal()
+                    try:
+                        recover_jobs(db)
+                        schedule_periodic_jobs(db)
+                    finally:
+                        db.close()
+                if run_next(worker_id):
+                    continue
+            except Exception:
+                # Database hiccups must not kill the worker thread
+                logger.exception("Job worker %s error", worker_id)
+            self._stop.wait(self.poll_seconds)
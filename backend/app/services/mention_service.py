@@ -0,0 +1,153 @@
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.comment import CommentMention
+from app.models.project import Project, ProjectMember
+from app.models.user import User
+from app.services.activity_service import load_users
+from app.services.comment_service import COMMENT_MODELS
+from app.utils.db_routing import on_replica
+
+# entity type -> entity number column
+NUMBER_COLUMNS = {
+    "bug": "bug_number",
+    "requirement": "requirement_number",
+    "task": "task_number",
+}
+
+
+def sync_mentions(db: Session, entity_type: str, entity_id: int, project_id: int, comment,
+                  user_ids: List[int]) -> None:
+    """
+    Update the mention index for a created/edited comment (call after flush).
+
+    ``user_ids`` comes from extract_mentions(). Users still mentioned after an
+    edit keep their row and read state; self-mentions are not indexed.
+    """
+    wanted = {user_id for user_id in user_ids if user_id != comment.user_id}
+
+    existing = db.query(CommentMention).filter(
+        CommentMention.entity_type == entity_type,
+        CommentMention.comment_id == comment.id
+    ).all()
+    for mention in existing:
+        if mention.user_id not in wanted:
+            db.delete(mention)
+    for user_id in wanted - {mention.user_id for mention in existing}:
+        db.add(CommentMention(
+            user_id=user_id,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            comment_id=comment.id,
+            project_id=project_id,
+            mentioned_by=comment.user_id,
+        ))
+
+
+def delete_mentions(db: Session, entity_type: str, comment_ids: Iterable[int]) -> None:
+    """Remove index rows for deleted comments"""
+    comment_ids = list(comment_ids)
+    if comment_ids:
+        db.query(CommentMention).filter(
+            CommentMention.entity_type == entity_type,
+            CommentMention.comment_id.in_(comment_ids)
+        ).delete(synchronize_session=False)
+
+
+def _user_mentions(db: Session, user: User):
+    accessible_projects = db.query(Project.id).filter(or_(
+        Project.creator_id == user.id,
+        Project.id.in_(db.query(ProjectMember.project_id).filter(ProjectMember.user_id == user.id))
+    ))
+    return db.query(CommentMention).filter(
+        CommentMention.user_id == user.id,
+        CommentMention.project_id.in_(accessible_projects)
+    )
+
+
+def get_unread_count(db: Session, user: User) -> int:
+    return _user_mentions(db, user).filter(CommentMention.read_at.is_(None)).count()
+
+
+def get_inbox(db: Session, user: User, cursor: Optional[str] = None, limit: int = 20,
+              unread_only: bool = False) -> dict:
+    """
+    Page through the comments mentioning a user, newest first.
+
+    Comments and entities are loaded in one batch per entity type. Index rows
+    whose comment no longer exists (e.g. the entity was deleted) are dropped.
+    """
+    query = _user_mentions(db, user)
+    if unread_only:
+        query = query.filter(CommentMention.read_at.is_(None))
+    if cursor:
+        try:
+            query = query.filter(CommentMention.id < int(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    mentions = query.order_by(CommentMention.id.desc()).limit(limit + 1).all()
+    has_more = len(mentions) > limit
+    mentions = mentions[:limit]
+
+    comments = {}
+    numbers = {}
+    for entity_type, (model, fk, entity_model) in COMMENT_MODELS.items():
+        comment_ids = [m.comment_id for m in mentions if m.entity_type == entity_type]
+        if not comment_ids:
+            continue
+        for comment_id, content in db.query(model.id, model.content).filter(model.id.in_(comment_ids)).all():
+            comments[(entity_type, comment_id)] = content
+        entity_ids = {m.entity_id for m in mentions if m.entity_type == entity_type}
+        number_column = getattr(entity_model, NUMBER_COLUMNS[entity_type])
+        for entity_id, number in db.query(entity_model.id, number_column).filter(entity_model.id.in_(entity_ids)).all():
+            numbers[(entity_type, entity_id)] = number
+
+    users = load_users(db, (m.mentioned_by for m in mentions))
+    items = [
+        {
+            "id": m.id,
+            "entity_type": m.entity_type,
+            "entity_id": m.entity_id,
+            "entity_number": numbers.get((m.entity_type, m.entity_id)),
+            "project_id": m.project_id,
+            "comment_id": m.comment_id,
+            "content": comments[(m.entity_type, m.comment_id)],
+            "mentioned_by": users.get(m.mentioned_by),
+            "created_at": m.created_at,
+            "read": m.read_at is not None,
+        }
+        for m in mentions
+        if (m.entity_type, m.comment_id) in comments
+    ]
+
+    next_cursor = str(mentions[-1].id) if has_more else None
+
+    # A lagging replica may not have the comment yet; only purge from primary reads
+    stale = [m for m in mentions if (m.entity_type, m.comment_id) not in comments]
+    if stale and not on_replica(db):
+        for mention in stale:
+            db.delete(mention)
+        db.commit()
+
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "unread_count": get_unread_count(db, user),
+    }
+
+
+def mark_read(db: Session, user: User, ids: Optional[List[int]] = None) -> int:
+    """Mark the given mentions (or all of them) as read; returns rows updated"""
+    query = db.query(CommentMention).filter(
+        CommentMention.user_id == user.id,
+        CommentMention.read_at.is_(None)
+    )
+    if ids is not None:
+        query = query.filter(CommentMention.id.in_(ids))
+    return query.update({CommentMention.read_at: datetime.utcnow()}, synchronize_session=False)
@@ -0,0 +1,242 @@
+import os
+import re
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import and_, or_, select, Text
+from sqlalchemy.orm import Session
+
+from app.models.bug import Bug, BugHistory
+from app.models.comment import BugComment, RequirementComment, TaskComment, CommentMention
+from app.models.history import HistoryArchive
+from app.models.project import Project, ProjectMember, ProjectCounter
+from app.models.requirement import Requirement, RequirementCategory, RequirementHistory
+from app.models.sprint import Sprint, SprintDailyStat
+from app.models.sync import DeletionLog
+from app.models.task import Task, TaskHistory
+from app.models.testcase import TestCase, TestCaseCategory, TestCaseHistory
+from app.services.version_service import bump_data_version
+from app.utils.soft_delete import INCLUDE_DELETED
+
+# A project is purged with plain DELETE ... WHERE id IN (...) statements, one
+# bounded batch at a time and bottom-up (children before parents), instead of
+# loading everything through the ORM cascades. Each batch is committed so no
+# lock is held for long; an interrupted purge can simply be run again. Rows in
+# the trash are included (see soft_delete).
+
+PURGE_BATCH_ROWS = 1000
+IMAGE_CHECK_BATCH = 100  # candidate file names per LIKE query when looking for orphans
+
+IMAGE_URL = re.compile(r"/api/upload/images/([\w.-]+)")
+
+# Models whose text columns may embed uploaded images
+CONTENT_MODELS = (
+    Project, Sprint, Bug, Requirement, Task, TestCase, BugComment, RequirementComment, TaskComment,
+)
+
+
+def _text_columns(model) -> List:
+    return [column for column in model.__table__.columns if isinstance(column.type, Text)]
+
+
+def _purge_plan(project_id: int) -> List[tuple]:
+    """(model, criteria) in delete order, or (model, criteria, values) to detach rows of other projects"""
+    bugs = select(Bug.id).where(Bug.project_id == project_id)
+    requirements = select(Requirement.id).where(Requirement.project_id == project_id)
+    tasks = select(Task.id).where(Task.requirement_id.in_(requirements))
+    testcases = select(TestCase.id).where(TestCase.project_id == project_id)
+    sprints = select(Sprint.id).where(Sprint.project_id == project_id)
+
+    return [
+        (CommentMention, CommentMention.project_id == project_id),
+        (HistoryArchive, and_(HistoryArchive.entity_type == "bug", HistoryArchive.entity_id.in_(bugs))),
+        (HistoryArchive, and_(HistoryArchive.entity_type == "task", HistoryArchive.entity_id.in_(tasks))),
+        (HistoryArchive, and_(HistoryArchive.entity_type == "requirement", HistoryArchive.entity_id.in_(requirements))),
+        (HistoryArchive, and_(HistoryArchive.entity_type == "testcase", HistoryArchive.entity_id.in_(testcases))),
+        (BugComment, BugComment.bug_id.in_(bugs)),
+        (BugHistory, BugHistory.bug_id.in_(bugs)),
+        (TaskComment, TaskComment.task_id.in_(tasks)),
+        (TaskHistory, TaskHistory.task_id.in_(tasks)),
+        (RequirementComment, RequirementComment.requirement_id.in_(requirements)),
+        (RequirementHistory, RequirementHistory.requirement_id.in_(requirements)),
+        (TestCaseHistory, TestCaseHistory.testcase_id.in_(testcases)),
+        (Bug, Bug.project_id == project_id),
+        # Rows of other projects pointing into this one lose the link instead of blocking the delete
+        (Bug, Bug.task_id.in_(tasks), {Bug.task_id: None}),
+        (Bug, Bug.testcase_id.in_(testcases), {Bug.testcase_id: None}),
+        (Bug, Bug.requirement_id.in_(requirements), {Bug.requirement_id: None}),
+        (Bug, Bug.sprint_id.in_(sprints), {Bug.sprint_id: None}),
+        (Task, Task.requirement_id.in_(requirements)),
+        (TestCase, TestCase.project_id == project_id),
+        (TestCase, TestCase.requirement_id.in_(requirements), {TestCase.requirement_id: None}),
+        (TestCase, TestCase.sprint_id.in_(sprints), {TestCase.sprint_id: None}),
+        (Requirement, Requirement.project_id == project_id),
+        # Self-referencing trees: unlink first so batches may delete in any order
+        (RequirementCategory, and_(RequirementCategory.project_id == project_id, RequirementCategory.parent_id.isnot(None)), {RequirementCategory.parent_id: None}),
+        (RequirementCategory, RequirementCategory.project_id == project_id),
+        (TestCaseCategory, and_(TestCaseCategory.project_id == project_id, TestCaseCategory.parent_id.isnot(None)), {TestCaseCategory.parent_id: None}),
+        (TestCaseCategory, TestCaseCategory.project_id == project_id),
+        (SprintDailyStat, SprintDailyStat.sprint_id.in_(sprints)),
+        (Sprint, Sprint.project_id == project_id),
+        (ProjectMember, ProjectMember.project_id == project_id),
+        (ProjectCounter, ProjectCounter.project_id == project_id),
+        (DeletionLog, DeletionLog.project_id == project_id),
+        (Project, Project.id == project_id),
+    ]
+
+
+def image_names(db: Session, scopes: Iterable[tuple]) -> Set[str]:
+    """Uploaded image file names referenced by rows of (model, criteria) scopes"""
+    names = set()
+    for model, criteria in scopes:
+        for column in _text_columns(model):
+            query = db.query(column).execution_options(**{INCLUDE_DELETED: True}).filter(
+                column.like("%/api/upload/images/%")
+            )
+            if criteria is not None:
+                query = query.filter(criteria)
+            for (text,) in query.yield_per(PURGE_BATCH_ROWS):
+                names.update(IMAGE_URL.findall(text))
+    return names
+
+
+def _project_scopes(project_id: int) -> List[tuple]:
+    requirements = select(Requirement.id).where(Requirement.project_id == project_id)
+    tasks = select(Task.id).where(Task.requirement_id.in_(requirements))
+    return [
+        (Project, Project.id == project_id),
+        (Sprint, Sprint.project_id == project_id),
+        (Bug, Bug.project_id == project_id),
+        (Requirement, Requirement.project_id == project_id),
+        (Task, Task.requirement_id.in_(requirements)),
+        (TestCase, TestCase.project_id == project_id),
+        (BugComment, BugComment.bug_id.in_(select(Bug.id).where(Bug.project_id == project_id))),
+        (RequirementComment, RequirementComment.requirement_id.in_(requirements)),
+        (TaskComment, TaskComment.task_id.in_(tasks)),
+    ]
+
+
+def project_image_names(db: Session, project_id: int) -> Set[str]:
+    """Uploaded image file names referenced anywhere in a project"""
+    return image_names(db, _project_scopes(project_id))
+
+
+def referenced_images(db: Session, names: Set[str]) -> Set[str]:
+    """
+    Those of ``names`` that some row (trash included) still references.
+
+    Only rows mentioning one of the names are read, a batch of names per
+    query, rather than every row that embeds an image.
+    """
+    found: Set[str] = set()
+    pending = sorted(names)
+    for start in range(0, len(pending), IMAGE_CHECK_BATCH):
+        batch = set(pending[start:start + IMAGE_CHECK_BATCH])
+        for model in CONTENT_MODELS:
+            for column in _text_columns(model):
+                unseen = batch - found
+                if not unseen:
+                    break
+                query = db.query(column).execution_options(**{INCLUDE_DELETED: True}).filter(or_(*(
+                    column.contains(f"/api/upload/images/{name}", autoescape=True) for name in sorted(unseen)
+                )))
+                for (text,) in query.yield_per(PURGE_BATCH_ROWS):
+                    found.update(unseen.intersection(IMAGE_URL.findall(text)))
+    return found
+
+
+def remove_orphan_images(db: Session, candidates: Set[str]) -> int:
+    """Delete uploaded files among ``candidates`` that no remaining row references"""
+    if not candidates:
+        return 0
+    from app.api.upload import UPLOAD_DIR
+
+    removed = 0
+    for name in candidates - referenced_images(db, candidates):
+        path = os.path.join(UPLOAD_DIR, os.path.basename(name))
+        if os.path.isfile(path):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def purge_steps(
+    db: Session,
+    plan: List[tuple],
+    batch_size: int = PURGE_BATCH_ROWS,
+    on_batch: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, dict]:
+    """Run a purge plan batch by batch, returning ``{table: {"rows", "ms"}}``"""
+    report: Dict[str, dict] = {}
+    done = 0
+    for step in plan:
+        model, criteria = step[0], step[1]
+        values = step[2] if len(step) > 2 else None
+        table = model.__tablename__
+        stats = report.setdefault(table, {"rows": 0, "ms": 0.0})
+        while True:
+            step_started = time.perf_counter()
+            ids = [
+                row_id for (row_id,) in
+                db.query(model.id).execution_options(**{INCLUDE_DELETED: True}).filter(criteria).limit(batch_size).all()
+            ]
+            if not ids:
+                break
+            query = db.query(model).filter(model.id.in_(ids))
+            if values is None:
+                count = query.delete(synchronize_session=False)
+                stats["rows"] += count
+                done += count
+            else:
+                # Detached rows stay visible: delta sync must resend them and
+                # cached responses and ETags of their projects must change
+                project_ids = [
+                    project_id for (project_id,) in
+                    db.query(model.project_id).execution_options(**{INCLUDE_DELETED: True}).filter(
+                        model.id.in_(ids)
+                    ).distinct()
+                ]
+                if "updated_at" in model.__table__.columns:
+                    values = {**values, model.updated_at: datetime.utcnow()}
+                query.update(values, synchronize_session=False)
+                bump_data_version(db, *project_ids)
+            db.commit()
+            stats["ms"] += (time.perf_counter() - step_started) * 1000
+            if on_batch:
+                on_batch(table, done)
+
+    for stats in report.values():
+        stats["ms"] = round(stats["ms"], 1)
+    return report
+
+
+def purge_project(
+    db: Session,
+    project_id: int,
+    batch_size: int = PURGE_BATCH_ROWS,
+    on_batch: Optional[Callable[[str, int], None]] = None,
+    images: Optional[Iterable[str]] = None,
+) -> Dict[str, dict]:
+    """
+    Delete a project and everything in it, committing after every batch.
+
+    ``on_batch(table, rows_done)`` is called after each committed batch (e.g.
+    to report job progress). ``images`` are the project's image names from
+    project_image_names(), collected before the first batch; pass them when
+    resuming, since the rows they came from may already be gone. Returns
+    ``{table: {"rows", "ms"}}`` in delete order plus "images" (files removed)
+    and "total_ms".
+    """
+    started = time.perf_counter()
+    images = set(images) if images is not None else project_image_names(db, project_id)
+
+    report = purge_steps(db, _purge_plan(project_id), batch_size, on_batch)
+
+    image_started = time.perf_counter()
+    report["images"] = {
+        "rows": remove_orphan_images(db, images),
+        "ms": round((time.perf_counter() - image_started) * 1000, 1),
+    }
+    report["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
@@ -0,0 +1,41 @@
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from app.models.project import Project
+
+# Human-readable numbers come from the per-project counters on the projects
+# row. One UPDATE ... SET seq = seq + n reserves n numbers atomically, so the
+# number is known before the INSERT. The row stays locked until commit, which
+# every mutation already does through bump_data_version. Numbers reserved by a
+# rolled-back transaction are handed out again; bulk inserts reserve exactly
+# as many numbers as they insert, so a batch gets consecutive numbers.
+
+# entity -> (sequence column, prefix after the project key)
+SEQUENCES = {
+    "bug": (Project.bug_seq, ""),
+    "requirement": (Project.requirement_seq, "R"),
+    "task": (Project.task_seq, "T"),
+    "testcase": (Project.testcase_seq, "TC"),
+    "sprint": (Project.sprint_seq, "S"),
+}
+
+
+def format_number(project_key: str, entity: str, seq: int) -> str:
+    """e.g. PROJ-001 for bugs, PROJ-R012 for requirements, PROJ-TC1234 for test cases"""
+    return f"{project_key}-{SEQUENCES[entity][1]}{seq:03d}"
+
+
+def reserve_numbers(db: Session, project_id: int, entity: str, count: int = 1) -> List[str]:
+    """Reserve ``count`` consecutive numbers in the caller's transaction"""
+    column = SEQUENCES[entity][0]
+    db.query(Project).filter(Project.id == project_id).update(
+        {column: column + count}, synchronize_session=False
+    )
+    key, last = db.query(Project.key, column).filter(Project.id == project_id).one()
+    return [format_number(key, entity, seq) for seq in range(last - count + 1, last + 1)]
+
+
+def next_number(db: Session, project_id: int, entity: str) -> str:
+    return reserve_numbers(db, project_id, entity)[0]
+
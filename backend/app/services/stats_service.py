@@ -0,0 +1,505 @@
+from collections import defaultdict
+from datetime import datetime, date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.bug import Bug, BugStatus, BugHistory
+from app.models.requirement import Requirement, RequirementStatus, RequirementHistory
+from app.models.task import Task, TaskStatus, TaskHistory
+from app.models.testcase import TestCase, TestCaseStatus, TestCaseHistory
+from app.models.sprint import Sprint, SprintDailyStat
+from app.models.project import Project, ProjectCounter
+from app.services.sync_service import iter_cascade
+from app.utils.counters import upsert_increment
+
+# 实体类型 -> 全部状态（保证序列中每个状态都有值）
+ENTITY_STATUSES = {
+    "requirement": [s.value for s in RequirementStatus],
+    "task": [s.value for s in TaskStatus],
+    "bug": [s.value for s in BugStatus],
+    "testcase": [s.value for s in TestCaseStatus],
+}
+
+# 视为已完成的状态（燃尽/燃起图）
+DONE_STATUSES = {
+    "requirement": {RequirementStatus.COMPLETED.value},
+    "task": {TaskStatus.DONE.value},
+    "bug": {BugStatus.RESOLVED.value, BugStatus.CLOSED.value},
+    "testcase": {TestCaseStatus.PASSED.value},
+}
+
+# 不计入迭代范围的状态
+OUT_OF_SCOPE_STATUSES = {
+    "requirement": {RequirementStatus.CANCELLED.value},
+}
+
+# 项目看板计数维度
+COUNTER_DIMENSIONS = {
+    "bug": ("status", "priority", "severity", "assignee"),
+    "requirement": ("status", "priority", "assignee", "category"),
+    "task": ("status", "priority", "assignee"),
+    "testcase": ("status", "priority", "type", "category"),
+}
+
+# 以外键 id 计数的维度（空值记为 UNASSIGNED）
+ID_DIMENSIONS = {
+    "assignee": "assignee_id",
+    "category": "category_id",
+}
+
+ENTITY_MODELS = {
+    "bug": Bug,
+    "requirement": Requirement,
+    "task": Task,
+    "testcase": TestCase,
+}
+
+UNASSIGNED = "none"
+
+
+def _today() -> date:
+    return datetime.utcnow().date()
+
+
+def _value(value):
+    return value.value if hasattr(value, "value") else value
+
+
+def _dimension_column(model, dimension):
+    return getattr(model, ID_DIMENSIONS.get(dimension, dimension))
+
+
+def _dimension_value(value, dimension) -> str:
+    if dimension in ID_DIMENSIONS:
+        return str(value) if value else UNASSIGNED
+    return _value(value)
+
+
+def _lock_since(db: Session, column, row_id: int) -> Optional[datetime]:
+    """Lock a project or sprint row (SELECT ... FOR UPDATE) and read its ``*_since`` column"""
+    return db.query(column).filter(column.class_.id == row_id).with_for_update().scalar()
+
+
+# ========== Snapshots ==========
+
+def capture_stats(obj) -> Optional[dict]:
+    """Capture the fields aggregated by analytics. Call before mutating obj."""
+    if isinstance(obj, Bug):
+        entity, project_id, sprint_id = "bug", obj.project_id, obj.sprint_id
+    elif isinstance(obj, Requirement):
+        entity, project_id, sprint_id = "requirement", obj.project_id, obj.sprint_id
+    elif isinstance(obj, Task):
+        entity, project_id, sprint_id = "task", obj.requirement.project_id, obj.requirement.sprint_id
+    elif isinstance(obj, TestCase):
+        entity, project_id, sprint_id = "testcase", obj.project_id, obj.sprint_id
+    else:
+        return None
+    return build_snapshot(entity, obj.id, project_id, sprint_id, lambda key: getattr(obj, key))
+
+
+def build_snapshot(entity: str, entity_id: Optional[int], project_id: int, sprint_id: Optional[int], get) -> dict:
+    """Snapshot from column values read with ``get(column_key)``, e.g. rows of a bulk insert"""
+    model = ENTITY_MODELS[entity]
+    return {
+        "entity": entity,
+        "id": entity_id,
+        "project_id": project_id,
+        "sprint_id": sprint_id,
+        "status": _value(get("status")),
+        "counters": {
+            dimension: _dimension_value(get(_dimension_column(model, dimension).key), dimension)
+            for dimension in COUNTER_DIMENSIONS[entity]
+        },
+    }
+
+
+def snapshot_columns(entity: str) -> List[str]:
+    """Column keys build_snapshot reads, for loading them without the entity"""
+    model = ENTITY_MODELS[entity]
+    return ["status"] + [_dimension_column(model, dimension).key for dimension in COUNTER_DIMENSIONS[entity]]
+
+
+def apply_stats_change(db: Session, before: Optional[dict], after: Optional[dict]) -> None:
+    """
+    Apply the difference between two snapshots of the same entity.
+
+    ``before`` is None for creates and ``after`` is None for deletes.
+    """
+    apply_stats_changes(db, [(before, after)])
+
+
+def apply_stats_changes(db: Session, changes: Iterable[Tuple[Optional[dict], Optional[dict]]]) -> None:
+    """Apply many (before, after) snapshot pairs with one upsert per changed counter"""
+    deltas = defaultdict(int)  # (sprint_id, entity, status) -> delta
+    counter_deltas = defaultdict(int)  # (project_id, entity, dimension, value) -> delta
+    moved = {}  # requirement_id -> (old sprint_id, new sprint_id)
+    for before, after in changes:
+        snapshot = after or before
+        if snapshot is None:
+            continue
+        entity = snapshot["entity"]
+
+        if before and before["sprint_id"]:
+            deltas[(before["sprint_id"], entity, before["status"])] -= 1
+        if after and after["sprint_id"]:
+            deltas[(after["sprint_id"], entity, after["status"])] += 1
+
+        if entity == "requirement" and before and after and before["sprint_id"] != after["sprint_id"]:
+            moved[snapshot["id"]] = (before["sprint_id"], after["sprint_id"])
+
+        if before:
+            for dimension, value in before["counters"].items():
+                counter_deltas[(before["project_id"], entity, dimension, value)] -= 1
+        if after:
+            for dimension, value in after["counters"].items():
+                counter_deltas[(after["project_id"], entity, dimension, value)] += 1
+
+    # 需求换迭代时，其下任务随之移动
+    if moved:
+        task_counts = db.query(Task.requirement_id, Task.status, func.count(Task.id)).filter(
+            Task.requirement_id.in_(moved)
+        ).group_by(Task.requirement_id, Task.status).all()
+        for requirement_id, status, count in task_counts:
+            old_sprint_id, new_sprint_id = moved[requirement_id]
+            if old_sprint_id:
+                deltas[(old_sprint_id, "task", status.value)] -= count
+            if new_sprint_id:
+                deltas[(new_sprint_id, "task", status.value)] += count
+
+    _apply_sprint_deltas(db, deltas)
+    _apply_counter_deltas(db, counter_deltas)
+
+
+def record_stats_deletions(db: Session, objects: Iterable) -> None:
+    """Remove objects (and rows the ORM cascade deletes with them) from analytics"""
+    seen = set()
+    for root in objects:
+        for obj in iter_cascade(root):
+            snapshot = capture_stats(obj)
+            if snapshot is None or (snapshot["entity"], snapshot["id"]) in seen:
+                continue
+            seen.add((snapshot["entity"], snapshot["id"]))
+            apply_stats_change(db, snapshot, None)
+
+
+# ========== Sprint Daily Stats ==========
+
+def _apply_sprint_deltas(db: Session, deltas: Dict[Tuple[int, str, str], int]) -> None:
+    sprint_ids = {sprint_id for (sprint_id, _, _), delta in deltas.items() if delta}
+    if not sprint_ids:
+        return
+
+    # 未初始化的迭代会在首次读取时整体重建，这里跳过。
+    # 未初始化的行也要加锁，与重建互斥（见 rebuild_sprint_stats）
+    tracked = {
+        sprint_id for sprint_id, stats_since in db.query(Sprint.id, Sprint.stats_since).filter(
+            Sprint.id.in_(sprint_ids)
+        ).order_by(Sprint.id).with_for_update().all()
+        if stats_since is not None
+    }
+
+    today = _today()
+    for (sprint_id, entity, status), delta in deltas.items():
+        if delta and sprint_id in tracked:
+            upsert_increment(
+                db, SprintDailyStat,
+                {"sprint_id": sprint_id, "stat_date": today, "entity": entity, "status": status},
+                "delta", delta,
+            )
+
+
+def _sprint_items(db: Session, sprint_id: int):
+    """Yield (entity, history model, history fk, item rows) for a sprint's items"""
+    yield "requirement", RequirementHistory, RequirementHistory.requirement_id, db.query(
+        Requirement.id, Requirement.status, Requirement.created_at
+    ).filter(Requirement.sprint_id == sprint_id).all()
+    yield "task", TaskHistory, TaskHistory.task_id, db.query(
+        Task.id, Task.status, Task.created_at
+    ).join(Requirement, Task.requirement_id == Requirement.id).filter(
+        Requirement.sprint_id == sprint_id
+    ).all()
+    yield "bug", BugHistory, BugHistory.bug_id, db.query(
+        Bug.id, Bug.status, Bug.created_at
+    ).filter(Bug.sprint_id == sprint_id).all()
+    yield "testcase", TestCaseHistory, TestCaseHistory.testcase_id, db.query(
+        TestCase.id, TestCase.status, TestCase.created_at
+    ).filter(TestCase.sprint_id == sprint_id).all()
+
+
+def rebuild_sprint_stats(db: Session, sprint: Sprint) -> None:
+    """
+    Rebuild a sprint's daily stats by replaying status history of its current items.
+
+    Used to backfill sprints created before analytics existed. Status changes
+    that left no history (e.g. bulk updates) are reconciled on today's date.
+
+    Locks the sprint row, which writers lock too before applying deltas (see
+    _apply_sprint_deltas), so no change commits unseen until stats_since is
+    set. Start a new transaction first: under REPEATABLE READ the replay must
+    not read a snapshot older than the lock.
+    """
+    _lock_since(db, Sprint.stats_since, sprint.id)
+    db.query(SprintDailyStat).filter(SprintDailyStat.sprint_id == sprint.id).delete(
+        synchronize_session=False
+    )
+
+    today = _today()
+    deltas = defaultdict(int)  # (stat_date, entity, status) -> delta
+    for entity, history_model, history_fk, items in _sprint_items(db, sprint.id):
+        if not items:
+            continue
+        item_ids = [item.id for item in items]
+
+        changes = defaultdict(list)
+        for start in range(0, len(item_ids), 500):
+            rows = db.query(
+                history_fk, history_model.old_value, history_model.new_value, history_model.changed_at
+            ).filter(
+                history_fk.in_(item_ids[start:start + 500]),
+                history_model.field == "status",
+                history_model.old_value.isnot(None),
+            ).order_by(history_model.changed_at, history_model.id).all()
+            for item_id, old_value, new_value, changed_at in rows:
+                changes[item_id].append((old_value, new_value, changed_at))
+
+        for item in items:
+            current = item.status.value
+            item_changes = changes[item.id]
+            status = item_changes[0][0] if item_changes else current
+            deltas[(item.created_at.date(), entity, status)] += 1
+            for _, new_value, changed_at in item_changes:
+                deltas[(changed_at.date(), entity, status)] -= 1
+                deltas[(changed_at.date(), entity, new_value)] += 1
+                status = new_value
+            if status != current:
+                deltas[(today, entity, status)] -= 1
+                deltas[(today, entity, current)] += 1
+
+    db.add_all([
+        SprintDailyStat(sprint_id=sprint.id, stat_date=stat_date, entity=entity, status=status, delta=delta)
+        for (stat_date, entity, status), delta in deltas.items()
+        if delta
+    ])
+    sprint.stats_since = today
+
+
+def get_sprint_series(db: Session, sprint: Sprint) -> dict:
+    """Build status-mix, burndown and burnup time series from the daily stats"""
+    if sprint.stats_since is None:
+        db.commit()
+        # Another request may have rebuilt while this one waited for the lock
+        if _lock_since(db, Sprint.stats_since, sprint.id) is None:
+            rebuild_sprint_stats(db, sprint)
+        db.commit()
+
+    rows = db.query(
+        SprintDailyStat.stat_date, SprintDailyStat.entity, SprintDailyStat.status, SprintDailyStat.delta
+    ).filter(
+        SprintDailyStat.sprint_id == sprint.id
+    ).order_by(SprintDailyStat.stat_date).all()
+
+    today = _today()
+    start = sprint.start_date or (rows[0].stat_date if rows else today)
+    end = min(sprint.end_date, today) if sprint.end_date else today
+    end = max(end, start)
+    planned_end = max(sprint.end_date or end, start)
+
+    totals = defaultdict(int)
+    by_status = {
+        entity: {status: [] for status in statuses}
+        for entity, statuses in ENTITY_STATUSES.items()
+    }
+    dates = []
+    index = 0
+    day = start
+    while day <= end:
+        while index < len(rows) and rows[index].stat_date <= day:
+            row = rows[index]
+            totals[(row.entity, row.status)] += row.delta
+            index += 1
+        dates.append(day.isoformat())
+        for entity, statuses in ENTITY_STATUSES.items():
+            for status in statuses:
+                by_status[entity][status].append(totals[(entity, status)])
+        day += timedelta(days=1)
+
+    planned_days = (planned_end - start).days
+    result = {}
+    for entity, series in by_status.items():
+        scope_statuses = [s for s in series if s not in OUT_OF_SCOPE_STATUSES.get(entity, set())]
+        scope = [sum(series[s][i] for s in scope_statuses) for i in range(len(dates))]
+        done = [sum(series[s][i] for s in DONE_STATUSES[entity]) for i in range(len(dates))]
+        remaining = [total - finished for total, finished in zip(scope, done)]
+        initial = remaining[0] if remaining else 0
+        ideal = [
+            round(initial * (1 - i / planned_days), 2) if planned_days else 0
+            for i in range(len(dates))
+        ]
+        result[entity] = {
+            "by_status": series,
+            "scope": scope,
+            "done": done,
+            "remaining": remaining,
+            "ideal": ideal,
+        }
+
+    return {
+        "sprint_id": sprint.id,
+        "start_date": start.isoformat(),
+        "end_date": planned_end.isoformat(),
+        "dates": dates,
+        "series": result,
+    }
+
+
+# ========== Project Counters ==========
+
+def _apply_counter_deltas(db: Session, deltas: Dict[Tuple[int, str, str, str], int]) -> None:
+    project_ids = {project_id for (project_id, _, _, _), delta in deltas.items() if delta}
+    if not project_ids:
+        return
+
+    # 未初始化的项目会在首次读取看板时整体重建，这里跳过。
+    # 未初始化的行也要加锁，与重建互斥（见 rebuild_project_counters）
+    tracked = {
+        project_id for project_id, counters_since in db.query(Project.id, Project.counters_since).filter(
+            Project.id.in_(project_ids)
+        ).order_by(Project.id).with_for_update().all()
+        if counters_since is not None
+    }
+
+    for (project_id, entity, dimension, value), delta in deltas.items():
+        if delta and project_id in tracked:
+            upsert_increment(
+                db, ProjectCounter,
+                {"project_id": project_id, "entity": entity, "dimension": dimension, "value": value},
+                "count", delta,
+            )
+
+
+def rebuild_project_counters(db: Session, project: Project) -> None:
+    """
+    Rebuild a project's dashboard counters from scratch with GROUP BY queries.
+
+    Locks the project row, which writers lock too before applying deltas (see
+    _apply_counter_deltas), so no change commits uncounted until
+    counters_since is set. Start a new transaction first: under REPEATABLE
+    READ the counts must not read a snapshot older than the lock.
+    """
+    _lock_since(db, Project.counters_since, project.id)
+    db.query(ProjectCounter).filter(ProjectCounter.project_id == project.id).delete(
+        synchronize_session=False
+    )
+
+    counters = []
+    for entity, dimensions in COUNTER_DIMENSIONS.items():
+        model = ENTITY_MODELS[entity]
+        for dimension in dimensions:
+            column = _dimension_column(model, dimension)
+            query = db.query(column, func.count(model.id))
+            if model is Task:
+                query = query.join(Requirement, Task.requirement_id == Requirement.id).filter(
+                    Requirement.project_id == project.id
+                )
+            else:
+                query = query.filter(model.project_id == project.id)
+
+            merged = defaultdict(int)
+            for value, count in query.group_by(column).all():
+                merged[_dimension_value(value, dimension)] += count
+            counters.extend(
+                ProjectCounter(project_id=project.id, entity=entity, dimension=dimension, value=value, count=count)
+                for value, count in merged.items()
+            )
+
+    db.add_all(counters)
+    project.counters_since = datetime.utcnow()
+
+
+def _ensure_project_counters(db: Session, project: Project) -> None:
+    """Build a project's counters on first use"""
+    if project.counters_since is not None:
+        return
+    db.commit()
+    # Another request may have rebuilt while this one waited for the lock
+    if _lock_since(db, Project.counters_since, project.id) is None:
+        rebuild_project_counters(db, project)
+    db.commit()
+
+
+def _ratio(numerator: int, denominator: int) -> float:
+    return round(numerator / denominator, 4) if denominator else 0.0
+
+
+def get_project_dashboard(db: Session, project: Project) -> dict:
+    """Load all dashboard numbers for a project from its counters"""
+    _ensure_project_counters(db, project)
+
+    rows = db.query(
+        ProjectCounter.entity, ProjectCounter.dimension, ProjectCounter.value, ProjectCounter.count
+    ).filter(
+        ProjectCounter.project_id == project.id,
+        ProjectCounter.count != 0
+    ).all()
+
+    counters = {
+        entity: {dimension: {} for dimension in dimensions}
+        for entity, dimensions in COUNTER_DIMENSIONS.items()
+    }
+    for entity, dimension, value, count in rows:
+        counters.setdefault(entity, {}).setdefault(dimension, {})[value] = count
+
+    def total(entity):
+        return sum(counters[entity]["status"].values())
+
+    def in_status(entity, statuses):
+        return sum(counters[entity]["status"].get(status, 0) for status in statuses)
+
+    requirement_scope = total("requirement") - in_status("requirement", OUT_OF_SCOPE_STATUSES["requirement"])
+    requirements_done = in_status("requirement", DONE_STATUSES["requirement"])
+    testcases_passed = in_status("testcase", DONE_STATUSES["testcase"])
+    testcases_executed = total("testcase") - in_status("testcase", {TestCaseStatus.NOT_EXECUTED.value})
+
+    return {
+        "project_id": project.id,
+        "counters_since": project.counters_since.isoformat(),
+        "counters": counters,
+        "summary": {
+            "bugs_total": total("bug"),
+            "bugs_open": total("bug") - in_status("bug", DONE_STATUSES["bug"]),
+            "requirements_total": total("requirement"),
+            "requirements_completed": requirements_done,
+            "requirement_progress": _ratio(requirements_done, requirement_scope),
+            "tasks_total": total("task"),
+            "tasks_done": in_status("task", DONE_STATUSES["task"]),
+            "testcases_total": total("testcase"),
+            "testcases_executed": testcases_executed,
+            "testcase_pass_rate": _ratio(testcases_passed, testcases_executed),
+        },
+    }
+
+
+# ========== Category Counts ==========
+
+def get_category_counts(db: Session, project: Project, entity: str) -> Dict[Optional[int], int]:
+    """Direct item counts per category id (None for uncategorized), read from the project counters"""
+    _ensure_project_counters(db, project)
+
+    rows = db.query(ProjectCounter.value, ProjectCounter.count).filter(
+        ProjectCounter.project_id == project.id,
+        ProjectCounter.entity == entity,
+        ProjectCounter.dimension == "category",
+        ProjectCounter.count != 0
+    ).all()
+    return {None if value == UNASSIGNED else int(value): count for value, count in rows}
+
+
+def move_category_counts(db: Session, project_id: int, entity: str,
+                         from_category_id: Optional[int], to_category_id: Optional[int], count: int) -> None:
+    """Shift counts for items bulk-moved between categories without per-row snapshots"""
+    _apply_counter_deltas(db, {
+        (project_id, entity, "category", _dimension_value(from_category_id, "category")): -count,
+        (project_id, entity, "category", _dimension_value(to_category_id, "category")): count,
+    })
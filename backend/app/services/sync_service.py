@@ -0,0 +1,259 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.models.bug import Bug
+from app.models.project import Project
+from app.models.requirement import Requirement
+from app.models.task import Task
+from app.models.testcase import TestCase
+from app.models.sprint import Sprint
+from app.models.sync import DeletionLog
+
+EPOCH = datetime(1970, 1, 1)
+
+# updated_at (and deleted_at) are set when a row is flushed, not when its
+# transaction commits, and by the clock of whichever server wrote it. A row
+# can therefore become visible with a timestamp older than a watermark that
+# was already handed out; incremental syncs re-read this far back to catch it.
+SYNC_OVERLAP = timedelta(minutes=2)
+
+SYNC_PAGE_ROWS = 1000  # default rows per full-sync page
+
+# Columns returned for each entity type in a change set
+SYNC_COLUMNS = {
+    "bugs": (
+        Bug.id, Bug.bug_number, Bug.title, Bug.status, Bug.priority, Bug.severity,
+        Bug.assignee_id, Bug.sprint_id, Bug.requirement_id, Bug.task_id, Bug.testcase_id,
+        Bug.updated_at,
+    ),
+    "requirements": (
+        Requirement.id, Requirement.requirement_number, Requirement.title, Requirement.status,
+        Requirement.priority, Requirement.sprint_id, Requirement.category_id,
+        Requirement.assignee_id, Requirement.updated_at,
+    ),
+    "tasks": (
+        Task.id, Task.requirement_id, Task.task_number, Task.title, Task.status,
+        Task.priority, Task.assignee_id, Task.updated_at,
+    ),
+    "testcases": (
+        TestCase.id, TestCase.case_number, TestCase.name, TestCase.type, TestCase.status,
+        TestCase.priority, TestCase.category_id, TestCase.requirement_id, TestCase.sprint_id,
+        TestCase.updated_at,
+    ),
+    "sprints": (
+        Sprint.id, Sprint.sprint_number, Sprint.name, Sprint.status,
+        Sprint.start_date, Sprint.end_date, Sprint.updated_at,
+    ),
+}
+
+
+# ========== Deletion Log ==========
+
+def _entity_info(obj) -> Tuple[str, int, Optional[str]]:
+    """Return (entity_type, project_id, number) for a tracked entity"""
+    if isinstance(obj, Bug):
+        return "bug", obj.project_id, obj.bug_number
+    if isinstance(obj, Requirement):
+        return "requirement", obj.project_id, obj.requirement_number
+    if isinstance(obj, Task):
+        return "task", obj.requirement.project_id, obj.task_number
+    if isinstance(obj, TestCase):
+        return "testcase", obj.project_id, obj.case_number
+    if isinstance(obj, Sprint):
+        return "sprint", obj.project_id, obj.sprint_number
+    raise ValueError(f"Untracked entity: {obj!r}")
+
+
+def iter_cascade(obj) -> Iterable:
+    """Yield obj plus the tracked rows the ORM cascade will delete with it"""
+    yield obj
+    if isinstance(obj, Requirement):
+        for task in obj.tasks:
+            yield from iter_cascade(task)
+    elif isinstance(obj, Task):
+        yield from obj.bugs
+
+
+def record_deletions(db: Session, objects: Iterable, user_id: Optional[int] = None) -> None:
+    """Write tombstones for objects about to be deleted (call before db.delete)"""
+    seen = set()
+    for root in objects:
+        for obj in iter_cascade(root):
+            entity_type, project_id, number = _entity_info(obj)
+            if (entity_type, obj.id) in seen:
+                continue
+            seen.add((entity_type, obj.id))
+            db.add(DeletionLog(
+                project_id=project_id,
+                entity_type=entity_type,
+                entity_id=obj.id,
+                entity_number=number,
+                deleted_by=user_id,
+            ))
+
+
+# ========== Watermark ==========
+
+def encode_watermark(updated_at: datetime, deletion_id: int) -> str:
+    """Encode (max updated_at, last tombstone id) as an opaque token"""
+    micros = (updated_at - EPOCH) // timedelta(microseconds=1)
+    return f"{micros}.{deletion_id}"
+
+
+def decode_watermark(token: Optional[str]) -> Tuple[Optional[datetime], int]:
+    """Decode a watermark token; None means a full sync"""
+    if not token:
+        return None, 0
+    try:
+        micros, deletion_id = token.split(".")
+        return EPOCH + timedelta(microseconds=int(micros)), int(deletion_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+
+def encode_page_cursor(watermark: str, entity_index: int, updated_at: datetime, row_id: int) -> str:
+    """Encode a full-sync position: the pinned watermark plus (entity type, updated_at, id) of the last row sent"""
+    micros = (updated_at - EPOCH) // timedelta(microseconds=1)
+    return f"{watermark}.{entity_index}.{micros}.{row_id}"
+
+
+def decode_page_cursor(token: str) -> Tuple[str, int, datetime, int]:
+    try:
+        watermark_micros, deletion_id, entity_index, micros, row_id = token.split(".")
+        return (
+            f"{watermark_micros}.{deletion_id}", int(entity_index),
+            EPOCH + timedelta(microseconds=int(micros)), int(row_id),
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync cursor")
+
+
+# ========== Change Set ==========
+
+def _serialize(row) -> dict:
+    item = {}
+    for key, value in row._mapping.items():
+        if hasattr(value, "value"):
+            value = value.value
+        elif hasattr(value, "isoformat"):
+            value = value.isoformat()
+        item[key] = value
+    return item
+
+
+def _project_rows(db: Session, project_id: int, columns):
+    model = columns[0].class_
+    query = db.query(*columns)
+    if model is Task:
+        return query.join(Requirement, Task.requirement_id == Requirement.id).filter(
+            Requirement.project_id == project_id
+        )
+    return query.filter(model.project_id == project_id)
+
+
+def _full_sync_page(db: Session, project_id: int, watermark: str, entity_index: int,
+                    after_at: datetime, after_id: int, limit: int) -> dict:
+    """
+    Up to ``limit`` rows of a full sync, entity type by entity type in
+    (updated_at, id) order. Rows changed while the client pages may come
+    twice; the incremental sync from the pinned watermark sends them again
+    anyway.
+    """
+    changes = {entity_type: [] for entity_type in SYNC_COLUMNS}
+    next_cursor = None
+    remaining = limit
+    for index, (entity_type, columns) in enumerate(SYNC_COLUMNS.items()):
+        if index < entity_index:
+            continue
+        model = columns[0].class_
+        query = _project_rows(db, project_id, columns)
+        if index == entity_index:
+            query = query.filter(or_(
+                model.updated_at > after_at,
+                and_(model.updated_at == after_at, model.id > after_id),
+            ))
+        rows = query.order_by(model.updated_at, model.id).limit(remaining + 1).all()
+        more = len(rows) > remaining
+        rows = rows[:remaining]
+        changes[entity_type] = [_serialize(row) for row in rows]
+        if more:
+            if rows:
+                next_cursor = encode_page_cursor(watermark, index, rows[-1].updated_at, rows[-1].id)
+            elif index == entity_index:
+                next_cursor = encode_page_cursor(watermark, index, after_at, after_id)
+            else:
+                next_cursor = encode_page_cursor(watermark, index, EPOCH, 0)
+            break
+        remaining -= len(rows)
+
+    # A full sync has no local state to prune, so only the tombstone cursor matters
+    return {"watermark": watermark, "full": True, "changes": changes, "deleted": [], "next_cursor": next_cursor}
+
+
+def get_changes(db: Session, project_id: int, since: Optional[str],
+                cursor: Optional[str] = None, limit: int = SYNC_PAGE_ROWS) -> dict:
+    """
+    Collect rows created/updated since the watermark plus new tombstones.
+
+    Rows are compared with ``updated_at >= since - SYNC_OVERLAP`` so that rows
+    committed after the previous sync with an older timestamp are not lost;
+    clients apply the change set as idempotent upserts keyed by id.
+
+    A full sync (no watermark) is paged: while ``next_cursor`` is set, fetch
+    it with ``cursor`` and keep the watermark of the last page.
+    """
+    if cursor:
+        return _full_sync_page(db, project_id, *decode_page_cursor(cursor), limit)
+
+    since_at, since_deletion_id = decode_watermark(since)
+    floor = db.query(Project.tombstone_floor).filter(Project.id == project_id).scalar() or 0
+    if since_deletion_id < floor:
+        since_at = None  # Tombstones this client has not seen yet were purged
+
+    if since_at is None:
+        last_deletion_id = db.query(func.max(DeletionLog.id)).filter(
+            DeletionLog.project_id == project_id
+        ).scalar() or floor
+        # Pinned before the first page: whatever changes while the client
+        # pages is picked up by its first incremental sync
+        watermark = encode_watermark(datetime.utcnow(), last_deletion_id)
+        return _full_sync_page(db, project_id, watermark, 0, EPOCH, 0, limit)
+
+    window_start = since_at - SYNC_OVERLAP
+    max_updated_at = since_at
+    changes = {}
+    for entity_type, columns in SYNC_COLUMNS.items():
+        model = columns[0].class_
+        rows = _project_rows(db, project_id, columns).filter(
+            model.updated_at >= window_start
+        ).order_by(model.updated_at, model.id).all()
+        if rows:
+            max_updated_at = max(max_updated_at, rows[-1].updated_at)
+        changes[entity_type] = [_serialize(row) for row in rows]
+
+    # Tombstone ids are assigned at insert too, so a late commit may sit below the cursor
+    tombstones = db.query(DeletionLog).filter(
+        DeletionLog.project_id == project_id,
+        or_(DeletionLog.id > since_deletion_id, DeletionLog.deleted_at >= window_start),
+    ).order_by(DeletionLog.id).all()
+    last_deletion_id = max(since_deletion_id, tombstones[-1].id) if tombstones else since_deletion_id
+
+    return {
+        "watermark": encode_watermark(max_updated_at, last_deletion_id),
+        "full": False,
+        "changes": changes,
+        "deleted": [
+            {
+                "type": t.entity_type,
+                "id": t.entity_id,
+                "number": t.entity_number,
+                "deleted_at": t.deleted_at.isoformat(),
+            }
+            for t in tombstones
+        ],
+        "next_cursor": None,
+    }
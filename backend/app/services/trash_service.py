@@ -0,0 +1,291 @@
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.bug import Bug, BugHistory
+from app.models.comment import BugComment, RequirementComment, TaskComment, CommentMention
+from app.models.history import HistoryArchive
+from app.models.project import Project
+from app.models.requirement import Requirement, RequirementHistory
+from app.models.sync import DeletionLog
+from app.models.task import Task, TaskHistory
+from app.models.testcase import TestCase, TestCaseHistory
+from app.services.mention_service import sync_mentions, delete_mentions
+from app.services.purge_service import PURGE_BATCH_ROWS, purge_steps, image_names, remove_orphan_images
+from app.services.stats_service import capture_stats, apply_stats_change, record_stats_deletions
+from app.services.sync_service import iter_cascade, record_deletions
+from app.utils.comment_utils import extract_mentions
+from app.utils.soft_delete import INCLUDE_DELETED
+
+# Deleting moves rows to the project trash: deleted_at is set on the row and on
+# everything the old ORM cascade would have removed with it (a requirement's
+# tasks and their bugs), all with the same timestamp so a restore brings back
+# exactly that group. Sync tombstones and analytics are updated as for a hard
+# delete. purge_trash() removes rows that stayed in the trash too long.
+
+# trash type -> model
+TRASH_MODELS = {
+    "bug": Bug,
+    "requirement": Requirement,
+    "task": Task,
+    "testcase": TestCase,
+    "bug_comment": BugComment,
+    "requirement_comment": RequirementComment,
+    "task_comment": TaskComment,
+}
+
+# comment model -> (mention entity type, parent attribute)
+COMMENT_PARENTS = {
+    BugComment: ("bug", "bug"),
+    RequirementComment: ("requirement", "requirement"),
+    TaskComment: ("task", "task"),
+}
+
+# entity model -> mention entity type of its comments
+COMMENTED_ENTITIES = {Bug: "bug", Requirement: "requirement", Task: "task"}
+
+
+def project_id_of(obj) -> int:
+    if isinstance(obj, Task):
+        return obj.requirement.project_id
+    if type(obj) in COMMENT_PARENTS:
+        return project_id_of(getattr(obj, COMMENT_PARENTS[type(obj)][1]))
+    return obj.project_id
+
+
+def trash_query(db: Session, model, project_id: int, roots_only: bool = False):
+    """
+    Trashed rows of ``model`` in a project. ``roots_only`` leaves out rows
+    trashed together with their requirement / task (they come back with it).
+    """
+    query = db.query(model).execution_options(**{INCLUDE_DELETED: True}).filter(model.deleted_at.isnot(None))
+    if model is Task:
+        query = query.join(Requirement, Task.requirement_id == Requirement.id).filter(
+            Requirement.project_id == project_id
+        )
+        if roots_only:
+            query = query.filter(or_(Requirement.deleted_at.is_(None), Requirement.deleted_at != Task.deleted_at))
+        return query
+    if model is Bug and roots_only:
+        query = query.outerjoin(Task, Bug.task_id == Task.id).filter(
+            or_(Task.deleted_at.is_(None), Task.deleted_at != Bug.deleted_at)
+        )
+    if model in COMMENT_PARENTS:
+        parent = {BugComment: Bug, RequirementComment: Requirement, TaskComment: Task}[model]
+        fk = getattr(model, f"{COMMENT_PARENTS[model][1]}_id")
+        query = query.join(parent, fk == parent.id)
+        if parent is Task:
+            query = query.join(Requirement, Task.requirement_id == Requirement.id)
+            parent = Requirement
+        return query.filter(parent.project_id == project_id)
+    return query.filter(model.project_id == project_id)
+
+
+# ========== Delete / Restore ==========
+
+def soft_delete(db: Session, objects: Iterable, user_id: Optional[int] = None) -> None:
+    """
+    Move entities or comments to the trash (replaces record_deletions +
+    record_stats_deletions + db.delete); the caller bumps the data version and commits.
+    """
+    objects = list(objects)
+    now = datetime.utcnow()
+    entities = [obj for obj in objects if type(obj) not in COMMENT_PARENTS]
+    comments = [obj for obj in objects if type(obj) in COMMENT_PARENTS]
+
+    record_deletions(db, entities, user_id)
+    record_stats_deletions(db, entities)
+
+    hidden_comments = defaultdict(list)  # mention entity type -> comment ids
+    for root in entities:
+        for obj in iter_cascade(root):
+            if obj.deleted_at is None:
+                obj.deleted_at = now
+            if type(obj) in COMMENTED_ENTITIES:
+                hidden_comments[COMMENTED_ENTITIES[type(obj)]].extend(c.id for c in obj.comments)
+    for comment in comments:
+        comment.deleted_at = now
+        hidden_comments[COMMENT_PARENTS[type(comment)][0]].append(comment.id)
+
+    # Mentions of comments in the trash would otherwise stay in the inbox
+    for entity_type, comment_ids in hidden_comments.items():
+        delete_mentions(db, entity_type, comment_ids)
+
+
+def _restore_mentions(db: Session, comment, project_id: int) -> None:
+    entity_type, parent = COMMENT_PARENTS[type(comment)]
+    sync_mentions(
+        db, entity_type, getattr(comment, f"{parent}_id"), project_id, comment,
+        extract_mentions(comment.content, db, project_id),
+    )
+
+
+def restore(db: Session, objects: Iterable) -> List:
+    """
+    Bring trashed objects back together with the rows deleted along with them.
+
+    Returns the restored roots; the caller bumps the data version and commits.
+    Objects must be loaded with the include_deleted option.
+    """
+    now = datetime.utcnow()
+    restored = []
+    tombstones = defaultdict(set)  # entity type -> ids
+    for root in objects:
+        if root.deleted_at is None:
+            continue
+        if type(root) in COMMENT_PARENTS:
+            parent = getattr(root, COMMENT_PARENTS[type(root)][1])
+            if parent is None or parent.deleted_at is not None:
+                raise HTTPException(status_code=400, detail="请先恢复评论所属的工作项")
+            root.deleted_at = None
+            _restore_mentions(db, root, project_id_of(root))
+            restored.append(root)
+            continue
+        if isinstance(root, Task) and root.requirement.deleted_at is not None:
+            raise HTTPException(status_code=400, detail=f"请先恢复任务 {root.task_number} 所属的需求")
+
+        stamp = root.deleted_at
+        for obj in iter_cascade(root):
+            if obj.deleted_at != stamp:
+                continue  # Trashed separately: restored on its own
+            obj.deleted_at = None
+            obj.updated_at = now  # Incremental sync picks the row up again
+            snapshot = capture_stats(obj)
+            apply_stats_change(db, None, snapshot)
+            tombstones[snapshot["entity"]].add(obj.id)
+            if type(obj) in COMMENTED_ENTITIES:
+                for comment in obj.comments:
+                    if comment.deleted_at is None:
+                        _restore_mentions(db, comment, project_id_of(obj))
+        restored.append(root)
+
+    # The rows are back, so clients must no longer be told to drop them
+    for entity_type, ids in tombstones.items():
+        db.query(DeletionLog).filter(
+            DeletionLog.entity_type == entity_type, DeletionLog.entity_id.in_(ids)
+        ).delete(synchronize_session=False)
+    return restored
+
+
+# ========== Purge ==========
+
+def _project_parents(entity_type: str, project_id: int):
+    if entity_type == "task":
+        return select(Task.id).where(Task.requirement_id.in_(
+            select(Requirement.id).where(Requirement.project_id == project_id)
+        ))
+    model = {"bug": Bug, "requirement": Requirement}[entity_type]
+    return select(model.id).where(model.project_id == project_id)
+
+
+def _purge_plan(before: datetime, project_id: Optional[int]) -> List[tuple]:
+    """(model, criteria) in delete order, or (model, criteria, values) to detach remaining rows"""
+    def scoped(query, entity_type):
+        if project_id is None:
+            return query
+        model = TRASH_MODELS[entity_type]
+        if model is Task:
+            return query.where(Task.id.in_(_project_parents("task", project_id)))
+        return query.where(model.project_id == project_id)
+
+    requirements = scoped(select(Requirement.id).where(Requirement.deleted_at < before), "requirement")
+    tasks = scoped(select(Task.id).where(or_(Task.deleted_at < before, Task.requirement_id.in_(requirements))), "task")
+    bugs = scoped(select(Bug.id).where(Bug.deleted_at < before), "bug")
+    testcases = scoped(select(TestCase.id).where(TestCase.deleted_at < before), "testcase")
+
+    def comments(model, entity_type, parents):
+        """Comments trashed on their own, or belonging to a purged parent"""
+        fk = getattr(model, f"{COMMENT_PARENTS[model][1]}_id")
+        trashed = model.deleted_at < before
+        if project_id is not None:
+            trashed = and_(trashed, fk.in_(_project_parents(entity_type, project_id)))
+        return or_(fk.in_(parents), trashed)
+
+    bug_comments = comments(BugComment, "bug", bugs)
+    requirement_comments = comments(RequirementComment, "requirement", requirements)
+    task_comments = comments(TaskComment, "task", tasks)
+
+    return [
+        (CommentMention, and_(CommentMention.entity_type == "bug", CommentMention.comment_id.in_(select(BugComment.id).where(bug_comments)))),
+        (CommentMention, and_(CommentMention.entity_type == "task", CommentMention.comment_id.in_(select(TaskComment.id).where(task_comments)))),
+        (CommentMention, and_(CommentMention.entity_type == "requirement", CommentMention.comment_id.in_(select(RequirementComment.id).where(requirement_comments)))),
+        (BugComment, bug_comments),
+        (TaskComment, task_comments),
+        (RequirementComment, requirement_comments),
+        (HistoryArchive, and_(HistoryArchive.entity_type == "bug", HistoryArchive.entity_id.in_(bugs))),
+        (HistoryArchive, and_(HistoryArchive.entity_type == "task", HistoryArchive.entity_id.in_(tasks))),
+        (HistoryArchive, and_(HistoryArchive.entity_type == "requirement", HistoryArchive.entity_id.in_(requirements))),
+        (HistoryArchive, and_(HistoryArchive.entity_type == "testcase", HistoryArchive.entity_id.in_(testcases))),
+        (BugHistory, BugHistory.bug_id.in_(bugs)),
+        (TaskHistory, TaskHistory.task_id.in_(tasks)),
+        (RequirementHistory, RequirementHistory.requirement_id.in_(requirements)),
+        (TestCaseHistory, TestCaseHistory.testcase_id.in_(testcases)),
+        (Bug, Bug.id.in_(bugs)),
+        # Rows that stay (live, or trashed more recently) lose the link instead of blocking the delete
+        (Bug, Bug.task_id.in_(tasks), {Bug.task_id: None}),
+        (Bug, Bug.testcase_id.in_(testcases), {Bug.testcase_id: None}),
+        (Bug, Bug.requirement_id.in_(requirements), {Bug.requirement_id: None}),
+        (TestCase, TestCase.requirement_id.in_(requirements), {TestCase.requirement_id: None}),
+        (Task, Task.id.in_(tasks)),
+        (TestCase, TestCase.id.in_(testcases)),
+        (Requirement, Requirement.id.in_(requirements)),
+    ]
+
+
+def prune_tombstones(db: Session, before: datetime, project_id: Optional[int] = None) -> int:
+    """
+    Drop sync tombstones older than ``before``. Each project remembers the
+    newest dropped id so clients with an older sync token get a full sync.
+    """
+    query = db.query(DeletionLog.project_id, func.max(DeletionLog.id)).filter(DeletionLog.deleted_at < before)
+    if project_id is not None:
+        query = query.filter(DeletionLog.project_id == project_id)
+    floors = dict(query.group_by(DeletionLog.project_id).all())
+    for pid, floor in floors.items():
+        db.query(Project).filter(Project.id == pid, Project.tombstone_floor < floor).update(
+            {Project.tombstone_floor: floor}, synchronize_session=False
+        )
+
+    deleted = 0
+    for pid, floor in floors.items():
+        deleted += db.query(DeletionLog).filter(
+            DeletionLog.project_id == pid, DeletionLog.id <= floor
+        ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def purge_trash(
+    db: Session,
+    before: datetime,
+    project_id: Optional[int] = None,
+    batch_size: int = PURGE_BATCH_ROWS,
+    on_batch: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, dict]:
+    """
+    Permanently delete rows trashed before ``before`` (in one project or all),
+    committing after every batch.
+
+    Returns ``{table: {"rows", "ms"}}`` plus "images" and "total_ms", like purge_project().
+    """
+    started = time.perf_counter()
+    plan = _purge_plan(before, project_id)
+    images = image_names(db, [
+        (model, criteria) for model, criteria, *values in plan
+        if not values and model in TRASH_MODELS.values()
+    ])
+
+    report = purge_steps(db, plan, batch_size, on_batch)
+
+    step_started = time.perf_counter()
+    report["images"] = {
+        "rows": remove_orphan_images(db, images),
+        "ms": round((time.perf_counter() - step_started) * 1000, 1),
+    }
+    report["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
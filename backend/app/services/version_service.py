@@ -0,0 +1,32 @@
+from typing import Dict, Iterable
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.project import Project
+
+
+def bump_data_version(db: Session, *project_ids: int) -> None:
+    """
+    Atomically increment the data version of the given projects.
+
+    Call in the same transaction as the mutation (before commit) so readers
+    never see new data under an old version. Project.updated_at is left as is.
+    """
+    ids = {project_id for project_id in project_ids if project_id}
+    if not ids:
+        return
+    db.execute(
+        update(Project)
+        .where(Project.id.in_(ids))
+        .values(data_version=Project.data_version + 1, updated_at=Project.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_data_versions(db: Session, project_ids: Iterable[int]) -> Dict[int, int]:
+    """Current data version per project (one primary-key lookup)"""
+    ids = list(set(project_ids))
+    if not ids:
+        return {}
+    return dict(db.query(Project.id, Project.data_version).filter(Project.id.in_(ids)).all())
@@ -1,10 +1,52 @@
 import re
-from typing import List
+import time
+from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 
 from app.models.user import User
 from app.models.project import ProjectMember
 
+# Pattern to match @[username] or @username
+# @[username] - matches @ followed by text in square brackets
+# @username - matches @ followed by word characters
+MENTION_PATTERN = re.compile(r'@\[([^\]]+)\]|@(\w+)')
+
+# project_id -> (loaded_at, {username: user_id})
+MEMBER_CACHE_TTL = 300  # seconds; bounds staleness across worker processes
+MEMBER_CACHE_MAX_PROJECTS = 1024
+_member_cache: Dict[int, Tuple[float, Dict[str, int]]] = {}
+
+
+def get_project_members_by_username(db: Session, project_id: int) -> Dict[str, int]:
+    """
+    Return {username: user_id} for a project's members.
+
+    Cached per process for MEMBER_CACHE_TTL seconds; membership changes in
+    this process call invalidate_project_members() so they apply immediately.
+    """
+    now = time.monotonic()
+    cached = _member_cache.get(project_id)
+    if cached and now - cached[0] < MEMBER_CACHE_TTL:
+        return cached[1]
+
+    rows = db.query(User.username, User.id).join(
+        ProjectMember, ProjectMember.user_id == User.id
+    ).filter(ProjectMember.project_id == project_id).all()
+    members = {username: user_id for username, user_id in rows}
+
+    if project_id not in _member_cache and len(_member_cache) >= MEMBER_CACHE_MAX_PROJECTS:
+        _member_cache.pop(next(iter(_member_cache)), None)
+    _member_cache[project_id] = (now, members)
+    return members
+
+
+def invalidate_project_members(project_id: Optional[int] = None) -> None:
+    """Drop the cached member map for a project (or for all projects)"""
+    if project_id is None:
+        _member_cache.clear()
+    else:
+        _member_cache.pop(project_id, None)
+
 
 def extract_mentions(content: str, db: Session, project_id: int) -> List[int]:
     """
@@ -22,12 +64,7 @@ def extract_mentions(content: str, db: Session, project_id: int) -> List[int]:
     Returns:
         List of unique user IDs that are mentioned and are project members
     """
-    # Pattern to match @[username] or @username
-    # @[username] - matches @ followed by text in square brackets
-    # @username - matches @ followed by word characters
-    pattern = r'@\[([^\]]+)\]|@(\w+)'
-    
-    matches = re.findall(pattern, content)
+    matches = MENTION_PATTERN.findall(content)
     
     # Flatten matches (each match is a tuple with two groups)
     usernames = []
@@ -39,20 +76,11 @@ def extract_mentions(content: str, db: Session, project_id: int) -> List[int]:
     if not usernames:
         return []
     
-    # Get unique usernames
-    unique_usernames = list(set(usernames))
-    
-    # Get project member IDs
-    project_member_ids = db.query(ProjectMember.user_id).filter(
-        ProjectMember.project_id == project_id
-    ).all()
-    member_ids = [m[0] for m in project_member_ids]
-    
-    # Query users by username who are also project members
-    users = db.query(User).filter(
-        User.username.in_(unique_usernames),
-        User.id.in_(member_ids)
-    ).all()
-    
-    # Return list of user IDs
-    return [user.id for user in users]
+    # Resolve against the cached member map (no queries on a cache hit)
+    members = get_project_members_by_username(db, project_id)
+    user_ids = []
+    for username in usernames:
+        user_id = members.get(username)
+        if user_id is not None and user_id not in user_ids:
+            user_ids.append(user_id)
+    return user_ids
@@ -0,0 +1,42 @@
+from typing import Dict
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+
+def upsert_increment(db: Session, model, keys: Dict, field: str, amount: int) -> None:
+    """
+    Atomically add ``amount`` to ``model.field`` for the row identified by ``keys``,
+    inserting the row if it does not exist yet.
+
+    Uses the dialect's native upsert so that concurrent writers never race on the
+    first insert of a key. ``keys`` must match a unique constraint of the table.
+    """
+    column = getattr(model, field)
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(model).values(**keys, **{field: amount})
+        stmt = stmt.on_duplicate_key_update({field: column + stmt.inserted[field]})
+        db.execute(stmt)
+        return
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(model).values(**keys, **{field: amount})
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys.keys()),
+            set_={field: column + stmt.excluded[field]},
+        )
+        db.execute(stmt)
+        return
+
+    # Generic fallback: update first, insert when nothing matched
+    conditions = [getattr(model, k) == v for k, v in keys.items()]
+    result = db.execute(update(model).where(*conditions).values({field: column + amount}))
+    if result.rowcount == 0:
+        db.execute(insert(model).values(**keys, **{field: amount}))
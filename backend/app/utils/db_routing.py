@@ -0,0 +1,130 @@
+import hashlib
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+# Read-only requests go to a replica, everything else to the primary:
+#   - GET/HEAD requests use a healthy replica (round robin) unless overridden;
+#   - once a session flushes or runs INSERT/UPDATE/DELETE it switches to the
+#     primary for the rest of the request; lazy rebuilds in GET endpoints call
+#     use_primary() first so what they write back is computed from the primary;
+#   - a caller who just wrote reads from the primary for REPLICA_STICKY_SECONDS
+#     so they see their own changes despite replication lag;
+#   - a replica that fails its checkout is skipped for REPLICA_RETRY_SECONDS.
+
+READ_METHODS = ("GET", "HEAD")
+
+REPLICA_KEY = "replica_bind"
+PRIMARY_KEY = "pinned_primary"
+
+# Route template -> "primary" / "replica". Sync watermarks and cache versions
+# must never go backwards, so they always read the primary.
+ROUTE_OVERRIDES: Dict[str, str] = {
+    "/api/projects/{project_id}/changes": "primary",
+    "/api/projects/{project_id}/version": "primary",
+}
+
+
+class RoutingSession(Session):
+    """Session that reads from the replica chosen for the request until it writes"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get(REPLICA_KEY)
+        if replica is not None and not self.info.get(PRIMARY_KEY):
+            if not self._flushing and not getattr(clause, "is_dml", False):
+                return replica
+            self.info[PRIMARY_KEY] = True
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+def use_primary(db: Session) -> None:
+    """Send the rest of this session's reads to the primary"""
+    db.info[PRIMARY_KEY] = True
+
+
+def on_replica(db: Session) -> bool:
+    """Whether this session's reads currently come from a replica (may lag)"""
+    return db.info.get(REPLICA_KEY) is not None and not db.info.get(PRIMARY_KEY)
+
+
+class ReplicaRouter:
+    def __init__(self, replicas: List[Engine]):
+        self.replicas = replicas
+        self._cycle = itertools.cycle(replicas)
+        self._down_until: Dict[Engine, float] = {}
+        self._sticky: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.overrides = dict(ROUTE_OVERRIDES)
+        for item in settings.DATABASE_ROUTE_OVERRIDES.split(","):
+            if "=" in item:
+                path, target = item.rsplit("=", 1)
+                self.overrides[path.strip()] = target.strip()
+
+    def route(self, db: Session, request: Request) -> None:
+        """Bind ``db`` to a replica if this request may read from one"""
+        if request.method not in READ_METHODS:
+            self._remember_writer(request)
+        if self._target(request) != "replica":
+            return
+        replica = self._pick()
+        if replica is not None:
+            db.info[REPLICA_KEY] = replica
+
+    def finish(self, request: Request) -> None:
+        """Make the caller read from the primary for a while after a write request"""
+        if request.method not in READ_METHODS:
+            self._remember_writer(request)
+
+    def _remember_writer(self, request: Request) -> None:
+        key = _caller_key(request)
+        if key is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._sticky) > 10000:
+                self._sticky = {k: until for k, until in self._sticky.items() if until > now}
+            self._sticky[key] = now + settings.REPLICA_STICKY_SECONDS
+
+    def _target(self, request: Request) -> str:
+        route = request.scope.get("route")
+        override = self.overrides.get(route.path) if route is not None else None
+        if override:
+            return override
+        if request.method not in READ_METHODS:
+            return "primary"
+        key = _caller_key(request)
+        if key is not None and self._sticky.get(key, 0) > time.monotonic():
+            return "primary"
+        return "replica"
+
+    def _pick(self) -> Optional[Engine]:
+        """Next healthy replica, or None to fall back to the primary"""
+        now = time.monotonic()
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            if self._down_until.get(replica, 0) > now:
+                continue
+            try:
+                # Checkout from the pool (pre-ping on MySQL) to catch a dead replica
+                with replica.connect():
+                    pass
+            except Exception:
+                self._down_until[replica] = now + settings.REPLICA_RETRY_SECONDS
+                continue
+            return replica
+        return None
+
+
+def _caller_key(request: Request) -> Optional[str]:
+    authorization = request.headers.get("authorization")
+    if not authorization:
+        return None
+    return hashlib.sha1(authorization.encode()).hexdigest()
@@ -0,0 +1,39 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# 客户端每次都需带 If-None-Match 重新验证
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:24]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match (RFC 7232 section 3.2)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def conditional_response(request: Request, response: Response, *parts) -> Optional[Response]:
+    """
+    Build the ETag from ``parts`` plus the request path and query string.
+
+    Returns a 304 response when the client already has this version; otherwise
+    sets the ETag on ``response`` and returns None so the endpoint carries on.
+    """
+    params = sorted(request.query_params.multi_items())
+    etag = make_etag(request.url.path, params, *parts)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,115 @@
+from html import escape
+from html.parser import HTMLParser
+from typing import List, Optional
+
+# Allowlist sanitizer for rich text that is sent back as HTML. Everything the
+# editor produces survives (formatting, lists, tables, links, images, mention
+# spans); other tags are dropped but keep their text, script-like elements
+# lose their content too, and only listed attributes are kept. URLs must be
+# relative or use http(s) / mailto. Unbalanced tags are closed at the end, so
+# a stored fragment cannot leak markup into the page around it.
+
+ALLOWED_TAGS = frozenset({
+    "p", "br", "hr", "div", "span", "strong", "b", "em", "i", "u", "s", "del", "mark", "sub", "sup",
+    "code", "pre", "blockquote", "ul", "ol", "li", "h1", "h2", "h3", "h4", "h5", "h6",
+    "a", "img", "table", "thead", "tbody", "tr", "th", "td",
+})
+VOID_TAGS = frozenset({"br", "hr", "img"})
+# Elements whose content is dropped along with the tag
+DROP_CONTENT_TAGS = frozenset({"script", "style", "iframe", "object", "embed", "template", "noscript", "textarea", "select"})
+
+ALLOWED_ATTRS = {
+    "a": {"href", "title", "target", "rel"},
+    "img": {"src", "alt", "title", "width", "height"},
+    "ol": {"start"},
+    "span": {"class", "data-type", "data-id", "data-label"},
+    "code": {"class"},
+    "th": {"colspan", "rowspan"},
+    "td": {"colspan", "rowspan"},
+}
+URL_ATTRS = frozenset({"href", "src"})
+SAFE_SCHEMES = ("http:", "https:", "mailto:")
+
+
+def _safe_url(value: str) -> bool:
+    url = "".join(value.split()).lower()  # browsers ignore whitespace inside the scheme
+    scheme_end = url.find(":")
+    if scheme_end == -1 or "/" in url[:scheme_end] or "?" in url[:scheme_end] or "#" in url[:scheme_end]:
+        return True  # relative
+    return url.startswith(SAFE_SCHEMES)
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out: List[str] = []
+        self.open_tags: List[str] = []
+        self.dropping: Optional[str] = None
+        self.drop_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self.dropping is not None:
+            if tag == self.dropping:
+                self.drop_depth += 1
+            return
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping, self.drop_depth = tag, 1
+            return
+        if tag not in ALLOWED_TAGS:
+            return
+
+        allowed = ALLOWED_ATTRS.get(tag, ())
+        kept = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRS and not _safe_url(value):
+                continue
+            kept.append(f' {name}="{escape(value)}"')
+        if tag == "a" and any(part.startswith(' target=') for part in kept):
+            kept = [part for part in kept if not part.startswith(" rel=")]
+            kept.append(' rel="noopener noreferrer"')
+
+        self.out.append(f"<{tag}{''.join(kept)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in ALLOWED_TAGS and tag not in VOID_TAGS and self.dropping is None:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.dropping is not None:
+            if tag == self.dropping:
+                self.drop_depth -= 1
+                if not self.drop_depth:
+                    self.dropping = None
+            return
+        if tag not in self.open_tags:
+            return
+        # Close anything left open inside this element first
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.out.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.dropping is None:
+            self.out.append(escape(data, quote=False))
+
+    def result(self) -> str:
+        self.close()
+        while self.open_tags:
+            self.out.append(f"</{self.open_tags.pop()}>")
+        return "".join(self.out)
+
+
+def sanitize_html(html: str) -> str:
+    """Keep the allowlisted tags and attributes of ``html``; escape all text"""
+    if not html:
+        return ""
+    parser = _Sanitizer()
+    parser.feed(html)
+    return parser.result()
@@ -0,0 +1,43 @@
+from typing import Iterable, Set
+
+from fastapi import HTTPException
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.project import Project, ProjectMember
+
+
+def check_project_access(db: Session, project_id: int, user: User) -> Project:
+    """Check if user has access to project and return project"""
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    is_creator = project.creator_id == user.id
+    is_member = db.query(ProjectMember).filter(
+        ProjectMember.project_id == project_id,
+        ProjectMember.user_id == user.id
+    ).first()
+
+    if not (is_creator or is_member):
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return project
+
+
+def accessible_project_ids(db: Session, project_ids: Iterable[int], user: User) -> Set[int]:
+    """Subset of ``project_ids`` the user may access, checked with one query"""
+    project_ids = set(project_ids)
+    if not project_ids:
+        return set()
+    is_member = db.query(ProjectMember.id).filter(
+        ProjectMember.project_id == Project.id,
+        ProjectMember.user_id == user.id
+    ).exists()
+    return {
+        project_id for (project_id,) in db.query(Project.id).filter(
+            Project.id.in_(project_ids),
+            or_(Project.creator_id == user.id, is_member)
+        ).all()
+    }
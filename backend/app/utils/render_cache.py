@@ -0,0 +1,150 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, Type
+
+import markdown
+from pydantic import BaseModel
+
+from app.config import settings
+from app.utils.html_sanitize import sanitize_html
+from app.utils.text_extract import html_to_text
+
+# Rich-text fields (descriptions, test case steps, comments) are stored as
+# TipTap HTML or, in older rows and API-created items, Markdown. Rendering them
+# to sanitized HTML or plain text is cached per process by content hash, so
+# the same text is converted once no matter how many rows or endpoints show
+# it, and an edit simply produces a new key; stale entries age out of the LRU.
+#
+# Projections are computed on first read; with RENDER_CACHE_WARM_ON_WRITE the
+# write endpoints compute them right after commit instead. Markdown goes
+# through the ``markdown`` package and then the same sanitizer as editor HTML.
+
+RENDER_FORMATS = ("html", "text")
+RENDER_PATTERN = "^(html|text)$"
+
+# entity -> rich-text fields that render=html|text applies to
+RICH_TEXT_FIELDS = {
+    "bug": ("description",),
+    "requirement": ("description",),
+    "task": ("description",),
+    "testcase": ("precondition", "steps", "test_data", "expected_result", "actual_result"),
+    "comment": ("content",),
+}
+
+def is_html(content: str) -> bool:
+    """The editor always starts its output with a tag"""
+    return content.lstrip().startswith("<")
+
+
+def _markdown_to_html(content: str) -> str:
+    return markdown.markdown(content, extensions=["extra", "sane_lists"])
+
+
+def render_html(content: str) -> str:
+    source = content if is_html(content) else _markdown_to_html(content)
+    return sanitize_html(source)
+
+
+def render_text(content: str) -> str:
+    if is_html(content):
+        return html_to_text(content)
+    return html_to_text(_markdown_to_html(content))
+
+
+RENDERERS = {"html": render_html, "text": render_text}
+
+
+class RenderCache:
+    """In-process LRU of rendered projections, bounded by their total length"""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(fmt: str, content: str) -> Tuple[str, str]:
+        return fmt, hashlib.sha1(content.encode()).hexdigest()
+
+    def render(self, content: Optional[str], fmt: str) -> Optional[str]:
+        """``content`` as sanitized HTML or plain text (None and "" pass through)"""
+        if not content:
+            return content
+        key = self.make_key(fmt, content)
+        with self._lock:
+            rendered = self._items.get(key)
+            if rendered is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return rendered
+            self.misses += 1
+
+        rendered = RENDERERS[fmt](content)
+        self._store(key, rendered)
+        return rendered
+
+    def warm(self, *contents: Optional[str]) -> None:
+        """Compute every projection of ``contents`` now (after a write) if enabled"""
+        if not settings.RENDER_CACHE_WARM_ON_WRITE:
+            return
+        for content in contents:
+            if not content:
+                continue
+            for fmt in RENDER_FORMATS:
+                key = self.make_key(fmt, content)
+                with self._lock:
+                    if key in self._items:
+                        continue
+                self._store(key, RENDERERS[fmt](content))
+
+    def _store(self, key: Tuple[str, str], rendered: str) -> None:
+        if len(rendered) > self.max_chars:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = rendered
+            self.size += len(rendered)
+            while self.size > self.max_chars:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._items),
+            "chars": self.size,
+            "max_chars": self.max_chars,
+            "evictions": self.evictions,
+        }
+
+
+render_cache = RenderCache(settings.RENDER_CACHE_MAX_CHARS)
+
+
+def rendered(obj, schema: Type[BaseModel], entity: str, fmt: Optional[str]):
+    """
+    ``obj`` validated into ``schema`` with the entity's rich-text fields
+    rendered as ``fmt``; ``obj`` itself when no format is requested.
+    """
+    if not fmt:
+        return obj
+    data = schema.model_validate(obj)
+    return data.model_copy(update={
+        field: render_cache.render(getattr(data, field), fmt) for field in RICH_TEXT_FIELDS[entity]
+    })
@@ -0,0 +1,155 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional, Type
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.config import settings
+
+# Cached bodies are keyed by the project data version(s) they were built from,
+# so any mutation moves readers to a new key and stale entries simply age out
+# of the LRU (or expire in the shared backend). No explicit purge is needed,
+# which also keeps multiple workers consistent without coordination.
+
+KEY_PREFIX = "tapb:resp:"
+
+# Headers copied from the endpoint's Response onto the cached JSON response
+PASS_HEADERS = ("etag", "cache-control")
+
+
+class MemoryBackend:
+    """In-process LRU bounded by the total size of the cached bodies"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def set(self, key: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "entries": len(self._items),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class RedisBackend:
+    """Shared store for multi-worker deployments (needs the optional redis package)"""
+
+    def __init__(self, url: str, ttl: int):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, body: bytes) -> None:
+        self.client.set(key, body, ex=self.ttl)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=f"{KEY_PREFIX}*"):
+            self.client.delete(key)
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "ttl": self.ttl}
+
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, request: Request, scope: Iterable, versions: dict) -> str:
+        """
+        Key = route template + normalized query params + permission scope + data versions.
+
+        Params are sorted and empty values dropped so equivalent URLs share an
+        entry; ``scope`` is whatever decides which rows the caller may see.
+        """
+        route = request.scope.get("route")
+        path = route.path if route is not None else request.url.path
+        params = sorted((k, v) for k, v in request.query_params.multi_items() if v != "")
+        raw = repr((request.method, path, request.path_params, params, tuple(scope), sorted(versions.items())))
+        return KEY_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, key: str, response: Response) -> Optional[Response]:
+        """Return the cached JSON response for ``key``, or None on a miss"""
+        try:
+            body = self.backend.get(key)
+        except Exception:
+            body = None
+        if body is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _json_response(body, response)
+
+    def store(self, key: str, model: Type[BaseModel], data, response: Response) -> Response:
+        """Serialize ``data`` through the endpoint's response model, cache and return it"""
+        body = model.model_validate(data, from_attributes=True).model_dump_json().encode()
+        try:
+            self.backend.set(key, body)
+        except Exception:
+            pass  # a failing shared backend must not fail the request
+        return _json_response(body, response)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            **self.backend.stats(),
+        }
+
+
+def _json_response(body: bytes, response: Response) -> Response:
+    headers = {k: v for k, v in response.headers.items() if k in PASS_HEADERS}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _create_backend():
+    if settings.RESPONSE_CACHE_URL:
+        return RedisBackend(settings.RESPONSE_CACHE_URL, settings.RESPONSE_CACHE_TTL)
+    return MemoryBackend(settings.RESPONSE_CACHE_MAX_BYTES)
+
+
+response_cache = ResponseCache(_create_backend())
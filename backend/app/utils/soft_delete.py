@@ -0,0 +1,28 @@
+from sqlalchemy import Column, DateTime, event
+from sqlalchemy.orm import sessionmaker, with_loader_criteria
+
+# Soft delete: models with SoftDeleteMixin are hidden from every ORM SELECT of
+# the session (including relationship loads) once deleted_at is set. Code that
+# must see trashed rows - the trash bin, purges, archiving - opts out with
+# query.execution_options(include_deleted=True). Bulk UPDATE/DELETE statements
+# are never filtered.
+
+INCLUDE_DELETED = "include_deleted"
+
+
+class SoftDeleteMixin:
+    deleted_at = Column(DateTime, nullable=True)
+
+
+def install_soft_delete_filter(session_factory: sessionmaker) -> None:
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _hide_deleted(orm_execute_state):
+        if (
+            orm_execute_state.is_select
+            and not orm_execute_state.is_column_load
+            and not orm_execute_state.is_relationship_load
+            and not orm_execute_state.execution_options.get(INCLUDE_DELETED, False)
+        ):
+            orm_execute_state.statement = orm_execute_state.statement.options(
+                with_loader_criteria(SoftDeleteMixin, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+            )
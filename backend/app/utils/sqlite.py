@@ -0,0 +1,63 @@
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+
+# Serializes write transactions inside this process. SQLite allows a single
+# writer at a time; letting threadpool requests race for the file lock ends in
+# "database is locked" once busy_timeout runs out. Readers never take it, and
+# under WAL they keep reading while a writer is active. Separate worker
+# processes still coordinate through busy_timeout.
+_write_lock = threading.Lock()
+
+WRITE_LOCK_KEY = "sqlite_write_lock"
+
+
+def configure_sqlite(engine: Engine) -> None:
+    """Apply the production pragmas to every new SQLite connection"""
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.close()
+
+
+def install_write_lock(session_factory: sessionmaker) -> None:
+    """
+    Make sessions from ``session_factory`` take the process-wide writer lock
+    before their first write and release it when the transaction ends.
+
+    pysqlite only opens a transaction at the first INSERT/UPDATE/DELETE, so
+    reads before that run outside any transaction and never see a stale
+    snapshot once the lock has been acquired.
+    """
+
+    def acquire(session: Session) -> None:
+        if session.info.get(WRITE_LOCK_KEY):
+            return
+        # Bounded wait: a stuck holder degrades to SQLite's own busy handling
+        if _write_lock.acquire(timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000):
+            session.info[WRITE_LOCK_KEY] = True
+
+    @event.listens_for(session_factory, "before_flush")
+    def _before_flush(session, flush_context, instances):
+        acquire(session)
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _before_execute(orm_execute_state):
+        if not orm_execute_state.is_select:
+            acquire(orm_execute_state.session)
+
+    @event.listens_for(session_factory, "after_transaction_end")
+    def _release(session, transaction):
+        if transaction.parent is None and session.info.pop(WRITE_LOCK_KEY, False):
+            _write_lock.release()
@@ -0,0 +1,119 @@
+import re
+from html import unescape
+
+# Plain text from rich-text fields (TipTap HTML, or Markdown stored as is).
+#
+# Tags are handled by precompiled substitutions that run in C: <br> and block
+# ends become line breaks, other tags are dropped. Lists go first, only in
+# fields that have them: items are numbered for <ol> ("1. "), marked for <ul>
+# ("- ") and indented when nested, with the editor's own <li> split by
+# str.split. List tags leave a "soft" break that merges with the line breaks
+# around it, so <li><p>..</p></li> gives one line per item rather than blank
+# lines between them. Entities are decoded once the tags are gone: the ones
+# the editor writes with str.replace, anything else with html.unescape (every
+# named and numeric entity).
+
+_SOFT_BREAK = "\x01"
+
+_SKIPPED = re.compile(r"<!--.*?-->|<(script|style)\b.*?</\1\s*>", re.I | re.S)
+# Cheap pre-check for _SKIPPED and _CELL_END: "<!--", "<scr", "<sty", "</t[dh]" in any case
+_RARE_TAG = re.compile(r"<(?:!--|[sS](?:[cC][rR]|[tT][yY])|/[tT][dDhH])")
+# groups: "ol" / "ul" and attributes; both None for </ol> and </ul>
+_LIST_TAG = re.compile(r"<(ol|ul)\b([^>]*)>|</(?:ol|ul)\s*>", re.I)
+_LIST_ITEM = re.compile(r"<li\b[^>]*>", re.I)
+_OL_START = re.compile(r"""\bstart\s*=\s*["']?(-?\d+)""", re.I)
+_LINE_BREAK = re.compile(r"<br\b[^>]*>|</(?:p|div|tr|pre|blockquote|table|h[1-6])\s*>", re.I)
+_CELL_END = re.compile(r"</t[dh]\s*>", re.I)
+_ANY_TAG = re.compile(r"<[^>]*>")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+# Entities common enough to decode with str.replace; &amp; goes last so that
+# "&amp;lt;" stays "&lt;"
+_COMMON_ENTITIES = (("&nbsp;", " "), ("&lt;", "<"), ("&gt;", ">"), ("&quot;", '"'))
+
+
+def _split_items(html: str) -> list:
+    # str.split for the editor's own <li>, the pattern for any other spelling
+    if html.count("<li") == html.count("<li>") and "<L" not in html:
+        return html.split("<li>")
+    return _LIST_ITEM.split(html)
+
+
+def _list_items(html: str, lists: list) -> str:
+    """Mark the items of the innermost open list in ``html`` (which holds no list tags)"""
+    if "<l" not in html and "<L" not in html:
+        return html
+    indent = "  " * (len(lists) - 1) if len(lists) > 1 else ""
+    items = _split_items(html)
+    number = lists[-1] if lists else None
+    if number is None:
+        return (_SOFT_BREAK + indent + "- ").join(items)
+    lists[-1] = number + len(items) - 1
+    return items[0] + "".join(
+        f"{_SOFT_BREAK}{indent}{n}. {item}" for n, item in enumerate(items[1:], number)
+    )
+
+
+def _list_markers(html: str) -> str:
+    """Replace list tags with soft breaks and "1. " / "- " item markers"""
+    parts = _LIST_TAG.split(html)
+    # One entry per open list: the next item's number, or None for <ul>
+    lists = []
+    out = [_list_items(parts[0], lists)]
+    # split() yields the two groups and the following text for every tag
+    tags = iter(parts)
+    next(tags)
+    for tag, attrs, text in zip(tags, tags, tags):
+        if tag is None:
+            if lists:
+                lists.pop()
+            out.append(_SOFT_BREAK)
+        elif tag.lower() == "ol":
+            start = _OL_START.search(attrs)
+            lists.append(int(start.group(1)) if start else 1)
+        else:
+            lists.append(None)
+        out.append(_list_items(text, lists))
+    return "".join(out)
+
+
+def decode_entities(text: str) -> str:
+    if "&" not in text:
+        return text
+    for entity, char in _COMMON_ENTITIES:
+        text = text.replace(entity, char)
+    decoded = text.replace("&amp;", "&")
+    # Every "&amp;" is four characters shorter decoded; any other "&" is unescape's job
+    if text.count("&") != (len(text) - len(decoded)) // 4:
+        return unescape(text).replace("\xa0", " ")
+    return decoded
+
+
+def html_to_text(html: str) -> str:
+    """Convert rich-text HTML to plain text, keeping line breaks and list numbering"""
+    if not html:
+        return ""
+    if "<" not in html:
+        return decode_entities(html).strip()
+
+    text = html
+    rare_tags = _RARE_TAG.search(text)
+    if rare_tags:
+        text = _SKIPPED.sub("", text)
+    has_lists = "<li" in text or "<LI" in text
+    if has_lists:
+        text = _list_markers(text)
+
+    if "<" in text:
+        text = _LINE_BREAK.sub("\n", text)
+        if rare_tags:
+            text = _CELL_END.sub("\t", text)
+        text = _ANY_TAG.sub("", text)
+    if has_lists:
+        text = text.replace("\n" + _SOFT_BREAK, _SOFT_BREAK).replace(_SOFT_BREAK * 2, _SOFT_BREAK)
+        text = text.replace(_SOFT_BREAK, "\n")
+
+    text = decode_entities(text)
+    if "\n\n\n" in text:
+        text = _BLANK_LINES.sub("\n\n", text)
+    return text.strip()
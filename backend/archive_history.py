@@ -0,0 +1,39 @@
+"""
+归档旧的操作历史（bug / 需求 / 任务 / 用例），压缩后移入 history_archive
+Run: python3 archive_history.py [--days 180] [--batch 500]
+
+按批处理并逐批提交，可在线执行，中断后重新运行即可继续。
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+sys.path.insert(0, '.')
+
+from app.database import SessionLocal
+from app.services.history_service import archive_history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=180, help="归档早于该天数的历史")
+    parser.add_argument("--batch", type=int, default=500, help="每批处理的实体数")
+    args = parser.parse_args()
+
+    before = datetime.utcnow() - timedelta(days=args.days)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = archive_history(db, before, batch_size=args.batch)
+        for entity_type, stats in result.items():
+            print(
+                f"{entity_type:12s} 归档 {stats['rows']} 条 / {stats['entities']} 个实体，"
+                f"生成 {stats['archives']} 个归档行，清理孤立归档 {stats['orphans_removed']} 个"
+            )
+        print(f"\n完成（早于 {before:%Y-%m-%d}），耗时 {time.perf_counter() - started:.1f} s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+重建项目看板计数（修复增量计数与明细数据不一致的问题）
+Run: python3 rebuild_project_counters.py [project_id ...]
+"""
+import sys
+sys.path.insert(0, '.')
+
+from app.database import SessionLocal
+from app.models.project import Project
+from app.services.stats_service import rebuild_project_counters
+
+
+def main(project_ids):
+    db = SessionLocal()
+    try:
+        query = db.query(Project)
+        if project_ids:
+            query = query.filter(Project.id.in_(project_ids))
+        projects = query.order_by(Project.id).all()
+        db.commit()  # 每个项目在新事务中加锁重建
+
+        for project in projects:
+            rebuild_project_counters(db, project)
+            db.commit()
+            print(f"已重建项目 '{project.name}' (ID: {project.id})")
+
+        print(f"\n共重建 {len(projects)} 个项目")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]])
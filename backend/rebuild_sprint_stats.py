@@ -0,0 +1,34 @@
+"""
+重建迭代每日统计（燃尽图数据）
+根据需求、任务、缺陷、测试用例的状态变更历史回放生成
+Run: python3 rebuild_sprint_stats.py [sprint_id ...]
+"""
+import sys
+sys.path.insert(0, '.')
+
+from app.database import SessionLocal
+from app.models.sprint import Sprint
+from app.services.stats_service import rebuild_sprint_stats
+
+
+def main(sprint_ids):
+    db = SessionLocal()
+    try:
+        query = db.query(Sprint)
+        if sprint_ids:
+            query = query.filter(Sprint.id.in_(sprint_ids))
+        sprints = query.order_by(Sprint.id).all()
+        db.commit()  # 每个迭代在新事务中加锁重建
+
+        for sprint in sprints:
+            rebuild_sprint_stats(db, sprint)
+            db.commit()
+            print(f"已重建迭代 '{sprint.name}' (ID: {sprint.id})")
+
+        print(f"\n共重建 {len(sprints)} 个迭代")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]])
@@ -2,8 +2,11 @@
 Utility script: keep only one project named '示例空间', remove all others.
 - If the project doesn't exist, it will be created with key 'DEMO'.
 - Ensures creator (admin or first user) is set as owner member.
-Run: python reset_to_single_project.py
+Run: python reset_to_single_project.py [--background]
+  --background: queue a project_delete job per project instead of deleting inline
 """
+import sys
+
 from app.database import SessionLocal
 from app.models.project import Project, ProjectMember
 from app.models.user import User
@@ -62,40 +65,24 @@ def main():
             if changed:
                 print('✏️  Updated existing project name/key to 示例空间/DEMO')
         
-        # Delete all other projects (with manual dependency cleanup)
-        from app.models.bug import Bug
-        from app.models.comment import BugComment
-        from app.models.bug import BugHistory
-        from app.models.requirement import Requirement
-        from app.models.task import Task
-        from app.models.sprint import Sprint
+        # Delete all other projects (set-based purge, committed batch by batch)
+        from app.services.purge_service import purge_project
 
         others = db.query(Project).filter(Project.id != keep.id).all()
+        if '--background' in sys.argv[1:]:
+            from app.services.job_service import enqueue, load_handlers
+            load_handlers()
+            for p in others:
+                enqueue(db, 'project_delete', p.creator_id, project_id=p.id)
+            db.commit()
+            print(f'🕒 Queued deletion of {len(others)} other projects; kept project id={keep.id}, name={keep.name}')
+            return
+
+        db.commit()
         removed = 0
-        for p in others:
-            # Bugs and related
-            bug_ids = [b.id for b in db.query(Bug.id).filter(Bug.project_id == p.id).all()]
-            if bug_ids:
-                db.query(BugComment).filter(BugComment.bug_id.in_(bug_ids)).delete(synchronize_session=False)
-                db.query(BugHistory).filter(BugHistory.bug_id.in_(bug_ids)).delete(synchronize_session=False)
-                db.query(Bug).filter(Bug.id.in_(bug_ids)).delete(synchronize_session=False)
-            
-            # Requirements and tasks
-            req_ids = [r.id for r in db.query(Requirement.id).filter(Requirement.project_id == p.id).all()]
-            if req_ids:
-                task_ids = [t.id for t in db.query(Task.id).filter(Task.requirement_id.in_(req_ids)).all()]
-                if task_ids:
-                    db.query(Task).filter(Task.id.in_(task_ids)).delete(synchronize_session=False)
-                db.query(Requirement).filter(Requirement.id.in_(req_ids)).delete(synchronize_session=False)
-            
-            # Sprints
-            db.query(Sprint).filter(Sprint.project_id == p.id).delete(synchronize_session=False)
-            
-            # Members
-            db.query(ProjectMember).filter(ProjectMember.project_id == p.id).delete(synchronize_session=False)
-            
-            # Finally project
-            db.delete(p)
+        for project_id in [p.id for p in others]:
+            report = purge_project(db, project_id)
+            print(f'   project {project_id}: {report["total_ms"]} ms')
             removed += 1
         
         db.commit()
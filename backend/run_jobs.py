@@ -0,0 +1,47 @@
+"""
+独立运行后台任务 worker（与 API 进程分开部署时使用，API 侧设置 JOB_WORKERS=0）
+Run: python3 run_jobs.py [--workers 2] [--once]
+
+--once: 执行完当前队列中可运行的任务（含到期的周期任务，如回收站清理）后退出（适合 cron / CI）
+"""
+import argparse
+import signal
+import sys
+import threading
+sys.path.insert(0, '.')
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services.job_service import JobWorkerPool, load_handlers, run_pending, schedule_periodic_jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=max(settings.JOB_WORKERS, 1))
+    parser.add_argument("--once", action="store_true")
+    args = parser.parse_args()
+
+    if args.once:
+        load_handlers()
+        db = SessionLocal()
+        try:
+            schedule_periodic_jobs(db)
+        finally:
+            db.close()
+        print(f"已执行 {run_pending()} 个任务")
+        return
+
+    pool = JobWorkerPool(args.workers)
+    stopped = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+
+    pool.start()
+    print(f"后台任务 worker 已启动（{args.workers} 个线程，{pool.worker_id}），Ctrl+C 退出")
+    stopped.wait()
+    print("正在等待运行中的任务结束...")
+    pool.stop()
+
+
+if __name__ == "__main__":
+    main()
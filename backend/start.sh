@@ -4,4 +4,4 @@
 python3 -m alembic upgrade head
 
 # Start server
-python3 -m uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
+python3 -m uvicorn app.main:create_app --factory --host 0.0.0.0 --port 8000 --reload
@@ -0,0 +1,92 @@
+"""
+启动耗时报告 + 冷启动预算检查（基于 python -X importtime）
+Run: python3 startup_report.py [--budget-ms 2500] [--runs 3] [--top 15]
+
+每次在全新解释器中执行 create_app()，取多次中最快的一次作为结果；
+超出预算、或启动阶段导入了应延迟加载的重型依赖时以非零状态码退出，可直接用于 CI。
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+# 只在个别接口里使用、不应在启动阶段导入的依赖
+LAZY_MODULES = ("openpyxl",)
+
+PROBE = (
+    "import time; t = time.perf_counter(); "
+    "from app.main import create_app; create_app(); "
+    "print(f'STARTUP_MS={(time.perf_counter() - t) * 1000:.1f}')"
+)
+
+
+def run_probe():
+    """Start a fresh interpreter, return (create_app ms, [(self_us, cumulative_us, depth, module)])"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode:
+        sys.stderr.write(result.stderr)
+        raise SystemExit("create_app() failed")
+
+    startup_ms = float(result.stdout.strip().rsplit("STARTUP_MS=", 1)[1])
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return startup_ms, imports
+
+
+def summarize(imports, top: int) -> None:
+    by_package = defaultdict(int)
+    for self_us, _, _, name in imports:
+        by_package[name.split(".")[0]] += self_us
+
+    print(f"\n按顶层包汇总（self 时间，前 {top}）:")
+    for package, total_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {total_us / 1000:8.1f} ms  {package}")
+
+    print(f"\n本项目模块（cumulative 时间，前 {top}）:")
+    own = [item for item in imports if item[3].startswith("app.")]
+    for _, cumulative_us, _, name in sorted(own, key=lambda item: -item[1])[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=float(os.environ.get("STARTUP_BUDGET_MS", 2500)))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [run_probe() for _ in range(max(args.runs, 1))]
+    startup_ms, imports = min(runs, key=lambda run: run[0])
+
+    total_ms = sum(item[0] for item in imports) / 1000
+    print(f"create_app() 耗时: {startup_ms:.1f} ms（{len(runs)} 次取最快，预算 {args.budget_ms:.0f} ms）")
+    print(f"导入模块数: {len(imports)}，导入总耗时: {total_ms:.1f} ms")
+    summarize(imports, args.top)
+
+    failures = []
+    loaded = {name.split(".")[0] for _, _, _, name in imports}
+    for module in LAZY_MODULES:
+        if module in loaded:
+            failures.append(f"{module} 在启动阶段被导入，应改为在使用处延迟导入")
+    if startup_ms > args.budget_ms:
+        failures.append(f"冷启动 {startup_ms:.1f} ms 超出预算 {args.budget_ms:.0f} ms")
+
+    if failures:
+        print("\n检查未通过:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n检查通过")
+
+
+if __name__ == "__main__":
+    main()